@@ -0,0 +1,51 @@
+-- Run this in Supabase SQL Editor to add batched write-back of AI summaries
+-- Navigate to: Supabase Dashboard > SQL Editor > New Query
+--
+-- ai_report_generator.py and ai_batch_summarizer.py buffer finished summaries and write them
+-- through apply_ai_summaries() in one call per batch: court_notices and its court_notices_history
+-- mirror are updated together, instead of two UPDATE round trips per notice.
+-- Requires court_notices_history (setup_professional_stats.sql).
+--
+-- p_rows is a JSON array of {"id", "ai_summary", "minimum_price", "appraised_price", "auction_date"};
+-- fields missing from an element keep their current value. Returns the ids that were updated.
+
+CREATE OR REPLACE FUNCTION apply_ai_summaries(p_rows JSONB)
+RETURNS TABLE (id UUID)
+LANGUAGE sql
+AS $$
+    WITH input AS (
+        SELECT (e->>'id')::UUID AS id,
+               e->>'ai_summary' AS ai_summary,
+               e->>'minimum_price' AS minimum_price,
+               e->>'appraised_price' AS appraised_price,
+               (e->>'auction_date')::DATE AS auction_date
+        FROM jsonb_array_elements(p_rows) e
+    ),
+    updated AS (
+        UPDATE court_notices n
+        SET ai_summary = COALESCE(i.ai_summary, n.ai_summary),
+            minimum_price = COALESCE(i.minimum_price, n.minimum_price),
+            appraised_price = COALESCE(i.appraised_price, n.appraised_price),
+            auction_date = COALESCE(i.auction_date, n.auction_date)
+        FROM input i
+        WHERE n.id = i.id
+        RETURNING n.id, n.site_id, n.source_type
+    ),
+    -- Archive double-write (history stores prices as BIGINT; oversized digit strings are skipped)
+    archived AS (
+        UPDATE court_notices_history h
+        SET ai_summary = COALESCE(i.ai_summary, h.ai_summary),
+            minimum_price = COALESCE(CASE WHEN i.minimum_price ~ '^[0-9]{1,18}$' THEN i.minimum_price::BIGINT END, h.minimum_price),
+            appraised_price = COALESCE(CASE WHEN i.appraised_price ~ '^[0-9]{1,18}$' THEN i.appraised_price::BIGINT END, h.appraised_price),
+            auction_date = COALESCE(i.auction_date, h.auction_date)
+        FROM updated u
+        JOIN input i ON i.id = u.id
+        WHERE h.site_id = u.site_id AND h.source_type = u.source_type
+        RETURNING 1
+    )
+    SELECT u.id FROM updated u;
+$$;
+
+
+-- Verify (should return no rows: the id does not exist)
+SELECT * FROM apply_ai_summaries('[{"id": "00000000-0000-0000-0000-000000000000", "ai_summary": "test"}]'::JSONB);
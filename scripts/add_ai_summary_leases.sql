@@ -0,0 +1,109 @@
+-- Run this in Supabase SQL Editor to add leasing for AI summary workers
+-- Navigate to: Supabase Dashboard > SQL Editor > New Query
+--
+-- ai_report_generator.py claims the notices its scheduler picked through claim_ai_summary_ids()
+-- instead of just selecting "ai_summary IS NULL" rows, so overlapping runs (cron + scraper.py
+-- tail call + manual runs) never summarise the same notice twice. A claim is a lease: it expires
+-- unless the worker renews it, failed notices are released with an attempt count, and after
+-- p_max_attempts failures a notice is parked as 'dead' instead of being retried forever.
+
+ALTER TABLE court_notices ADD COLUMN IF NOT EXISTS ai_lease_owner TEXT DEFAULT NULL;
+ALTER TABLE court_notices ADD COLUMN IF NOT EXISTS ai_lease_expires_at TIMESTAMPTZ DEFAULT NULL;
+ALTER TABLE court_notices ADD COLUMN IF NOT EXISTS ai_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE court_notices ADD COLUMN IF NOT EXISTS ai_status TEXT DEFAULT NULL;      -- NULL = pending, 'dead' = gave up
+ALTER TABLE court_notices ADD COLUMN IF NOT EXISTS ai_last_error TEXT DEFAULT NULL;
+
+-- Pending work, newest first (the scheduler's candidate select)
+CREATE INDEX IF NOT EXISTS idx_court_notices_ai_pending
+    ON court_notices (date_posted DESC, created_at DESC)
+    WHERE ai_summary IS NULL AND ai_status IS NULL;
+
+-- ...and soonest-expiring first (the scheduler's second candidate select)
+CREATE INDEX IF NOT EXISTS idx_court_notices_ai_pending_expiry
+    ON court_notices (expiry_date)
+    WHERE ai_summary IS NULL AND ai_status IS NULL;
+
+
+-- Superseded by claim_ai_summary_ids(): the priority scheduler picks the notices, then claims them
+DROP FUNCTION IF EXISTS claim_ai_summary_batch(TEXT, INTEGER, INTEGER, TEXT[]);
+
+
+-- Claims specific notices chosen by the priority scheduler (notice_scheduler.py). Ids that another
+-- worker leased (or summarised) in the meantime are skipped, so the result may be shorter than p_ids.
+-- SKIP LOCKED lets concurrent workers claim without waiting on each other.
+CREATE OR REPLACE FUNCTION claim_ai_summary_ids(
+    p_worker TEXT,
+    p_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 900
+)
+RETURNS TABLE (
+    id UUID, site_id TEXT, source_type TEXT, title TEXT,
+    category TEXT, department TEXT, file_info JSONB, ai_attempts INTEGER
+)
+LANGUAGE sql
+AS $$
+    UPDATE court_notices n
+    SET ai_lease_owner = p_worker,
+        ai_lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        ai_attempts = n.ai_attempts + 1
+    WHERE n.id IN (
+        SELECT c.id
+        FROM court_notices c
+        WHERE c.id = ANY(p_ids)
+          AND c.ai_summary IS NULL
+          AND c.ai_status IS NULL
+          AND (c.ai_lease_expires_at IS NULL OR c.ai_lease_expires_at < NOW())
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING n.id, n.site_id, n.source_type, n.title, n.category, n.department, n.file_info::jsonb, n.ai_attempts;
+$$;
+
+
+-- Heartbeat: extends the leases this worker still holds. Returns the number renewed.
+CREATE OR REPLACE FUNCTION renew_ai_summary_leases(
+    p_worker TEXT,
+    p_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 900
+)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH renewed AS (
+        UPDATE court_notices
+        SET ai_lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE id = ANY(p_ids) AND ai_lease_owner = p_worker
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM renewed;
+$$;
+
+
+-- Releases this worker's leases. Notices that still have no summary record p_error and become
+-- claimable again, or 'dead' once they have used p_max_attempts attempts.
+CREATE OR REPLACE FUNCTION release_ai_summary_leases(
+    p_worker TEXT,
+    p_ids UUID[],
+    p_error TEXT DEFAULT NULL,
+    p_max_attempts INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH released AS (
+        UPDATE court_notices
+        SET ai_lease_owner = NULL,
+            ai_lease_expires_at = NULL,
+            ai_last_error = CASE WHEN ai_summary IS NULL THEN p_error ELSE NULL END,
+            ai_status = CASE WHEN ai_summary IS NULL AND ai_attempts >= p_max_attempts THEN 'dead' ELSE ai_status END
+        WHERE id = ANY(p_ids) AND ai_lease_owner = p_worker
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM released;
+$$;
+
+
+-- Verify (dead-lettered notices: reset ai_status / ai_attempts to retry them)
+SELECT ai_status, COUNT(*), MAX(ai_attempts)
+FROM court_notices
+WHERE ai_summary IS NULL
+GROUP BY ai_status;
@@ -0,0 +1,49 @@
+-- Run this in Supabase SQL Editor to create the ai_pipeline_telemetry table
+-- Optional mirror of the local telemetry ledger (scripts/ai_telemetry.py): one row per notice
+-- processed by ai_report_generator.py --telemetry-mirror, for cost/latency analysis across runners.
+
+CREATE TABLE IF NOT EXISTS ai_pipeline_telemetry (
+    id BIGSERIAL PRIMARY KEY,
+    notice_id TEXT,
+    run_id TEXT,                                -- worker id (GitHub run / host + pid)
+    day DATE,
+    category TEXT,
+    attachments INTEGER DEFAULT 0,
+    download_bytes BIGINT DEFAULT 0,            -- court file server traffic (cache hits excluded)
+    download_ms REAL DEFAULT 0,
+    cache_hits INTEGER DEFAULT 0,               -- local download cache hits
+    stored_text_hits INTEGER DEFAULT 0,         -- attachment_text reuse
+    extraction_methods TEXT,                    -- e.g. 'fitz,vision' (one per extracted attachment)
+    extract_ms REAL DEFAULT 0,
+    pages INTEGER DEFAULT 0,
+    ocr_pages INTEGER DEFAULT 0,
+    text_chars INTEGER DEFAULT 0,
+    prompt_tokens INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    llm_ms REAL DEFAULT 0,
+    llm_cached INTEGER DEFAULT 0,
+    outcome TEXT,                               -- 'success', 'failed', 'save_failed', 'skipped'
+    error TEXT,
+    total_ms REAL DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    ocr_prompt_tokens INTEGER DEFAULT 0,        -- Vision OCR (scanned pages)
+    ocr_completion_tokens INTEGER DEFAULT 0
+);
+
+-- Tables created before Vision tokens were recorded
+ALTER TABLE ai_pipeline_telemetry ADD COLUMN IF NOT EXISTS ocr_prompt_tokens INTEGER DEFAULT 0;
+ALTER TABLE ai_pipeline_telemetry ADD COLUMN IF NOT EXISTS ocr_completion_tokens INTEGER DEFAULT 0;
+
+-- Enable Row Level Security (service role only; no public policy)
+ALTER TABLE ai_pipeline_telemetry ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_ai_pipeline_telemetry_day ON ai_pipeline_telemetry(day, category);
+
+-- Verify: spend and time by day and category
+SELECT day, category, COUNT(*) AS notices,
+       SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+       SUM(ocr_prompt_tokens) AS ocr_prompt_tokens, SUM(ocr_completion_tokens) AS ocr_completion_tokens,
+       ROUND(SUM(total_ms) / 1000) AS seconds
+FROM ai_pipeline_telemetry
+GROUP BY day, category
+ORDER BY day DESC, category;
@@ -0,0 +1,25 @@
+-- Run this in Supabase SQL Editor to create the attachment_text table
+-- Stores the full text extracted from each notice attachment (written by ai_report_generator.py),
+-- so a file is only downloaded and OCR'd once.
+
+CREATE TABLE IF NOT EXISTS attachment_text (
+    content_hash TEXT PRIMARY KEY,              -- SHA-256 of the attachment bytes
+    server_filename TEXT,                       -- file_info[].server_filename (court file server key)
+    original_filename TEXT,
+    extraction_method TEXT NOT NULL,            -- 'pdfplumber', 'fitz', 'vision'
+    page_count INTEGER DEFAULT 0,
+    char_count INTEGER DEFAULT 0,
+    text TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Enable Row Level Security (service role only; no public policy)
+ALTER TABLE attachment_text ENABLE ROW LEVEL SECURITY;
+
+-- Lookup by court file key before downloading
+CREATE INDEX IF NOT EXISTS idx_attachment_text_server_filename ON attachment_text(server_filename);
+
+-- Verify
+SELECT column_name, data_type 
+FROM information_schema.columns 
+WHERE table_name = 'attachment_text';
@@ -0,0 +1,161 @@
+-- Run this in Supabase SQL Editor to aggregate daily_stats inside the database
+-- Navigate to: Supabase Dashboard > SQL Editor > New Query
+--
+-- daily_stats_aggregator.py calls refresh_daily_stats() instead of downloading every notice of a
+-- day just to count it: the GROUP BY runs here and only the finished daily_stats rows come back.
+-- The rules mirror DayStats in daily_stats_rollup.py (the Python path is kept as a fallback);
+-- scripts/test_daily_stats_sql.py checks both against a local Postgres.
+-- Requires daily_stats (setup_professional_stats.sql).
+
+-- Merge state for incremental updates during scraping (daily_stats_deltas.py) and period rollups
+-- (periodic_report_generator.py): the per-court counts behind top_court, the number of priced
+-- notices behind avg_appraisal_price and a quantile sketch of the prices (price_sketch.py)
+ALTER TABLE daily_stats ADD COLUMN IF NOT EXISTS court_counts JSONB DEFAULT NULL;
+ALTER TABLE daily_stats ADD COLUMN IF NOT EXISTS priced_count INTEGER DEFAULT NULL;
+ALTER TABLE daily_stats ADD COLUMN IF NOT EXISTS price_sketch JSONB DEFAULT NULL;
+
+-- Range scans of one source_type by date
+CREATE INDEX IF NOT EXISTS idx_court_notices_source_date
+    ON court_notices (source_type, date_posted);
+
+
+-- daily_stats rows for notices posted in [p_start, p_end]; days without notices return no row.
+--   * categories outside the CATEGORY_MAP list (including NULL) count as other_count
+--   * price = appraised_price, or minimum_price when appraised_price is NULL/empty; values that
+--     are not whole numbers are ignored (Python: int(price) raising ValueError)
+--   * avg = floor(total / priced notices), max never below 0
+--   * top_court = most frequent department (missing = '기타'); ties go to the one seen first in id order
+--   * court_counts = {department: notices}, priced_count = notices with a usable price
+--   * price_sketch = {bucket: notices} over positive prices, bucket = ceil(ln(price) / ln(1.02 / 0.98))
+--     (price_sketch.GAMMA; computed in double precision like Python's math.log)
+DROP FUNCTION IF EXISTS compute_daily_stats(DATE, DATE);  -- return type changed (merge state columns)
+CREATE OR REPLACE FUNCTION compute_daily_stats(p_start DATE, p_end DATE)
+RETURNS TABLE (
+    stat_date DATE, total_count INTEGER,
+    real_estate_count INTEGER, vehicle_count INTEGER, asset_count INTEGER, bond_count INTEGER,
+    stock_count INTEGER, patent_count INTEGER, electronics_count INTEGER, other_count INTEGER,
+    total_appraisal_price BIGINT, avg_appraisal_price BIGINT, max_appraisal_price BIGINT,
+    top_court TEXT, total_views INTEGER,
+    court_counts JSONB, priced_count INTEGER, price_sketch JSONB
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH notices AS (
+        SELECT n.id::TEXT COLLATE "C" AS id, n.date_posted, n.category,
+               COALESCE(NULLIF(n.department, ''), '기타') AS department, n.view_count,
+               COALESCE(NULLIF(n.appraised_price::TEXT, ''), NULLIF(n.minimum_price::TEXT, '')) AS price_text
+        FROM court_notices n
+        WHERE n.source_type = 'notice'
+          AND n.date_posted BETWEEN p_start AND p_end
+    ),
+    priced AS (
+        SELECT t.*,
+               CASE WHEN t.price_text ~ '^\s*[+-]?[0-9]+\s*$' THEN t.price_text::NUMERIC END AS price
+        FROM notices t
+    ),
+    days AS (
+        SELECT p.date_posted,
+               COUNT(*) AS total_count,
+               COUNT(*) FILTER (WHERE p.category = 'real_estate') AS real_estate_count,
+               COUNT(*) FILTER (WHERE p.category = 'vehicle') AS vehicle_count,
+               COUNT(*) FILTER (WHERE p.category = 'asset') AS asset_count,
+               COUNT(*) FILTER (WHERE p.category = 'bond') AS bond_count,
+               COUNT(*) FILTER (WHERE p.category = 'stock') AS stock_count,
+               COUNT(*) FILTER (WHERE p.category = 'patent') AS patent_count,
+               COUNT(*) FILTER (WHERE p.category = 'electronics') AS electronics_count,
+               COUNT(*) FILTER (WHERE p.category IS NULL OR p.category NOT IN
+                   ('real_estate', 'vehicle', 'asset', 'bond', 'stock', 'patent', 'electronics')) AS other_count,
+               COALESCE(SUM(p.price), 0) AS total_price,
+               COUNT(p.price) AS price_count,
+               GREATEST(COALESCE(MAX(p.price), 0), 0) AS max_price,
+               COALESCE(SUM(p.view_count), 0) AS total_views
+        FROM priced p
+        GROUP BY p.date_posted
+    ),
+    court_days AS (
+        SELECT t.date_posted, t.department, COUNT(*) AS notices, MIN(t.id) AS first_id
+        FROM notices t
+        GROUP BY t.date_posted, t.department
+    ),
+    top_courts AS (
+        SELECT DISTINCT ON (c.date_posted) c.date_posted, c.department
+        FROM court_days c
+        ORDER BY c.date_posted, c.notices DESC, c.first_id
+    ),
+    court_maps AS (
+        SELECT c.date_posted, jsonb_object_agg(c.department, c.notices) AS court_counts
+        FROM court_days c
+        GROUP BY c.date_posted
+    ),
+    price_buckets AS (
+        SELECT p.date_posted,
+               CEIL(LN(p.price::DOUBLE PRECISION) / LN(1.02::DOUBLE PRECISION / 0.98::DOUBLE PRECISION))::INTEGER AS bucket,
+               COUNT(*) AS notices
+        FROM priced p
+        WHERE p.price > 0
+        GROUP BY 1, 2
+    ),
+    sketches AS (
+        SELECT b.date_posted, jsonb_object_agg(b.bucket::TEXT, b.notices) AS price_sketch
+        FROM price_buckets b
+        GROUP BY b.date_posted
+    )
+    SELECT d.date_posted,
+           d.total_count::INTEGER,
+           d.real_estate_count::INTEGER, d.vehicle_count::INTEGER, d.asset_count::INTEGER,
+           d.bond_count::INTEGER, d.stock_count::INTEGER, d.patent_count::INTEGER,
+           d.electronics_count::INTEGER, d.other_count::INTEGER,
+           d.total_price::BIGINT,
+           CASE WHEN d.price_count > 0 THEN FLOOR(d.total_price / d.price_count)::BIGINT ELSE 0 END,
+           d.max_price::BIGINT,
+           c.department,
+           d.total_views::INTEGER,
+           m.court_counts,
+           d.price_count::INTEGER,
+           COALESCE(k.price_sketch, '{}'::JSONB)
+    FROM days d
+    JOIN top_courts c ON c.date_posted = d.date_posted
+    JOIN court_maps m ON m.date_posted = d.date_posted
+    LEFT JOIN sketches k ON k.date_posted = d.date_posted
+    ORDER BY d.date_posted;
+$$;
+
+
+-- Recomputes and upserts daily_stats for [p_start, p_end] in one statement; returns the rows written.
+CREATE OR REPLACE FUNCTION refresh_daily_stats(p_start DATE, p_end DATE)
+RETURNS SETOF daily_stats
+LANGUAGE sql
+AS $$
+    INSERT INTO daily_stats AS s (
+        stat_date, total_count,
+        real_estate_count, vehicle_count, asset_count, bond_count,
+        stock_count, patent_count, electronics_count, other_count,
+        total_appraisal_price, avg_appraisal_price, max_appraisal_price,
+        top_court, total_views, court_counts, priced_count, price_sketch
+    )
+    SELECT * FROM compute_daily_stats(p_start, p_end)
+    ON CONFLICT (stat_date) DO UPDATE SET
+        total_count = EXCLUDED.total_count,
+        real_estate_count = EXCLUDED.real_estate_count,
+        vehicle_count = EXCLUDED.vehicle_count,
+        asset_count = EXCLUDED.asset_count,
+        bond_count = EXCLUDED.bond_count,
+        stock_count = EXCLUDED.stock_count,
+        patent_count = EXCLUDED.patent_count,
+        electronics_count = EXCLUDED.electronics_count,
+        other_count = EXCLUDED.other_count,
+        total_appraisal_price = EXCLUDED.total_appraisal_price,
+        avg_appraisal_price = EXCLUDED.avg_appraisal_price,
+        max_appraisal_price = EXCLUDED.max_appraisal_price,
+        top_court = EXCLUDED.top_court,
+        total_views = EXCLUDED.total_views,
+        court_counts = EXCLUDED.court_counts,
+        priced_count = EXCLUDED.priced_count,
+        price_sketch = EXCLUDED.price_sketch
+    RETURNING s.*;
+$$;
+
+
+-- Verify (last 7 days, read-only)
+SELECT * FROM compute_daily_stats(CURRENT_DATE - 6, CURRENT_DATE);
@@ -0,0 +1,27 @@
+-- Run this in Supabase SQL Editor to create the popular_auction_snapshots table
+-- Stores scheduled snapshots of the court auction popular-items list (PGJ155M00)
+-- written by: python scripts_auction/popular_items_scraper.py --snapshot
+
+CREATE TABLE IF NOT EXISTS popular_auction_snapshots (
+    id BIGSERIAL PRIMARY KEY,
+    captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    item_count INTEGER NOT NULL DEFAULT 0,
+    items JSONB NOT NULL DEFAULT '[]'      -- 정규화·순위 매겨진 목록 (minPrice, priceRatio 등 계산 필드 포함)
+);
+
+-- Enable Row Level Security
+ALTER TABLE popular_auction_snapshots ENABLE ROW LEVEL SECURITY;
+
+-- Allow public read access
+CREATE POLICY "Allow public read access on popular_auction_snapshots"
+ON popular_auction_snapshots FOR SELECT
+TO anon
+USING (true);
+
+-- Index for latest-snapshot lookups
+CREATE INDEX IF NOT EXISTS idx_popular_auction_snapshots_captured_at ON popular_auction_snapshots(captured_at DESC);
+
+-- Verify
+SELECT column_name, data_type 
+FROM information_schema.columns 
+WHERE table_name = 'popular_auction_snapshots';
@@ -0,0 +1,236 @@
+"""
+AI Summary Batch Mode (OpenAI Batch API)
+========================================
+Bulk (re-)summarisation of court notices, e.g. every real_estate notice after a prompt change.
+Prompts are built exactly like ai_report_generator.py builds them, written as JSONL, submitted
+through the Batch API (half the price, separate rate limits), and the results are applied back
+to court_notices and court_notices_history in bulk (notice_result_writer.py).
+
+Usage:
+    python scripts/ai_batch_summarizer.py submit --category real_estate --resummarize --limit 5000
+    python scripts/ai_batch_summarizer.py status batch_abc123
+    python scripts/ai_batch_summarizer.py apply batch_abc123 --wait
+    python scripts/ai_batch_summarizer.py run --limit 200 --fake     # dry run against the local fake endpoint
+
+--fake is a dry run: attachments are extracted without Vision OCR (and not stored in attachment_text),
+and the fake replies are printed instead of being written to the DB or the LLM cache.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import ai_report_generator as gen
+from fake_batch_api import FakeBatchAPI
+from llm_cache import request_key
+from paginated_select import PAGE_SIZE, stream_rows
+from notice_result_writer import NoticeResultWriter, result_row
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_MAX_REQUESTS = 50000          # Batch API limit per input file
+WRITE_CHUNK_SIZE = 500
+MANIFEST_DIR = os.path.join(gen.base_dir, '.cache', 'batches')
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def get_client(fake: bool):
+    return FakeBatchAPI() if fake else gen.openai_client
+
+
+def use_dry_run_extraction():
+    """--fake: no Vision OCR, and no OCR-less text saved to attachment_text for later real runs."""
+    gen.MAX_OCR_PAGES = 0
+    gen.text_store = None
+
+
+# ── 1. Select & Prepare ───────────────────────────────────────────
+def select_notices(categories: List[str], limit: int, resummarize: bool) -> List[Dict]:
+    def filters(query):
+        query = query.in_("category", categories)
+        return query if resummarize else query.is_("ai_summary", "null")
+
+    rows = stream_rows(gen.supabase, "court_notices", "id, site_id, source_type, title, category, department, file_info",
+                       filters=filters, page_size=min(PAGE_SIZE, limit))
+    return list(islice(rows, limit))
+
+
+def prepare_request(notice: Dict) -> Dict:
+    """Batch JSONL line plus the local state needed to apply its result."""
+    text = gen.extract_notice_text(notice)
+    rule_fields = gen.rule_based_fields(text)
+    messages = gen.build_summary_messages(notice['title'], notice.get('category', 'etc'),
+                                          notice.get('department', ''), text, rule_fields)
+    body = {"model": gen.SUMMARY_MODEL, "messages": messages, **gen.SUMMARY_PARAMS}
+    return {
+        'line': {"custom_id": notice['id'], "method": "POST", "url": BATCH_ENDPOINT, "body": body},
+        'state': {
+            'site_id': notice.get('site_id'),
+            'source_type': notice.get('source_type', 'notice'),
+            'title': notice['title'],
+            'category': notice.get('category'),
+            'rule_fields': rule_fields,
+            'cache_key': request_key(gen.SUMMARY_MODEL, gen.PROMPT_VERSION, messages, **gen.SUMMARY_PARAMS),
+        },
+    }
+
+
+def _manifest_path(batch_id: str) -> str:
+    return os.path.join(MANIFEST_DIR, f"{batch_id}.json")
+
+
+def submit(categories: List[str], limit: int, resummarize: bool, fake: bool, workers: int) -> List[str]:
+    notices = select_notices(categories, limit, resummarize)
+    print(f"📊 {len(notices)} notices selected ({', '.join(categories)}, resummarize={resummarize})")
+    if not notices:
+        return []
+    if fake:
+        use_dry_run_extraction()
+
+    # Attachment text mostly comes from the attachment_text store; new files are downloaded/extracted here
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prepared = list(pool.map(prepare_request, notices))
+
+    client = get_client(fake)
+    batch_ids = []
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    for start in range(0, len(prepared), BATCH_MAX_REQUESTS):
+        chunk = prepared[start:start + BATCH_MAX_REQUESTS]
+        jsonl = "\n".join(json.dumps(p['line'], ensure_ascii=False) for p in chunk) + "\n"
+        input_file = client.files.create(file=("summaries.jsonl", jsonl.encode('utf-8')), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+            metadata={"prompt_version": gen.PROMPT_VERSION},
+        )
+        with open(_manifest_path(batch.id), 'w', encoding='utf-8') as f:
+            json.dump({
+                'batch_id': batch.id,
+                'fake': fake,
+                'model': gen.SUMMARY_MODEL,
+                'prompt_version': gen.PROMPT_VERSION,
+                'submitted_at': time.time(),
+                'notices': {p['line']['custom_id']: p['state'] for p in chunk},
+            }, f, ensure_ascii=False)
+        batch_ids.append(batch.id)
+        print(f"📤 Submitted {batch.id}: {len(chunk)} requests ({len(jsonl.encode('utf-8')):,} bytes)")
+    return batch_ids
+
+
+# ── 2. Poll ───────────────────────────────────────────────────────
+def load_manifest(batch_id: str) -> Dict:
+    with open(_manifest_path(batch_id), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def wait_for_batch(client, batch_id: str, poll_interval: float, wait: bool):
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(f"⏳ {batch_id}: {batch.status} ({counts.completed}/{counts.total} done, {counts.failed} failed)")
+        if batch.status in TERMINAL_STATUSES or not wait:
+            return batch
+        time.sleep(poll_interval)
+
+
+# ── 3. Apply ──────────────────────────────────────────────────────
+def parse_results(output_text: str, manifest: Dict) -> Dict:
+    """{notice_id: update_data} for successful lines; real (non-fake) results are also stored in the LLM cache."""
+    updates = {}
+    failed = 0
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        notice_id = record.get('custom_id')
+        state = manifest['notices'].get(notice_id)
+        response = record.get('response') or {}
+        if state is None or record.get('error') or response.get('status_code') != 200:
+            failed += 1
+            continue
+        try:
+            body = response['body']
+            data = json.loads(body['choices'][0]['message']['content'])
+        except (KeyError, IndexError, ValueError):
+            failed += 1
+            continue
+        if 'summary' not in data:
+            failed += 1
+            continue
+
+        if gen.llm_cache and not manifest['fake']:
+            usage = body.get('usage') or {}
+            gen.llm_cache.put(state['cache_key'], manifest['model'], manifest['prompt_version'], data,
+                              SimpleNamespace(**usage))
+        updates[notice_id] = gen.build_update_data({**data, **state['rule_fields']})
+
+    if failed:
+        print(f"  ⚠️ {failed} result lines failed or were unparseable")
+    return updates
+
+
+def apply_results(batch_id: str, wait: bool, poll_interval: float, fake: Optional[bool] = None) -> Dict:
+    manifest = load_manifest(batch_id)
+    client = get_client(manifest['fake'] if fake is None else fake)
+    batch = wait_for_batch(client, batch_id, poll_interval, wait)
+    if batch.status != 'completed' or not batch.output_file_id:
+        print(f"❌ Batch {batch_id} is {batch.status}; nothing applied")
+        return {'applied': 0, 'status': batch.status}
+
+    updates = parse_results(client.files.content(batch.output_file_id).text, manifest)
+    total = len(manifest['notices'])
+
+    if manifest['fake']:
+        for notice_id, update_data in updates.items():
+            print(f"  🧪 {notice_id} [{manifest['notices'][notice_id]['title'][:30]}] {update_data.get('ai_summary', '')[:60]}")
+        print(f"🧪 Dry run: {len(updates)}/{total} fake summaries from {batch_id} parsed, nothing written")
+        return {'applied': 0, 'parsed': len(updates), 'failed': total - len(updates), 'status': batch.status}
+
+    rows = [result_row({'id': notice_id, **manifest['notices'][notice_id]}, update_data)
+            for notice_id, update_data in updates.items()]
+    applied = len(NoticeResultWriter(gen.supabase, chunk_size=WRITE_CHUNK_SIZE).write(rows))
+    print(f"💾 Applied {applied}/{total} summaries from {batch_id}")
+    return {'applied': applied, 'failed': total - applied, 'status': batch.status}
+
+
+# ── CLI Entry Point ───────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk AI summaries through the OpenAI Batch API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("submit", "run"):
+        p = sub.add_parser(name)
+        p.add_argument("--category", action="append", help="Category to include (repeatable, default: all target categories)")
+        p.add_argument("--limit", type=int, default=1000, help="Maximum notices (default: 1000)")
+        p.add_argument("--resummarize", action="store_true", help="Include notices that already have a summary")
+        p.add_argument("--workers", type=int, default=gen.DOWNLOAD_CONCURRENCY, help="Parallel text preparation")
+        p.add_argument("--fake", action="store_true", help="Dry run against the local fake batch endpoint (no API cost, no OCR, nothing written)")
+        p.add_argument("--poll-interval", type=float, default=60.0)
+
+    for name in ("status", "apply"):
+        p = sub.add_parser(name)
+        p.add_argument("batch_id")
+        p.add_argument("--wait", action="store_true", help="Poll until the batch finishes")
+        p.add_argument("--poll-interval", type=float, default=60.0)
+
+    args = parser.parse_args()
+
+    if args.command in ("submit", "run"):
+        categories = args.category or gen.TARGET_CATEGORIES
+        batch_ids = submit(categories, args.limit, args.resummarize, args.fake, args.workers)
+        if args.command == "run":
+            for batch_id in batch_ids:
+                apply_results(batch_id, wait=True, poll_interval=args.poll_interval)
+    elif args.command == "status":
+        manifest = load_manifest(args.batch_id)
+        wait_for_batch(get_client(manifest['fake']), args.batch_id, args.poll_interval, args.wait)
+    elif args.command == "apply":
+        stats = apply_results(args.batch_id, wait=args.wait, poll_interval=args.poll_interval)
+        if stats.get('status') != 'completed':
+            sys.exit(1)
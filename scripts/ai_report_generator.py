@@ -7,6 +7,7 @@ and generates AI analysis reports using GPT-4o-mini.
 Usage:
     python scripts/ai_report_generator.py          # Process all unanalyzed notices
     python scripts/ai_report_generator.py --limit 5  # Process up to 5 notices
+    python scripts/ai_report_generator.py --limit 200 --llm-concurrency 8  # Wider async pipeline
 """
 
 import os
@@ -14,19 +15,36 @@ import sys
 import time
 import json
 import base64
+import random
+import asyncio
 import tempfile
+import threading
 import argparse
+import multiprocessing
 import traceback
-from typing import Optional, List, Dict
-from urllib.parse import quote
+from datetime import date, datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, List, Dict, Union
+from urllib.parse import quote, urlsplit
 
 import requests
-import pdfplumber
 import fitz  # pymupdf
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from attachment_cache import AttachmentCache
+from attachment_text_store import AttachmentTextStore, content_hash
+from llm_cache import LLMCache, request_key
+from notice_field_extractor import extract_notice_fields
+from text_windowing import select_relevant_text
+from notice_lease_queue import NoticeLeaseQueue, default_worker_id
+from notice_scheduler import prioritize
+from notice_result_writer import NoticeResultWriter, result_row
+import ai_telemetry
+from ai_telemetry import TelemetryLedger
+from pdf_text_extractor import extract_tiered, open_document, render_page_for_ocr
+
 # ── Environment Setup ──────────────────────────────────────────────
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(base_dir, '.env.local'))
@@ -44,6 +62,8 @@ if not OPENAI_API_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Retries are handled by call_llm_with_retry so that Retry-After can be honoured across the whole pipeline
+async_openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
 
 # Target categories for AI report generation
 # Processing all categories to provide rich data for the weekly trend report
@@ -51,14 +71,83 @@ TARGET_CATEGORIES = ['real_estate', 'vehicle', 'asset', 'bond', 'stock', 'patent
 
 # Minimum text length to consider text extraction successful
 MIN_TEXT_LENGTH = 50
+# Scanned pages sent to Vision OCR per attachment
+MAX_OCR_PAGES = 5
+# Concurrent Vision requests per attachment, and page image encoding ('jpeg' or 'png')
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "4"))
+OCR_IMAGE_FORMAT = os.getenv("OCR_IMAGE_FORMAT", "jpeg")
+
+SUMMARY_MODEL = "gpt-4o-mini"
+# Bump when PROMPTS / FALLBACK_PROMPT / SUMMARY_SYSTEM_PROMPT change, so cached responses are not reused
+PROMPT_VERSION = "2025-01-v2"
+# Token budget for attachment text in the summary prompt (most relevant blocks are kept, see text_windowing.py)
+SUMMARY_TEXT_TOKENS = int(os.getenv("SUMMARY_TEXT_TOKENS", "4000"))
+SUMMARY_PARAMS = {"response_format": {"type": "json_object"}, "max_tokens": 1500, "temperature": 0.3}
+SUMMARY_SYSTEM_PROMPT = "당신은 법원 회생·파산 전문 AI 데이터 추출기입니다. 반드시 지정된 형식의 유효한 JSON 객체를 반환하세요."
+
+# Async pipeline defaults (see process_notices_async)
+DOWNLOAD_CONCURRENCY = 4    # Simultaneous attachment downloads from the court file server
+EXTRACT_WORKERS = 2         # Processes for PDF text extraction (CPU bound)
+LLM_CONCURRENCY = 4         # In-flight chat completion requests
+DB_WRITE_BATCH_SIZE = 50    # Results buffered before a DB flush (one apply_ai_summaries call)
+LLM_MAX_RETRIES = 5
+SCHEDULER_WINDOW_FACTOR = 5  # Pending notices scored per notice processed
+
+# Simultaneous connections to one file server (all attachments of a notice are fetched in parallel)
+PER_HOST_CONNECTIONS = int(os.getenv("PER_HOST_CONNECTIONS", "4"))
+
+# Attachments are handled as in-memory bytes; only ones larger than this are spilled to a
+# temp file (keeps huge PDFs out of memory and out of the extraction pool's IPC pipe)
+IN_MEMORY_MAX_BYTES = 32 * 1024 * 1024
+
+# Local download cache keyed by server_filename (set to None via --no-download-cache)
+attachment_cache: Optional[AttachmentCache] = AttachmentCache()
+
+# Extracted text per attachment content hash (attachment_text table; None via --no-text-store)
+text_store: Optional[AttachmentTextStore] = AttachmentTextStore(supabase)
+
+# Summary responses keyed by model + prompt version + prompt hash (None via --no-llm-cache)
+llm_cache: Optional[LLMCache] = LLMCache()
+
+# Per-notice cost/latency rows (None via --no-telemetry; report: python scripts/ai_telemetry.py).
+# Mirrored to Supabase with --telemetry-mirror, or AI_TELEMETRY_MIRROR=1 when run from scraper.py
+telemetry_ledger: Optional[TelemetryLedger] = TelemetryLedger(
+    supabase_client=supabase if os.getenv("AI_TELEMETRY_MIRROR") == "1" else None)
+RUN_ID = default_worker_id()
+
+# Buffered results go to court_notices + court_notices_history through apply_ai_summaries()
+result_writer = NoticeResultWriter(supabase)
 
 
 # ── 1. File Download ───────────────────────────────────────────────
-def download_attachment(server_filename: str, original_filename: str, path: str = '011') -> Optional[str]:
+# Keep-alive session shared by download threads, plus a connection cap per host
+http_session = requests.Session()
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=PER_HOST_CONNECTIONS))
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_CONNECTIONS)
+        return _host_slots[host]
+
+
+def fetch_attachment_bytes(server_filename: str, original_filename: str, path: str = '011') -> Optional[bytes]:
     """
-    Downloads an attachment from the court file server.
-    Returns the local temporary file path, or None on failure.
+    Returns the attachment content, from the local download cache when possible,
+    otherwise from the court file server (and stores it in the cache).
+    Returns None on failure.
     """
+    if attachment_cache:
+        cached = attachment_cache.get(server_filename)
+        if cached is not None:
+            print(f"  📦 Cache hit: {original_filename} ({len(cached):,} bytes)")
+            ai_telemetry.add(cache_hits=1)
+            return cached
+    
     try:
         encoded_server = quote(server_filename)
         
@@ -72,9 +161,11 @@ def download_attachment(server_filename: str, original_filename: str, path: str
         court_url = f"https://file.scourt.go.kr/AttachDownload?path={path}&file={encoded_server}&downFile={encoded_original}"
         
         print(f"  📥 Downloading: {original_filename}")
-        response = requests.get(court_url, verify=False, timeout=30, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        with _host_slot(court_url), ai_telemetry.timer() as t:
+            response = http_session.get(court_url, verify=False, timeout=30, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+        ai_telemetry.add(download_bytes=len(response.content), download_ms=t.ms)
         
         if response.status_code != 200:
             print(f"  ❌ Download failed: HTTP {response.status_code}")
@@ -84,110 +175,159 @@ def download_attachment(server_filename: str, original_filename: str, path: str
             print(f"  ❌ Downloaded file too small ({len(response.content)} bytes)")
             return None
         
-        # Determine file extension from original filename
-        ext = os.path.splitext(original_filename)[1].lower() or '.pdf'
-        
-        # Save to temp file
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-        tmp.write(response.content)
-        tmp.close()
+        if attachment_cache:
+            try:
+                attachment_cache.put(server_filename, response.content)
+            except Exception as e:
+                print(f"  ⚠️ Download cache write failed: {e}")
         
-        print(f"  ✅ Downloaded: {len(response.content):,} bytes → {tmp.name}")
-        return tmp.name
+        return response.content
         
     except Exception as e:
         print(f"  ❌ Download error: {e}")
         return None
 
 
-# ── 2. Text Extraction ────────────────────────────────────────────
-def extract_text_from_pdf(file_path: str) -> str:
+def download_attachment(server_filename: str, original_filename: str, path: str = '011') -> Optional[str]:
     """
-    Extracts text from a PDF file.
-    First tries pdfplumber (for text-based PDFs).
-    Falls back to pymupdf image extraction + OpenAI Vision (for image-based PDFs).
+    Downloads an attachment from the court file server.
+    Returns the local temporary file path, or None on failure.
+    (The pipeline itself works on fetch_attachment_bytes; this is kept for tools that need a file.)
     """
-    text = ""
+    content = fetch_attachment_bytes(server_filename, original_filename, path)
+    if content is None:
+        return None
     
-    # Strategy 1: pdfplumber (text-based PDF)
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception as e:
-        print(f"  ⚠️ pdfplumber failed: {e}")
+    # Determine file extension from original filename
+    ext = os.path.splitext(original_filename)[1].lower() or '.pdf'
     
-    # If we got enough text, return it
-    if len(text.strip()) >= MIN_TEXT_LENGTH:
-        print(f"  📄 Text extracted (pdfplumber): {len(text)} chars")
-        return text.strip()
+    # Save to temp file
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
+    tmp.write(content)
+    tmp.close()
     
-    # Strategy 2: Image-based PDF → render pages as images → OpenAI Vision
-    print(f"  🖼️ Text too short ({len(text.strip())} chars), trying image-based OCR via GPT Vision...")
+    print(f"  ✅ Downloaded: {len(content):,} bytes → {tmp.name}")
+    return tmp.name
+
+
+# ── 2. Text Extraction ────────────────────────────────────────────
+def extract_pdf(source: Union[bytes, str]) -> Dict:
+    """
+    Extracts text from a PDF given as in-memory bytes (or a file path), page by page:
+    PyMuPDF text for every page, pdfplumber only for table-like pages, and
+    OpenAI Vision only for image-only (scanned) pages. See pdf_text_extractor.py.
+    Returns {'text', 'method', 'page_count', 'ocr_pages', 'ocr_skipped', 'tiers', 'ocr_usage', 'elapsed_ms'}.
+    """
+    started = time.perf_counter()
+    # Vision token usage travels back in the result: this runs in an extraction worker process,
+    # where the notice's telemetry record is not reachable
+    ocr_usage = {'prompt_tokens': 0, 'completion_tokens': 0}
     try:
-        text = extract_text_from_image_pdf(file_path)
-        if text and len(text.strip()) >= MIN_TEXT_LENGTH:
-            print(f"  📄 Text extracted (Vision OCR): {len(text)} chars")
-            return text.strip()
+        result = extract_tiered(source, ocr_pages=lambda doc, pages: ocr_pdf_pages(doc, pages, ocr_usage),
+                                max_ocr_pages=MAX_OCR_PAGES)
     except Exception as e:
-        print(f"  ⚠️ Vision OCR failed: {e}")
-    
-    return text.strip()
+        print(f"  ⚠️ PDF extraction failed: {e}")
+        return {'text': "", 'method': 'fitz', 'page_count': 0, 'ocr_pages': 0, 'ocr_skipped': 0, 'tiers': {},
+                'ocr_usage': ocr_usage, 'elapsed_ms': (time.perf_counter() - started) * 1000}
+    result['ocr_usage'] = ocr_usage
+    result['elapsed_ms'] = (time.perf_counter() - started) * 1000
+
+    tiers = result['tiers']
+    skipped = f", {result['ocr_skipped']} blank/duplicate skipped" if result['ocr_skipped'] else ""
+    print(f"  📄 Text extracted ({result['method']}): {len(result['text'])} chars "
+          f"[fitz {tiers['fitz']} / pdfplumber {tiers['pdfplumber']} / vision {tiers['vision']} pages{skipped}]")
+    return result
+
+
+def extract_text_from_pdf(source: Union[bytes, str]) -> str:
+    return extract_pdf(source)['text']
+
+
+def _stored_text(record: Optional[Dict], original_filename: str) -> Optional[str]:
+    if record:
+        ai_telemetry.add(stored_text_hits=1)
+        print(f"  🗂️ Stored text: {original_filename} ({record.get('extraction_method')}, {record.get('char_count')} chars)")
+        return record.get('text') or ""
+    return None
+
+
+def _note_extraction(result: Dict):
+    ai_telemetry.note_extraction(result['method'], result.get('elapsed_ms', 0), result['page_count'],
+                                 result.get('ocr_pages', 0), len(result['text']))
+    ocr_usage = result.get('ocr_usage') or {}
+    ai_telemetry.add(ocr_prompt_tokens=ocr_usage.get('prompt_tokens', 0),
+                     ocr_completion_tokens=ocr_usage.get('completion_tokens', 0))
+
+
+def _save_extraction(sha256: str, file_entry: Dict, result: Dict):
+    # Empty results are not stored so a transient OCR failure is retried next run
+    if text_store and result['text']:
+        text_store.put(sha256, file_entry.get('server_filename', ''), file_entry.get('original_filename', ''),
+                       result['method'], result['page_count'], result['text'])
 
 
-def extract_text_from_image_pdf(file_path: str, max_pages: int = 5) -> str:
+def _ocr_image(page_num: int, image: bytes, mime: str):
+    """(page text or None, response usage or None)"""
+    img_b64 = base64.b64encode(image).decode('utf-8')
+    try:
+        response = openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "이 이미지는 한국 법원의 자산매각 공고 첨부파일 중 한 페이지입니다. 이미지에 있는 모든 한국어 텍스트를 정확하게 그대로 추출해주세요. 표가 있으면 표 형식도 유지해주세요. 텍스트만 반환하고 다른 설명은 불필요합니다."
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{mime};base64,{img_b64}",
+                                "detail": "high"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=2000
+        )
+        return response.choices[0].message.content, response.usage
+    except Exception as e:
+        print(f"  ⚠️ Vision OCR page {page_num + 1} failed: {e}")
+        return None, None
+
+
+def ocr_pdf_pages(doc, page_numbers: List[int], usage: Optional[Dict] = None) -> Dict[int, str]:
     """
-    For image-based PDFs: renders pages as images using pymupdf,
-    then uses OpenAI GPT-4o-mini Vision to extract text.
+    Renders the given pages of an open pymupdf document (adaptive zoom, JPEG by default)
+    and OCRs them with OpenAI GPT-4o-mini Vision, up to OCR_CONCURRENCY pages at a time.
+    Rendering stays on this thread (pymupdf documents are not thread-safe); only the
+    API round trips run concurrently. 429s are retried by the OpenAI client.
+    Token usage is added to `usage` ({'prompt_tokens', 'completion_tokens'}) when given.
     """
-    doc = fitz.open(file_path)
-    all_text = []
-    pages_to_process = min(len(doc), max_pages)
-    
-    for page_num in range(pages_to_process):
-        page = doc[page_num]
-        # Render page as image (2x zoom for better OCR quality)
-        mat = fitz.Matrix(2, 2)
-        pix = page.get_pixmap(matrix=mat)
-        img_bytes = pix.tobytes("png")
-        img_b64 = base64.b64encode(img_bytes).decode('utf-8')
-        
-        try:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "이 이미지는 한국 법원의 자산매각 공고 첨부파일 중 한 페이지입니다. 이미지에 있는 모든 한국어 텍스트를 정확하게 그대로 추출해주세요. 표가 있으면 표 형식도 유지해주세요. 텍스트만 반환하고 다른 설명은 불필요합니다."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{img_b64}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000
-            )
-            page_text = response.choices[0].message.content
+    images = {n: render_page_for_ocr(doc[n], OCR_IMAGE_FORMAT) for n in page_numbers}
+    texts = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(OCR_CONCURRENCY, len(images)))) as pool:
+        futures = {n: pool.submit(_ocr_image, n, image, mime) for n, (image, mime) in images.items()}
+        for page_num, future in futures.items():
+            page_text, page_usage = future.result()
             if page_text:
-                all_text.append(page_text)
-        except Exception as e:
-            print(f"  ⚠️ Vision OCR page {page_num + 1} failed: {e}")
-        
-        # Rate limiting: small delay between API calls
-        time.sleep(0.5)
-    
-    doc.close()
-    return "\n\n".join(all_text)
+                texts[page_num] = page_text
+            if usage is not None and page_usage is not None:
+                usage['prompt_tokens'] += getattr(page_usage, 'prompt_tokens', 0) or 0
+                usage['completion_tokens'] += getattr(page_usage, 'completion_tokens', 0) or 0
+    return texts
+
+
+def extract_text_from_image_pdf(source: Union[bytes, str], max_pages: int = MAX_OCR_PAGES) -> str:
+    """OCRs the first max_pages pages regardless of their text layer."""
+    doc = open_document(source)
+    try:
+        texts = ocr_pdf_pages(doc, list(range(min(len(doc), max_pages))))
+    finally:
+        doc.close()
+    return "\n\n".join(texts[n] for n in sorted(texts))
 
 
 # ── 3. AI Summary Generation ──────────────────────────────────────
@@ -202,10 +342,7 @@ PROMPTS = {
 위 첨부파일 내용을 분석하여, 반드시 아래 JSON 양식에 맞추어 응답을 생성해주세요. 다른 설명 없이 오직 JSON만 포함해야 합니다.
 
 {{
-  "summary": "1. **매각 대상**: 소재지, 종류, 면적 등\\n2. **매각 가격**: 최저가, 감정가, 회차별 가격 등\\n3. **입찰 방법**: 방식, 기한, 장소 등\\n4. **보증금 및 대금 납부**: 보증금, 납부 기한 등\\n5. **매각 조건 및 유의사항**: 인수 조건 등\\n6. **문의처**: 담당자 번호 등\\n(※ 마크다운 텍스트 포맷 유지, 헤딩 기호 사용 금지, 원문 기반 사실만 요약)",
-  "minimum_price": "문서상 확인되는 최저매각가격 중 가장 저렴한 가격, 혹은 1회차 최저입찰가격을 숫자로만 기재 (예: 1000000). 정보가 없으면 null",
-  "appraised_price": "감정가를 숫자로만 기재 (예: 2500000). 정보가 없으면 null",
-  "auction_date": "진행 예정인 가장 빠른 입찰 마감일 또는 매각 기일을 YYYY-MM-DD 형식으로 기재. 정보가 없으면 null"
+  "summary": "1. **매각 대상**: 소재지, 종류, 면적 등\\n2. **매각 가격**: 최저가, 감정가, 회차별 가격 등\\n3. **입찰 방법**: 방식, 기한, 장소 등\\n4. **보증금 및 대금 납부**: 보증금, 납부 기한 등\\n5. **매각 조건 및 유의사항**: 인수 조건 등\\n6. **문의처**: 담당자 번호 등\\n(※ 마크다운 텍스트 포맷 유지, 헤딩 기호 사용 금지, 원문 기반 사실만 요약)"{fields}
 }}""",
 
     "vehicle": """아래는 법원 회생·파산 자산매각 공고의 첨부파일에서 추출한 차량/중기 관련 원문 텍스트입니다.
@@ -218,13 +355,24 @@ PROMPTS = {
 위 첨부파일 내용을 분석하여, 반드시 아래 JSON 양식에 맞추어 응답을 생성해주세요. 다른 설명 없이 오직 JSON만 포함해야 합니다.
 
 {{
-  "summary": "1. **매각 대상**: 차종, 차량번호, 연식 등\\n2. **매각 가격**: 최저매각가격, 감정가 등\\n3. **차량 상태**: 검사, 사고, 압류 현황 등\\n4. **입찰 방법**: 입찰 기한, 장소 등\\n5. **보증금 및 대금 납부**: 보증금, 잔금 기한 등\\n6. **매각 조건**: 명의이전 등\\n7. **문의처**: 담당자 연락처\\n(※ 마크다운 텍스트 포맷 유지, 헤딩 기호 사용 금지, 원문 기반 사실만 요약)",
-  "minimum_price": "문서상 확인되는 최저매각가격 숫자로 기재. 정보가 없으면 null",
-  "appraised_price": "감정가 숫자로 기재. 정보가 없으면 null",
-  "auction_date": "진행 예정인 입찰 기일 또는 마감일을 YYYY-MM-DD 형식으로 기재. 정보가 없으면 null"
+  "summary": "1. **매각 대상**: 차종, 차량번호, 연식 등\\n2. **매각 가격**: 최저매각가격, 감정가 등\\n3. **차량 상태**: 검사, 사고, 압류 현황 등\\n4. **입찰 방법**: 입찰 기한, 장소 등\\n5. **보증금 및 대금 납부**: 보증금, 잔금 기한 등\\n6. **매각 조건**: 명의이전 등\\n7. **문의처**: 담당자 연락처\\n(※ 마크다운 텍스트 포맷 유지, 헤딩 기호 사용 금지, 원문 기반 사실만 요약)"{fields}
 }}"""
 }
 
+# Structured fields requested from the LLM; ones already found by notice_field_extractor are left out
+FIELD_PROMPTS = {
+    "real_estate": {
+        "minimum_price": "문서상 확인되는 최저매각가격 중 가장 저렴한 가격, 혹은 1회차 최저입찰가격을 숫자로만 기재 (예: 1000000). 정보가 없으면 null",
+        "appraised_price": "감정가를 숫자로만 기재 (예: 2500000). 정보가 없으면 null",
+        "auction_date": "진행 예정인 가장 빠른 입찰 마감일 또는 매각 기일을 YYYY-MM-DD 형식으로 기재. 정보가 없으면 null",
+    },
+    "vehicle": {
+        "minimum_price": "문서상 확인되는 최저매각가격 숫자로 기재. 정보가 없으면 null",
+        "appraised_price": "감정가 숫자로 기재. 정보가 없으면 null",
+        "auction_date": "진행 예정인 입찰 기일 또는 마감일을 YYYY-MM-DD 형식으로 기재. 정보가 없으면 null",
+    },
+}
+
 # Fallback prompt when no attachment text could be extracted
 FALLBACK_PROMPT = """아래는 법원 회생·파산 자산매각 공고의 기본 정보입니다.
 첨부파일 내용을 추출하지 못하여, 공고 제목에서 파악 가능한 정보만 정리합니다.
@@ -243,19 +391,26 @@ FALLBACK_PROMPT = """아래는 법원 회생·파산 자산매각 공고의 기
 }}"""
 
 
-def generate_ai_summary(title: str, category: str, department: str, extracted_text: str) -> Optional[Dict]:
+def build_summary_messages(title: str, category: str, department: str, extracted_text: str,
+                           known_fields: Optional[Dict] = None) -> List[Dict]:
     """
-    Generates an AI analysis report & structured data for a court notice using GPT-4o-mini JSON mode.
+    Builds the chat messages for a notice summary.
+    Uses the category prompt when attachment text is available, the title-only fallback otherwise.
+    Fields in known_fields (found by the rule extractor) are not requested from the model.
     """
     category_name = '부동산' if category == 'real_estate' else '차량/중기'
     
     # Choose prompt based on whether we have extracted text
     if extracted_text and len(extracted_text) >= MIN_TEXT_LENGTH:
         prompt_template = PROMPTS.get(category, PROMPTS['real_estate'])
+        field_prompts = FIELD_PROMPTS.get(category, FIELD_PROMPTS['real_estate'])
+        fields = "".join(f',\n  "{name}": "{desc}"' for name, desc in field_prompts.items()
+                         if name not in (known_fields or {}))
         prompt = prompt_template.format(
             title=title,
             department=department or '정보 없음',
-            extracted_text=extracted_text[:6000]  # Limit to ~6000 chars to control token usage
+            extracted_text=select_relevant_text(extracted_text, SUMMARY_TEXT_TOKENS),
+            fields=fields
         )
     else:
         prompt = FALLBACK_PROMPT.format(
@@ -264,91 +419,117 @@ def generate_ai_summary(title: str, category: str, department: str, extracted_te
             category_name=category_name
         )
     
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _cached_summary(messages: List[Dict]):
+    """(cache key, cached data or None); the key is None when the cache is disabled."""
+    if not llm_cache:
+        return None, None
+    key = request_key(SUMMARY_MODEL, PROMPT_VERSION, messages, **SUMMARY_PARAMS)
+    cached = llm_cache.get(key)
+    # Entries without a summary (cached before replies were checked) count as misses
+    return key, cached['data'] if cached and _is_summary(cached['data']) else None
+
+
+def _is_summary(data) -> bool:
+    """The check a reply must pass to be used as a result (and so to be cached)."""
+    return isinstance(data, dict) and 'summary' in data
+
+
+def _store_summary(key: Optional[str], data: Dict, usage):
+    # A parseable reply without a summary is not cached: the next run asks the model again
+    if llm_cache and key and _is_summary(data):
+        llm_cache.put(key, SUMMARY_MODEL, PROMPT_VERSION, data, usage)
+
+
+def _note_llm_usage(response, elapsed_ms: float):
+    usage = response.usage
+    ai_telemetry.add(prompt_tokens=getattr(usage, 'prompt_tokens', 0),
+                     completion_tokens=getattr(usage, 'completion_tokens', 0),
+                     llm_ms=elapsed_ms)
+
+
+def rule_based_fields(extracted_text: str) -> Dict:
+    """Price/date fields found deterministically in the attachment text (see notice_field_extractor)."""
+    if not extracted_text or len(extracted_text) < MIN_TEXT_LENGTH:
+        return {}
+    return extract_notice_fields(extracted_text)
+
+
+def generate_ai_summary(title: str, category: str, department: str, extracted_text: str) -> Optional[Dict]:
+    """Blocking wrapper of generate_ai_summary_async for one-off scripts (runs its own event loop)."""
+    return asyncio.run(generate_ai_summary_async(title, category, department, extracted_text))
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's Retry-After when given, else jittered exponential backoff."""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 0.5)
+            except ValueError:
+                pass
+    return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+async def call_llm_with_retry(**kwargs):
+    """chat.completions.create on the async client, retrying rate limits and transient errors."""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            return await async_openai_client.chat.completions.create(**kwargs)
+        except (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError) as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"  ⏳ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{LLM_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+
+async def generate_ai_summary_async(title: str, category: str, department: str, extracted_text: str) -> Optional[Dict]:
+    """
+    Generates an AI analysis report & structured data for a court notice using GPT-4o-mini JSON mode.
+    Prices and dates the rule extractor finds are filled directly and not asked of the model.
+    An identical prompt seen before is answered from the local LLM cache.
+    """
+    rule_fields = rule_based_fields(extracted_text)
+    messages = build_summary_messages(title, category, department, extracted_text, rule_fields)
+    cache_key, cached = _cached_summary(messages)
+    if cached is not None:
+        print(f"  ♻️ [{title[:30]}] Cached AI summary reused")
+        ai_telemetry.tag(llm_cached=1)
+        return {**cached, **rule_fields}
+    if rule_fields:
+        print(f"  📐 [{title[:30]}] Rule-extracted: {', '.join(rule_fields)}")
+    
     try:
-        print(f"  🤖 Generating AI summary & extracting structured data...")
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "당신은 법원 회생·파산 전문 AI 데이터 추출기입니다. 반드시 지정된 형식의 유효한 JSON 객체를 반환하세요."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.3
-        )
+        with ai_telemetry.timer() as t:
+            response = await call_llm_with_retry(
+                model=SUMMARY_MODEL,
+                messages=messages,
+                **SUMMARY_PARAMS
+            )
+        _note_llm_usage(response, t.ms)
         
-        content = response.choices[0].message.content
-        data = json.loads(content)
+        data = json.loads(response.choices[0].message.content)
         tokens_used = response.usage.total_tokens if response.usage else 0
-        print(f"  ✅ Data extracted successfully: {len(str(data))} chars (tokens: {tokens_used})")
-        return data
+        print(f"  ✅ [{title[:30]}] Data extracted (tokens: {tokens_used})")
+        _store_summary(cache_key, data, response.usage)
+        return {**data, **rule_fields}
         
     except Exception as e:
-        print(f"  ❌ AI extraction failed: {e}")
+        print(f"  ❌ [{title[:30]}] AI extraction failed: {e}")
         return None
 
 
 # ── 4. Main Pipeline ──────────────────────────────────────────────
-def process_single_notice(notice: Dict) -> bool:
-    """
-    Processes a single notice: downloads attachments, extracts text,
-    generates AI summary, and saves to database.
-    Returns True if successful.
-    """
-    notice_id = notice['id']
-    title = notice['title']
-    category = notice.get('category', 'etc')
-    department = notice.get('department', '')
-    file_info = notice.get('file_info')
-    
-    print(f"\n{'='*60}")
-    print(f"📋 Processing: {title}")
-    print(f"   Category: {category} | Dept: {department}")
-    
-    # Skip non-target categories
-    if category not in TARGET_CATEGORIES:
-        print(f"  ⏭️ Skipping: category '{category}' not in target list")
-        return False
-    
-    # Extract text from attachments
-    extracted_text = ""
-    temp_files = []
-    
-    if file_info and isinstance(file_info, list) and len(file_info) > 0:
-        # Try to download and extract text from each PDF attachment
-        for file_entry in file_info:
-            server_fn = file_entry.get('server_filename', '')
-            original_fn = file_entry.get('original_filename', '')
-            ext = os.path.splitext(original_fn)[1].lower()
-            
-            # Only process PDF files for now
-            if ext not in ['.pdf', '']:
-                print(f"  ⏭️ Skipping non-PDF file: {original_fn}")
-                continue
-            
-            local_path = download_attachment(server_fn, original_fn)
-            if local_path:
-                temp_files.append(local_path)
-                file_text = extract_text_from_pdf(local_path)
-                if file_text:
-                    extracted_text += f"\n--- {original_fn} ---\n{file_text}\n"
-    else:
-        print(f"  ℹ️ No attachments found for this notice")
-    
-    # Generate AI summary
-    ai_data = generate_ai_summary(title, category, department, extracted_text)
-    
-    # Clean up temp files
-    for tmp_path in temp_files:
-        try:
-            os.unlink(tmp_path)
-        except:
-            pass
-    
-    if not ai_data or 'summary' not in ai_data:
-        print(f"  ❌ Failed to generate summary for {notice_id}")
-        return False
-        
+def build_update_data(ai_data: Dict) -> Dict:
+    """Maps the model's JSON output to court_notices columns."""
     summary = ai_data.get('summary', '')
     min_price_raw = ai_data.get('minimum_price')
     app_price_raw = ai_data.get('appraised_price')
@@ -367,81 +548,378 @@ def process_single_notice(notice: Dict) -> bool:
         digits = ''.join(filter(str.isdigit, str(app_price_raw)))
         if digits: update_data["appraised_price"] = digits
         
-    if auc_date and isinstance(auc_date, str) and "-" in auc_date:
-        update_data["auction_date"] = auc_date
+    if auc_date and isinstance(auc_date, str):
+        # A date Postgres can't cast would fail the whole write-back chunk; drop it instead
+        try:
+            update_data["auction_date"] = date.fromisoformat(auc_date.strip()).isoformat()
+        except ValueError:
+            print(f"  ⚠️ Ignoring malformed auction_date from model: {auc_date!r}")
+
+    return update_data
+
+
+def save_notice_result(notice: Dict, update_data: Dict) -> bool:
+    """Writes one AI result to court_notices and its court_notices_history mirror (one round trip)."""
+    if result_writer.write([result_row(notice, update_data)]):
+        print(f"  💾 Saved AI summary & structured data to DB for notice {notice['id']}")
+        return True
+    print(f"  ❌ DB update returned no data for {notice['id']}")
+    return False
+
+
+def _pdf_attachments(file_info) -> List[Dict]:
+    """Attachment entries worth downloading (PDFs, or files without an extension)."""
+    if not (file_info and isinstance(file_info, list)):
+        return []
+    entries = []
+    for file_entry in file_info:
+        original_fn = file_entry.get('original_filename', '')
+        ext = os.path.splitext(original_fn)[1].lower()
+        # Only process PDF files for now
+        if ext not in ['.pdf', '']:
+            print(f"  ⏭️ Skipping non-PDF file: {original_fn}")
+            continue
+        entries.append(file_entry)
+    return entries
+
+
+def _join_attachment_texts(entries: List[Dict], texts: List[str]) -> str:
+    extracted_text = ""
+    for file_entry, file_text in zip(entries, texts):
+        if file_text:
+            extracted_text += f"\n--- {file_entry.get('original_filename', '')} ---\n{file_text}\n"
+    return extracted_text
+
+
+def _write_telemetry(record: Dict, outcome: str, error: Optional[str] = None):
+    if telemetry_ledger:
+        try:
+            telemetry_ledger.write(ai_telemetry.finish(record, outcome, error))
+        except Exception as e:
+            print(f"  ⚠️ Telemetry write failed: {e}")
+
+
+def _init_extract_worker():
+    """Extraction runs in worker processes; give each one its own OpenAI client (used by Vision OCR)."""
+    global openai_client
+    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+
+def _spill_to_temp_file(content: bytes, original_filename: str) -> str:
+    ext = os.path.splitext(original_filename)[1].lower() or '.pdf'
+    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
+        tmp.write(content)
+    return tmp.name
 
-    # Save to database
+
+def _extract_and_cleanup(source: Union[bytes, str]) -> Dict:
+    """Extraction pool entry point; removes the spill file when given a path."""
     try:
-        result = supabase.table("court_notices").update(update_data).eq("id", notice_id).execute()
-        
-        # Archive Double-write (영구 보관용 통계 테이블 동기화)
-        if notice.get("site_id"):
+        return extract_pdf(source)
+    finally:
+        if isinstance(source, str):
             try:
-                supabase.table("court_notices_history").update(update_data) \
-                    .eq("site_id", notice["site_id"]) \
-                    .eq("source_type", notice.get("source_type", "notice")) \
-                    .execute()
-            except Exception:
-                pass  # 아카이브 테이블 미생성 시 무시
+                os.unlink(source)
+            except OSError:
+                pass
+
+
+class PipelineContext:
+    """Stage limits shared by all notices of one async run (extract_workers=0: extract in a thread)."""
+
+    def __init__(self, download_concurrency: int, extract_workers: int, llm_concurrency: int, db_batch_size: int):
+        self.download_sem = asyncio.Semaphore(download_concurrency)
+        self.llm_sem = asyncio.Semaphore(llm_concurrency)
+        self.extract_pool = None
+        if extract_workers > 0:
+            # spawn, not fork: download threads and the lease heartbeat may hold locks at fork time
+            self.extract_pool = ProcessPoolExecutor(max_workers=extract_workers, initializer=_init_extract_worker,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+        self.db_batch_size = db_batch_size
+        self.write_queue: asyncio.Queue = asyncio.Queue()
+
+
+async def _load_attachment_text_async(file_entry: Dict, ctx: PipelineContext) -> str:
+    """
+    Text of one attachment: from the attachment_text store when this file was seen before,
+    otherwise downloaded (bounded), extracted in the worker pool and stored.
+    """
+    server_fn = file_entry.get('server_filename', '')
+    original_fn = file_entry.get('original_filename', '')
+    
+    if text_store:
+        stored = _stored_text(await asyncio.to_thread(text_store.get_by_server_filename, server_fn), original_fn)
+        if stored is not None:
+            return stored
+    
+    async with ctx.download_sem:
+        content = await asyncio.to_thread(fetch_attachment_bytes, server_fn, original_fn)
+    if not content:
+        return ""
+    
+    sha256 = content_hash(content)
+    if text_store:
+        stored = _stored_text(await asyncio.to_thread(text_store.get, sha256), original_fn)
+        if stored is not None:
+            return stored
+    
+    source = content if len(content) <= IN_MEMORY_MAX_BYTES else _spill_to_temp_file(content, original_fn)
+    if ctx.extract_pool:
+        result = await asyncio.get_running_loop().run_in_executor(ctx.extract_pool, _extract_and_cleanup, source)
+    else:
+        result = await asyncio.to_thread(_extract_and_cleanup, source)
+    _note_extraction(result)
+    await asyncio.to_thread(_save_extraction, sha256, file_entry, result)
+    return result['text']
+
+
+async def _extract_notice_text_async(notice: Dict, ctx: PipelineContext) -> str:
+    """
+    Collects the text of all PDF attachments of a notice. Attachments are fetched concurrently
+    (bounded by the download semaphore and the per-host limit) and each is extracted as soon as
+    its download completes; the text is joined in file_info order.
+    """
+    entries = _pdf_attachments(notice.get('file_info'))
+    ai_telemetry.add(attachments=len(entries))
+    texts = await asyncio.gather(*(_load_attachment_text_async(entry, ctx) for entry in entries))
+    return _join_attachment_texts(entries, texts)
+
+
+def extract_notice_text(notice: Dict) -> str:
+    """Blocking wrapper of _extract_notice_text_async for one-off callers (ai_batch_summarizer); extracts in-process."""
+    async def run():
+        return await _extract_notice_text_async(notice, PipelineContext(PER_HOST_CONNECTIONS, 0, 1, 1))
+    return asyncio.run(run())
+
+
+async def _process_notice_async(notice: Dict, ctx: PipelineContext):
+    """Runs one notice through download → extract → LLM and queues its result for the writer."""
+    title = notice['title']
+    category = notice.get('category', 'etc')
+    update_data = None
+    record = ai_telemetry.start_notice(notice, RUN_ID)
+    try:
+        if category not in TARGET_CATEGORIES:
+            print(f"  ⏭️ Skipping: category '{category}' not in target list")
+            ai_telemetry.tag(outcome='skipped')
+            return
         
-        if result.data:
-            print(f"  💾 Saved AI summary & structured data to DB for notice {notice_id}")
-            return True
-        else:
-            print(f"  ❌ DB update returned no data for {notice_id}")
-            return False
+        extracted_text = await _extract_notice_text_async(notice, ctx)
+        async with ctx.llm_sem:
+            ai_data = await generate_ai_summary_async(title, category, notice.get('department', ''), extracted_text)
+        
+        if not ai_data or 'summary' not in ai_data:
+            print(f"  ❌ Failed to generate summary for {notice['id']}")
+            ai_telemetry.tag(error='no summary returned')
+            return
+        update_data = build_update_data(ai_data)
     except Exception as e:
-        print(f"  ❌ DB save error: {e}")
+        print(f"  ❌ [{title[:30]}] Pipeline error: {e}")
+        ai_telemetry.tag(error=repr(e))
+    finally:
+        # Always report back so the writer's count stays in step (None = failed)
+        await ctx.write_queue.put((notice, update_data, record))
+
+
+def _flush_results(batch: List) -> List:
+    """Saves a batch in bulk; returns the ids of the notices that were written."""
+    saved = result_writer.write([result_row(notice, update_data) for notice, update_data, _ in batch])
+    print(f"  💾 Saved {len(saved)}/{len(batch)} AI summaries to DB")
+    return saved
+
+
+async def _db_writer(ctx: PipelineContext, total: int) -> Dict:
+    """
+    Writer stage: buffers finished results and flushes them in batches off the event loop.
+    Returns counts plus the ids that failed (used to release their leases with an error).
+    """
+    stats = {'success': 0, 'failed': 0, 'failed_ids': []}
+    batch = []
+
+    async def flush():
+        saved_ids = set(await asyncio.to_thread(_flush_results, batch))
+        stats['success'] += len(saved_ids)
+        stats['failed'] += len(batch) - len(saved_ids)
+        for notice, _, record in batch:
+            if notice['id'] in saved_ids:
+                _write_telemetry(record, 'success')
+            else:
+                stats['failed_ids'].append(notice['id'])
+                _write_telemetry(record, 'save_failed')
+        batch.clear()
+
+    for _ in range(total):
+        notice, update_data, record = await ctx.write_queue.get()
+        if update_data is None:
+            stats['failed'] += 1
+            stats['failed_ids'].append(notice['id'])
+            _write_telemetry(record, record.get('outcome') or 'failed', record.get('error'))
+        else:
+            batch.append((notice, update_data, record))
+        if len(batch) >= ctx.db_batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return stats
+
+
+async def process_notices_async(notices: List[Dict],
+                                download_concurrency: int = DOWNLOAD_CONCURRENCY,
+                                extract_workers: int = EXTRACT_WORKERS,
+                                llm_concurrency: int = LLM_CONCURRENCY,
+                                db_batch_size: int = DB_WRITE_BATCH_SIZE) -> Dict:
+    """
+    Concurrent pipeline over a list of notices. Each stage has its own bound:
+    downloads (semaphore), text extraction (process pool), LLM calls (semaphore + retry)
+    and DB writes (single batched writer). Returns {'success': n, 'failed': n}.
+    """
+    ctx = PipelineContext(download_concurrency, extract_workers, llm_concurrency, db_batch_size)
+    try:
+        writer = asyncio.create_task(_db_writer(ctx, len(notices)))
+        await asyncio.gather(*(_process_notice_async(n, ctx) for n in notices))
+        return await writer
+    finally:
+        if ctx.extract_pool:
+            ctx.extract_pool.shutdown(wait=True)
+
+
+CANDIDATE_COLUMNS = "id, site_id, source_type, title, category, department, file_info, date_posted, expiry_date, auction_date"
+LEASE_COLUMNS = "ai_attempts, ai_status, ai_lease_expires_at"
+
+
+def _select_candidates(window: int, columns: str, leased: bool = False) -> List[Dict]:
+    """
+    Pending notices for the scheduler: the newest ones plus the ones expiring soonest,
+    so an old backlog can't hide a notice whose 공고만료일 is close. With leased, dead-lettered
+    notices are excluded in the query (matching the idx_court_notices_ai_pending* partial indexes),
+    so they don't take up the window.
+    """
+    def pending():
+        query = supabase.table("court_notices").select(columns) \
+            .is_("ai_summary", "null") \
+            .in_("category", TARGET_CATEGORIES)
+        return query.is_("ai_status", "null") if leased else query
+    
+    newest = pending().order("date_posted", desc=True).order("created_at", desc=True).limit(window).execute()
+    # Lower bound: expired notices are not cleaned up and would fill the window with urgency 0
+    expiring = pending().gte("expiry_date", date.today().isoformat()) \
+        .order("expiry_date").limit(window).execute()
+    
+    candidates = {}
+    for notice in (newest.data or []) + (expiring.data or []):
+        candidates[notice['id']] = notice
+    return list(candidates.values())
+
+
+def _claimable(notice: Dict) -> bool:
+    """Drops dead-lettered notices and ones another worker currently holds a lease on."""
+    if notice.get('ai_status'):
         return False
+    expires = notice.get('ai_lease_expires_at')
+    if expires:
+        try:
+            return datetime.fromisoformat(expires.replace('Z', '+00:00')) < datetime.now(timezone.utc)
+        except ValueError:
+            return True
+    return True
 
 
-def process_notices_without_summary(limit: int = 50):
+def process_notices_without_summary(limit: int = 50,
+                                    download_concurrency: int = DOWNLOAD_CONCURRENCY,
+                                    extract_workers: int = EXTRACT_WORKERS,
+                                    llm_concurrency: int = LLM_CONCURRENCY,
+                                    use_leases: bool = True,
+                                    use_priority: bool = True):
     """
-    Finds all notices without AI summaries (in target categories)
-    and processes them.
+    Finds notices without AI summaries (in target categories) and processes them
+    through the async pipeline. With use_priority the run's budget goes to the highest-scoring
+    notices (notice_scheduler.py); with use_leases they are claimed through the leased work
+    queue (add_ai_summary_leases.sql), so concurrent runs never overlap.
     """
     print("\n" + "=" * 60)
     print("🚀 AI Report Generator - Starting")
     print("=" * 60)
     
+    lease_queue = NoticeLeaseQueue(supabase, worker_id=RUN_ID) if use_leases else None
+    notices: List[Dict] = []
     try:
-        # 오늘 새로 들어온 공고만 처리 (ai_summary가 없는 것만)
-        result = supabase.table("court_notices") \
-            .select("id, site_id, source_type, title, category, department, file_info") \
-            .is_("ai_summary", "null") \
-            .in_("category", TARGET_CATEGORIES) \
-            .order("date_posted", desc=True) \
-            .order("created_at", desc=True) \
-            .limit(limit) \
-            .execute()
+        # Score a window of pending notices and keep the run's budget of highest-priority ones
+        window = limit * SCHEDULER_WINDOW_FACTOR if use_priority else limit
+        candidates = None
+        if lease_queue:
+            try:
+                candidates = [n for n in _select_candidates(window, f"{CANDIDATE_COLUMNS}, {LEASE_COLUMNS}", leased=True)
+                              if _claimable(n)]
+            except Exception as e:
+                print(f"\n⚠️ Lease columns unavailable ({e}); falling back to unleased selection")
+                lease_queue = None
+        if candidates is None:
+            candidates = _select_candidates(window, CANDIDATE_COLUMNS)
+        ranked = prioritize(candidates, limit) if use_priority else candidates[:limit]
+        if use_priority and ranked:
+            print(f"\n🎯 Scheduled top {len(ranked)} of {len(candidates)} pending (priority {ranked[0]['_priority']} … {ranked[-1]['_priority']})")
         
-        notices = result.data or []
+        if lease_queue:
+            try:
+                rank = {n['id']: i for i, n in enumerate(ranked)}
+                notices = sorted(lease_queue.claim_ids(list(rank)), key=lambda n: rank.get(n['id'], len(rank)))
+                print(f"🔒 Worker {lease_queue.worker_id} leased {len(notices)} notices")
+            except Exception as e:
+                print(f"\n⚠️ Lease queue unavailable ({e}); falling back to unleased selection")
+                lease_queue = None
+        if lease_queue is None:
+            notices = ranked
         print(f"\n📊 Found {len(notices)} new notices needing AI summary")
         
         if not notices:
             print("✅ All target notices already have AI summaries!")
             return
         
-        success_count = 0
-        fail_count = 0
+        print(f"   ⚙️ Concurrency: download {download_concurrency} | extract {extract_workers} | LLM {llm_concurrency}")
+        started = time.time()
+        if lease_queue:
+            lease_queue.start_heartbeat()
+        try:
+            stats = asyncio.run(process_notices_async(
+                notices,
+                download_concurrency=download_concurrency,
+                extract_workers=extract_workers,
+                llm_concurrency=llm_concurrency
+            ))
+        except BaseException as e:
+            if lease_queue:
+                lease_queue.stop_heartbeat()
+                lease_queue.release([n['id'] for n in notices], error=f"run aborted: {e!r}"[:500])
+                lease_queue = None
+            raise
         
-        for i, notice in enumerate(notices):
-            print(f"\n[{i+1}/{len(notices)}]", end="")
-            
-            if process_single_notice(notice):
-                success_count += 1
-            else:
-                fail_count += 1
-            
-            # Rate limiting between notices
-            if i < len(notices) - 1:
-                time.sleep(1)
+        if lease_queue:
+            lease_queue.stop_heartbeat()
+            failed = set(stats['failed_ids'])
+            lease_queue.release(list(failed), error="summary generation or save failed")
+            lease_queue.release([n['id'] for n in notices if n['id'] not in failed])
         
         print(f"\n\n{'='*60}")
-        print(f"🏁 Processing Complete!")
-        print(f"   ✅ Success: {success_count}")
-        print(f"   ❌ Failed:  {fail_count}")
+        print(f"🏁 Processing Complete! ({time.time() - started:.1f}s)")
+        print(f"   ✅ Success: {stats['success']}")
+        print(f"   ❌ Failed:  {stats['failed']}")
         print(f"   📊 Total:   {len(notices)}")
+        if attachment_cache:
+            cache_stats = attachment_cache.summary()
+            print(f"   📦 Download cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                  f"({cache_stats['bytes_saved']:,} bytes saved, {cache_stats['evictions']} evicted)")
+        if text_store:
+            print(f"   🗂️ Stored text: {text_store.stats['hits']} reused / {text_store.stats['saved']} newly extracted")
+        if result_writer.stats['retries'] or result_writer.stats['failed']:
+            print(f"   💾 DB writes: {result_writer.stats['calls']} calls, {result_writer.stats['retries']} retried, "
+                  f"{result_writer.stats['failed']} results not saved"
+                  + (" (responses stay in the LLM cache for the next run)" if llm_cache else ""))
+        if telemetry_ledger:
+            telemetry_ledger.flush()
+            print(f"   📈 Telemetry: {telemetry_ledger.db_path} (report: python scripts/ai_telemetry.py)")
+        if llm_cache:
+            print(f"   ♻️ LLM cache: {llm_cache.stats['hits']} hits / {llm_cache.stats['misses']} misses "
+                  f"({llm_cache.stats['tokens_saved']:,} tokens saved)")
         print(f"{'='*60}\n")
         
     except Exception as e:
@@ -453,6 +931,34 @@ def process_notices_without_summary(limit: int = 50):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate AI analysis reports for court notices")
     parser.add_argument("--limit", type=int, default=50, help="Maximum number of notices to process (default: 50)")
+    parser.add_argument("--download-concurrency", type=int, default=DOWNLOAD_CONCURRENCY, help=f"Parallel attachment downloads (default: {DOWNLOAD_CONCURRENCY})")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS, help=f"PDF extraction processes (default: {EXTRACT_WORKERS})")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY, help=f"In-flight OpenAI requests (default: {LLM_CONCURRENCY})")
+    parser.add_argument("--no-download-cache", action="store_true", help="Always download attachments from the court server")
+    parser.add_argument("--no-text-store", action="store_true", help="Re-extract attachments instead of reading/writing attachment_text")
+    parser.add_argument("--no-priority", action="store_true", help="Process newest notices first instead of by priority score")
+    parser.add_argument("--no-lease", action="store_true", help="Select notices without claiming leases (single-worker legacy mode)")
+    parser.add_argument("--no-telemetry", action="store_true", help="Do not record per-notice cost/latency rows")
+    parser.add_argument("--telemetry-mirror", action="store_true", help=f"Also insert telemetry rows into Supabase ({ai_telemetry.MIRROR_TABLE})")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always call the OpenAI API, ignoring cached summary responses")
     args = parser.parse_args()
     
-    process_notices_without_summary(limit=args.limit)
+    if args.no_download_cache:
+        attachment_cache = None
+    if args.no_text_store:
+        text_store = None
+    if args.no_llm_cache:
+        llm_cache = None
+    if args.no_telemetry:
+        telemetry_ledger = None
+    elif args.telemetry_mirror:
+        telemetry_ledger.supabase = supabase
+    
+    process_notices_without_summary(
+        limit=args.limit,
+        download_concurrency=args.download_concurrency,
+        extract_workers=args.extract_workers,
+        llm_concurrency=args.llm_concurrency,
+        use_leases=not args.no_lease,
+        use_priority=not args.no_priority
+    )
@@ -0,0 +1,219 @@
+"""
+AI Pipeline Telemetry
+=====================
+One structured row per processed notice: download bytes/ms, extraction method/ms,
+OCR pages and Vision tokens, prompt/completion tokens, LLM latency and outcome. Rows go to a local
+SQLite ledger (.cache/ai_telemetry.sqlite) and, optionally, the ai_pipeline_telemetry
+table (see add_ai_telemetry_table.sql).
+
+The pipeline code reports into the record of the notice currently being processed
+(held in a ContextVar, so concurrent asyncio tasks and their worker threads each see
+their own notice).
+
+Usage (report):
+    python scripts/ai_telemetry.py                 # last 7 days by day and category
+    python scripts/ai_telemetry.py --days 30 --by method
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import threading
+import contextvars
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DB_PATH = os.getenv("AI_TELEMETRY_PATH") or os.path.join(base_dir, '.cache', 'ai_telemetry.sqlite')
+MIRROR_TABLE = "ai_pipeline_telemetry"
+
+# gpt-4o-mini list prices (USD per 1M tokens) for the cost estimate in the report
+PRICE_INPUT_PER_M = 0.15
+PRICE_OUTPUT_PER_M = 0.60
+
+COLUMNS = [
+    ("notice_id", "TEXT"), ("run_id", "TEXT"), ("day", "TEXT"), ("category", "TEXT"),
+    ("attachments", "INTEGER"), ("download_bytes", "INTEGER"), ("download_ms", "REAL"),
+    ("cache_hits", "INTEGER"), ("stored_text_hits", "INTEGER"),
+    ("extraction_methods", "TEXT"), ("extract_ms", "REAL"), ("pages", "INTEGER"), ("ocr_pages", "INTEGER"),
+    ("text_chars", "INTEGER"), ("prompt_tokens", "INTEGER"), ("completion_tokens", "INTEGER"),
+    ("llm_ms", "REAL"), ("llm_cached", "INTEGER"), ("outcome", "TEXT"), ("error", "TEXT"),
+    ("total_ms", "REAL"), ("created_at", "REAL"),
+    ("ocr_prompt_tokens", "INTEGER"), ("ocr_completion_tokens", "INTEGER"),
+]
+NUMERIC = {name for name, kind in COLUMNS if kind in ("INTEGER", "REAL")}
+
+_current: contextvars.ContextVar = contextvars.ContextVar("ai_telemetry_record", default=None)
+# Attachment threads of one notice update the same record
+_record_lock = threading.Lock()
+
+
+# ── Recording ─────────────────────────────────────────────────────
+def start_notice(notice: Dict, run_id: str = "") -> Dict:
+    """Creates the record for a notice and makes it current in this context."""
+    record = {name: (0 if name in NUMERIC else None) for name, _ in COLUMNS}
+    record.update({
+        'notice_id': notice.get('id'),
+        'run_id': run_id,
+        'day': datetime.now().strftime('%Y-%m-%d'),
+        'category': notice.get('category'),
+        'created_at': time.time(),
+        '_methods': [],
+        '_started': time.perf_counter(),
+    })
+    _current.set(record)
+    return record
+
+
+def add(**values):
+    """Adds to numeric fields of the current record (no-op outside a notice)."""
+    record = _current.get()
+    if record is not None:
+        with _record_lock:
+            for key, value in values.items():
+                record[key] = (record.get(key) or 0) + (value or 0)
+
+
+def tag(**values):
+    record = _current.get()
+    if record is not None:
+        record.update(values)
+
+
+def note_extraction(method: str, elapsed_ms: float, pages: int, ocr_pages: int, text_chars: int):
+    record = _current.get()
+    if record is not None:
+        with _record_lock:
+            record['_methods'].append(method)
+        add(extract_ms=elapsed_ms, pages=pages, ocr_pages=ocr_pages, text_chars=text_chars)
+
+
+def finish(record: Dict, outcome: str, error: Optional[str] = None) -> Dict:
+    record['outcome'] = outcome
+    record['error'] = (error or None) and str(error)[:500]
+    record['extraction_methods'] = ",".join(record.pop('_methods', [])) or None
+    record['total_ms'] = round((time.perf_counter() - record.pop('_started', time.perf_counter())) * 1000, 1)
+    return record
+
+
+class _Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.started) * 1000
+        return False
+
+
+def timer() -> _Timer:
+    return _Timer()
+
+
+# ── Ledger ────────────────────────────────────────────────────────
+class TelemetryLedger:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, supabase_client=None):
+        self.db_path = db_path
+        self.supabase = supabase_client
+        self._pending_mirror: List[Dict] = []
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS notice_runs ({', '.join(f'{n} {k}' for n, k in COLUMNS)})"
+        )
+        # Ledgers created before a column was added get it appended
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(notice_runs)")}
+        for name, kind in COLUMNS:
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE notice_runs ADD COLUMN {name} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_notice_runs_day ON notice_runs (day, category)")
+        self._conn.commit()
+
+    def write(self, record: Dict):
+        row = [record.get(name) for name, _ in COLUMNS]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO notice_runs ({', '.join(n for n, _ in COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})", row
+            )
+            self._conn.commit()
+            if self.supabase is not None:
+                self._pending_mirror.append({name: record.get(name) for name, _ in COLUMNS})
+
+    def flush(self):
+        """Mirrors buffered rows to Supabase in one insert (run end)."""
+        with self._lock:
+            rows, self._pending_mirror = self._pending_mirror, []
+        if not rows or self.supabase is None:
+            return
+        try:
+            for row in rows:
+                row['created_at'] = datetime.fromtimestamp(row['created_at']).isoformat()
+            self.supabase.table(MIRROR_TABLE).insert(rows).execute()
+        except Exception as e:
+            print(f"  ⚠️ Telemetry mirror failed ({len(rows)} rows): {e}")
+
+    def report(self, days: int = 7, by: str = "category") -> List[Dict]:
+        group_column = {"category": "category", "method": "extraction_methods", "outcome": "outcome"}[by]
+        since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        with self._lock:
+            cursor = self._conn.execute(f"""
+                SELECT day, COALESCE({group_column}, '-') AS grp,
+                       COUNT(*), SUM(outcome = 'success'),
+                       SUM(download_bytes), SUM(download_ms), SUM(extract_ms), SUM(ocr_pages),
+                       SUM(prompt_tokens), SUM(completion_tokens), SUM(llm_ms), SUM(llm_cached), SUM(total_ms),
+                       SUM(ocr_prompt_tokens), SUM(ocr_completion_tokens)
+                FROM notice_runs
+                WHERE day >= ?
+                GROUP BY day, grp
+                ORDER BY day, grp
+            """, (since,))
+            keys = ["day", "group", "notices", "success", "download_bytes", "download_ms", "extract_ms",
+                    "ocr_pages", "prompt_tokens", "completion_tokens", "llm_ms", "llm_cached", "total_ms",
+                    "ocr_prompt_tokens", "ocr_completion_tokens"]
+            rows = [dict(zip(keys, r)) for r in cursor.fetchall()]
+        for row in rows:
+            # Vision OCR runs on the same model, so its tokens are priced alike
+            row['cost_usd'] = (((row['prompt_tokens'] or 0) + (row['ocr_prompt_tokens'] or 0)) * PRICE_INPUT_PER_M
+                               + ((row['completion_tokens'] or 0) + (row['ocr_completion_tokens'] or 0))
+                               * PRICE_OUTPUT_PER_M) / 1_000_000
+        return rows
+
+
+def print_report(rows: List[Dict], by: str):
+    if not rows:
+        print("ℹ️ No telemetry recorded for this period")
+        return
+    print(f"{'day':<11} {by:<16} {'notices':>7} {'ok':>4} {'MB':>7} {'dl s':>7} {'ext s':>7} {'ocr':>5} "
+          f"{'ocr tok':>9} {'in tok':>9} {'out tok':>8} {'llm s':>7} {'cached':>6} {'cost $':>8}")
+    totals = {k: 0 for k in ("notices", "success", "download_bytes", "download_ms", "extract_ms", "ocr_pages",
+                             "ocr_prompt_tokens", "ocr_completion_tokens",
+                             "prompt_tokens", "completion_tokens", "llm_ms", "llm_cached", "cost_usd")}
+    for row in rows:
+        for key in totals:
+            totals[key] += row[key] or 0
+        print(f"{row['day']:<11} {str(row['group'])[:16]:<16} {row['notices']:>7} {row['success'] or 0:>4} "
+              f"{(row['download_bytes'] or 0) / 1e6:>7.1f} {(row['download_ms'] or 0) / 1000:>7.1f} "
+              f"{(row['extract_ms'] or 0) / 1000:>7.1f} {row['ocr_pages'] or 0:>5} "
+              f"{(row['ocr_prompt_tokens'] or 0) + (row['ocr_completion_tokens'] or 0):>9,} {row['prompt_tokens'] or 0:>9,} "
+              f"{row['completion_tokens'] or 0:>8,} {(row['llm_ms'] or 0) / 1000:>7.1f} {row['llm_cached'] or 0:>6} "
+              f"{row['cost_usd']:>8.4f}")
+    print(f"{'TOTAL':<28} {totals['notices']:>7} {totals['success']:>4} {totals['download_bytes'] / 1e6:>7.1f} "
+          f"{totals['download_ms'] / 1000:>7.1f} {totals['extract_ms'] / 1000:>7.1f} {totals['ocr_pages']:>5} "
+          f"{totals['ocr_prompt_tokens'] + totals['ocr_completion_tokens']:>9,} "
+          f"{totals['prompt_tokens']:>9,} {totals['completion_tokens']:>8,} {totals['llm_ms'] / 1000:>7.1f} "
+          f"{totals['llm_cached']:>6} {totals['cost_usd']:>8.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate the AI pipeline telemetry ledger")
+    parser.add_argument("--days", type=int, default=7, help="Days to include (default: 7)")
+    parser.add_argument("--by", choices=["category", "method", "outcome"], default="category")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Ledger path")
+    args = parser.parse_args()
+
+    print_report(TelemetryLedger(args.db).report(args.days, args.by), args.by)
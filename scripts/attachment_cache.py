@@ -0,0 +1,136 @@
+"""
+Attachment Download Cache
+=========================
+Local, content-addressed cache for court attachment downloads
+(file.scourt.go.kr/AttachDownload), keyed by server_filename.
+
+Blobs are stored once per SHA-256 under <cache_dir>/blobs/, an SQLite index maps
+server_filename → hash, and the least recently used entries are evicted once the
+cache grows past its size limit. Re-runs and prompt experiments then cost no
+court-site bandwidth.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CACHE_DIR = os.getenv("ATTACHMENT_CACHE_DIR") or os.path.join(base_dir, '.cache', 'attachments')
+DEFAULT_MAX_BYTES = int(os.getenv("ATTACHMENT_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+
+class AttachmentCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes_saved': 0}
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        # Downloads run in worker threads, so one connection guarded by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                server_filename TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def get(self, server_filename: str) -> Optional[bytes]:
+        """Cached content for server_filename, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM entries WHERE server_filename = ?", (server_filename,)
+            ).fetchone()
+            if row:
+                try:
+                    with open(self._blob_path(row[0]), 'rb') as f:
+                        content = f.read()
+                except OSError:
+                    # Blob removed behind our back: drop the stale entry
+                    self._conn.execute("DELETE FROM entries WHERE server_filename = ?", (server_filename,))
+                    self._conn.commit()
+                    content = None
+
+                if content is not None:
+                    self._conn.execute(
+                        "UPDATE entries SET last_access = ? WHERE server_filename = ?",
+                        (time.time(), server_filename)
+                    )
+                    self._conn.commit()
+                    self.stats['hits'] += 1
+                    self.stats['bytes_saved'] += len(content)
+                    return content
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, server_filename: str, content: bytes) -> str:
+        """Stores content under its SHA-256 and returns the hash."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(sha256)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (server_filename, sha256, size, last_access) VALUES (?, ?, ?, ?)",
+                (server_filename, sha256, len(content), time.time())
+            )
+            self._conn.commit()
+            self._evict()
+        return sha256
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT sha256, MAX(size) AS size FROM entries GROUP BY sha256)"
+        ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """Drops least recently used entries (and unreferenced blobs) until under max_bytes."""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT server_filename, sha256, size FROM entries ORDER BY last_access"
+        ).fetchall()
+        for server_filename, sha256, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE server_filename = ?", (server_filename,))
+            still_referenced = self._conn.execute(
+                "SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+            if not still_referenced:
+                try:
+                    os.unlink(self._blob_path(sha256))
+                except OSError:
+                    pass
+                total -= size
+            self.stats['evictions'] += 1
+        self._conn.commit()
+
+    def summary(self) -> Dict:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0,
+        }
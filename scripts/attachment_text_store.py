@@ -0,0 +1,80 @@
+"""
+Attachment Text Store
+=====================
+Persists the text extracted from each court attachment in the `attachment_text`
+table (see add_attachment_text_table.sql), keyed by the SHA-256 of the file content.
+
+Extraction — especially GPT Vision OCR of scanned PDFs — then happens once per file;
+re-summaries, trend runs or a future search index read the stored text instead of
+re-downloading and re-OCR'ing.
+"""
+
+import hashlib
+from typing import Optional, Dict
+
+TABLE = "attachment_text"
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class AttachmentTextStore:
+    def __init__(self, supabase_client):
+        self.supabase = supabase_client
+        self.enabled = True
+        self.stats = {'hits': 0, 'misses': 0, 'saved': 0}
+
+    def _disable(self, e: Exception):
+        # Table not created yet (or no permission): run without the store rather than failing notices
+        if self.enabled:
+            print(f"  ⚠️ attachment_text store disabled: {e}")
+        self.enabled = False
+
+    def _lookup(self, column: str, value: str) -> Optional[Dict]:
+        if not self.enabled or not value:
+            return None
+        try:
+            result = self.supabase.table(TABLE) \
+                .select("content_hash, server_filename, extraction_method, page_count, char_count, text") \
+                .eq(column, value) \
+                .limit(1) \
+                .execute()
+        except Exception as e:
+            self._disable(e)
+            return None
+
+        if result.data:
+            self.stats['hits'] += 1
+            return result.data[0]
+        return None
+
+    def get_by_server_filename(self, server_filename: str) -> Optional[Dict]:
+        """Lookup before downloading: lets a re-summary skip the court server entirely."""
+        return self._lookup("server_filename", server_filename)
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        record = self._lookup("content_hash", sha256)
+        if record is None and self.enabled:
+            self.stats['misses'] += 1
+        return record
+
+    def put(self, sha256: str, server_filename: str, original_filename: str,
+            extraction_method: str, page_count: int, text: str) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            self.supabase.table(TABLE).upsert({
+                "content_hash": sha256,
+                "server_filename": server_filename,
+                "original_filename": original_filename,
+                "extraction_method": extraction_method,
+                "page_count": page_count,
+                "char_count": len(text),
+                "text": text,
+            }, on_conflict="content_hash").execute()
+            self.stats['saved'] += 1
+            return True
+        except Exception as e:
+            print(f"  ⚠️ attachment_text save failed: {e}")
+            return False
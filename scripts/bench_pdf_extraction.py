@@ -0,0 +1,151 @@
+"""
+Benchmark: tiered PDF text extraction (pdf_text_extractor.py)
+Compares time per page and characters recovered for
+  - pdfplumber on every page (the previous extractor)
+  - PyMuPDF on every page
+  - the tiered extractor (PyMuPDF, pdfplumber for table pages, OCR for scans)
+
+Reads PDFs from the local attachment cache (.cache/attachments/blobs) or --dir;
+with no PDFs available, generates a synthetic corpus of text, table and scanned pages.
+OCR is not called: image-only pages are counted as "would OCR".
+
+Usage:
+    python scripts/bench_pdf_extraction.py
+    python scripts/bench_pdf_extraction.py --dir ./sample_attachments
+    python scripts/bench_pdf_extraction.py --synthetic 200
+"""
+
+import argparse
+import os
+import random
+import time
+
+import fitz  # pymupdf
+
+from attachment_cache import DEFAULT_CACHE_DIR
+from pdf_text_extractor import classify_pages, extract_tiered, open_document, open_plumber
+
+
+def directory_corpus(path: str, limit: int):
+    corpus = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if name.endswith('.tmp'):
+                continue
+            with open(os.path.join(root, name), 'rb') as f:
+                content = f.read()
+            if content.startswith(b'%PDF'):
+                corpus.append(content)
+            if len(corpus) >= limit:
+                return corpus
+    return corpus
+
+
+def synthetic_corpus(count: int, seed: int = 42):
+    """Mix of notice-like PDFs: plain text pages, ruled price tables and image-only scans."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        doc = fitz.open()
+        for _ in range(rng.randint(1, 6)):
+            page = doc.new_page()
+            kind = rng.choices(['text', 'table', 'scan'], weights=[6, 3, 1])[0]
+            if kind == 'text':
+                lines = [f"Sale notice line {i}: lot {rng.randint(1, 999)} minimum price {rng.randint(1, 900) * 100000}"
+                         for i in range(40)]
+                page.insert_text((50, 60), "\n".join(lines), fontsize=9)
+            elif kind == 'table':
+                for row in range(12):
+                    y = 80 + row * 20
+                    page.draw_line((50, y), (550, y))
+                    page.insert_text((55, y + 14), f"{row:>3}   item-{rng.randint(100, 999)}   {rng.randint(1, 900) * 10000}",
+                                     fontsize=9)
+                for x in (50, 150, 350, 550):
+                    page.draw_line((x, 80), (x, 320))
+            else:
+                pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 800), False)
+                pix.set_rect(pix.irect, (rng.randint(200, 255),) * 3)
+                page.insert_image(page.rect, pixmap=pix)
+        corpus.append(doc.tobytes())
+        doc.close()
+    return corpus
+
+
+def bench_pdfplumber(corpus):
+    pages = chars = 0
+    for content in corpus:
+        with open_plumber(content) as pdf:
+            for page in pdf.pages:
+                chars += len((page.extract_text() or "").strip())
+                pages += 1
+    return pages, chars
+
+
+def bench_fitz(corpus):
+    pages = chars = 0
+    for content in corpus:
+        doc = open_document(content)
+        for page in doc:
+            chars += len(page.get_text().strip())
+            pages += 1
+        doc.close()
+    return pages, chars
+
+
+def bench_tiered(corpus):
+    pages = chars = 0
+    tiers = {'fitz': 0, 'pdfplumber': 0, 'vision': 0}
+    would_ocr = 0
+    for content in corpus:
+        result = extract_tiered(content, ocr_pages=None)
+        pages += result['page_count']
+        chars += len(result['text'])
+        for tier, n in result['tiers'].items():
+            tiers[tier] += n
+        doc = open_document(content)
+        would_ocr += len(classify_pages(doc)['image_pages'])
+        doc.close()
+    return pages, chars, tiers, would_ocr
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    result = fn(corpus)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tiered PDF text extraction")
+    parser.add_argument("--dir", help="Directory of PDFs (default: local attachment cache)")
+    parser.add_argument("--limit", type=int, default=500, help="Max PDFs to read from the directory")
+    parser.add_argument("--synthetic", type=int, default=100, help="Synthetic PDFs to generate when no PDFs are found")
+    args = parser.parse_args()
+
+    source_dir = args.dir or os.path.join(DEFAULT_CACHE_DIR, 'blobs')
+    corpus = directory_corpus(source_dir, args.limit) if os.path.isdir(source_dir) else []
+    if corpus:
+        print(f"📂 {len(corpus)} PDFs from {source_dir}")
+    else:
+        corpus = synthetic_corpus(args.synthetic)
+        print(f"🧪 {len(corpus)} synthetic PDFs (no PDFs found in {source_dir})")
+
+    plumber_time, (plumber_pages, plumber_chars) = timed(bench_pdfplumber, corpus)
+    fitz_time, (fitz_pages, fitz_chars) = timed(bench_fitz, corpus)
+    tiered_time, (tiered_pages, tiered_chars, tiers, would_ocr) = timed(bench_tiered, corpus)
+
+    print(f"\n{'extractor':<12} {'pages':>7} {'ms/page':>9} {'chars':>10} {'total s':>9}")
+    for name, elapsed, pages, chars in (
+        ("pdfplumber", plumber_time, plumber_pages, plumber_chars),
+        ("fitz", fitz_time, fitz_pages, fitz_chars),
+        ("tiered", tiered_time, tiered_pages, tiered_chars),
+    ):
+        print(f"{name:<12} {pages:>7} {elapsed * 1000 / max(pages, 1):>9.2f} {chars:>10} {elapsed:>9.2f}")
+
+    print(f"\n📊 Tiered page split: fitz {tiers['fitz']}, pdfplumber {tiers['pdfplumber']}, "
+          f"would OCR {would_ocr} (OCR not called in benchmark)")
+    if plumber_time:
+        print(f"⚡ Tiered vs pdfplumber-everywhere: {plumber_time / max(tiered_time, 1e-9):.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
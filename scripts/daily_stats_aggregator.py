@@ -8,17 +8,22 @@ Usage:
     python scripts/daily_stats_aggregator.py              # Aggregate today's stats
     python scripts/daily_stats_aggregator.py --date 2026-03-20  # Aggregate specific date
     python scripts/daily_stats_aggregator.py --backfill 30      # Backfill last 30 days
+    python scripts/daily_stats_aggregator.py --backfill 30 --client-side  # Aggregate in Python, not in SQL
 """
 
 import os
 import sys
 import argparse
 from datetime import datetime, date, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from dotenv import load_dotenv
 
+from paginated_select import stream_rows
+from daily_stats_rollup import DayStats, MERGE_COLUMNS
+
 # ── Environment Setup ──────────────────────────────────────────────
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(base_dir, '.env.local'))
@@ -32,16 +37,56 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Category mapping for counting
-CATEGORY_MAP = {
-    'real_estate': 'real_estate_count',
-    'vehicle': 'vehicle_count',
-    'asset': 'asset_count',
-    'bond': 'bond_count',
-    'stock': 'stock_count',
-    'patent': 'patent_count',
-    'electronics': 'electronics_count',
-}
+NOTICE_COLUMNS = "id, date_posted, category, department, appraised_price, minimum_price, view_count"
+UPSERT_CHUNK_SIZE = 500
+
+# Aggregate inside Postgres with refresh_daily_stats() (add_daily_stats_rpc.sql); False = fold the
+# rows in Python (--client-side, or automatically when the function is not installed)
+use_server_side = True
+# False once daily_stats turns out to lack the merge state columns (add_daily_stats_rpc.sql not run)
+write_merge_state = True
+
+
+def _print_row(row: Dict):
+    print(f"  ✅ {row['stat_date']}: {row['total_count']}건 | "
+          f"부동산 {row['real_estate_count']} | "
+          f"차량 {row['vehicle_count']} | "
+          f"자산 {row['asset_count']} | "
+          f"채권 {row['bond_count']} | "
+          f"기타 {row['other_count']} | "
+          f"감정가총액 {row['total_appraisal_price']:,}원 | "
+          f"최다법원 {row['top_court']}")
+
+
+def refresh_server_side(start_date: date, end_date: date) -> Optional[List[Dict]]:
+    """daily_stats rows written by refresh_daily_stats(), or None when the Python path must run."""
+    global use_server_side
+    if not use_server_side:
+        return None
+    try:
+        result = supabase.rpc("refresh_daily_stats", {
+            "p_start": start_date.isoformat(),
+            "p_end": end_date.isoformat(),
+        }).execute()
+    except Exception as e:
+        print(f"  ⚠️ refresh_daily_stats() unavailable ({e}); aggregating in Python")
+        use_server_side = False
+        return None
+    return result.data or []
+
+
+def upsert_daily_rows(rows: List[Dict]):
+    """Upserts daily_stats rows (Python path); merge-state columns are dropped if the table lacks them."""
+    global write_merge_state
+    if write_merge_state:
+        try:
+            return supabase.table("daily_stats").upsert(rows, on_conflict="stat_date").execute()
+        except APIError as e:
+            if e.code != "PGRST204":  # column not found
+                raise
+            write_merge_state = False
+    rows = [{k: v for k, v in row.items() if k not in MERGE_COLUMNS} for row in rows]
+    return supabase.table("daily_stats").upsert(rows, on_conflict="stat_date").execute()
 
 
 def aggregate_daily_stats(target_date: date) -> bool:
@@ -53,92 +98,30 @@ def aggregate_daily_stats(target_date: date) -> bool:
     print(f"\n📊 Aggregating stats for {date_str}...")
 
     try:
-        # Fetch all notices for this date (notice type only)
-        result = supabase.table("court_notices") \
-            .select("id, category, department, appraised_price, minimum_price, view_count") \
-            .eq("source_type", "notice") \
-            .eq("date_posted", date_str) \
-            .execute()
+        rows = refresh_server_side(target_date, target_date)
+        if rows is not None:
+            if not rows:
+                print(f"  ℹ️ No notices found for {date_str}, skipping.")
+            for row in rows:
+                _print_row(row)
+            return True
 
-        notices = result.data or []
-        total_count = len(notices)
+        # Stream all notices for this date (notice type only); rows are folded in one by one
+        day = DayStats()
+        for notice in stream_rows(supabase, "court_notices", NOTICE_COLUMNS,
+                                  filters=lambda q: q.eq("source_type", "notice").eq("date_posted", date_str)):
+            day.add(notice)
 
-        if total_count == 0:
+        if day.total_count == 0:
             print(f"  ℹ️ No notices found for {date_str}, skipping.")
             return True
 
-        # Count by category
-        category_counts = {v: 0 for v in CATEGORY_MAP.values()}
-        category_counts['other_count'] = 0
-
-        total_appraisal = 0
-        max_appraisal = 0
-        price_count = 0
-        total_views = 0
-        court_counts = {}
-
-        for notice in notices:
-            cat = notice.get('category', 'etc')
-            col_name = CATEGORY_MAP.get(cat, 'other_count')
-            category_counts[col_name] = category_counts.get(col_name, 0) + 1
-
-            # Appraisal price aggregation
-            price = notice.get('appraised_price') or notice.get('minimum_price')
-            if price:
-                try:
-                    p = int(price)
-                    total_appraisal += p
-                    price_count += 1
-                    if p > max_appraisal:
-                        max_appraisal = p
-                except (ValueError, TypeError):
-                    pass
-
-            # View count aggregation
-            vc = notice.get('view_count') or 0
-            total_views += vc
-
-            # Court distribution
-            dept = notice.get('department', '기타')
-            court_counts[dept] = court_counts.get(dept, 0) + 1
-
-        # Find top court
-        top_court = max(court_counts, key=court_counts.get) if court_counts else '없음'
-        avg_appraisal = total_appraisal // price_count if price_count > 0 else 0
-
-        # Build stats record
-        stats_data = {
-            "stat_date": date_str,
-            "total_count": total_count,
-            "real_estate_count": category_counts.get('real_estate_count', 0),
-            "vehicle_count": category_counts.get('vehicle_count', 0),
-            "asset_count": category_counts.get('asset_count', 0),
-            "bond_count": category_counts.get('bond_count', 0),
-            "stock_count": category_counts.get('stock_count', 0),
-            "patent_count": category_counts.get('patent_count', 0),
-            "electronics_count": category_counts.get('electronics_count', 0),
-            "other_count": category_counts.get('other_count', 0),
-            "total_appraisal_price": total_appraisal,
-            "avg_appraisal_price": avg_appraisal,
-            "max_appraisal_price": max_appraisal,
-            "top_court": top_court,
-            "total_views": total_views,
-        }
-
         # Upsert to daily_stats (update if date already exists)
-        result = supabase.table("daily_stats") \
-            .upsert(stats_data, on_conflict="stat_date") \
-            .execute()
+        stats_data = {**day.to_row(date_str), **day.merge_state()}
+        result = upsert_daily_rows([stats_data])
 
         if result.data:
-            print(f"  ✅ {date_str}: {total_count}건 | "
-                  f"부동산 {category_counts.get('real_estate_count', 0)} | "
-                  f"차량 {category_counts.get('vehicle_count', 0)} | "
-                  f"자산 {category_counts.get('asset_count', 0)} | "
-                  f"채권 {category_counts.get('bond_count', 0)} | "
-                  f"기타 {category_counts.get('other_count', 0)} | "
-                  f"감정가총액 {total_appraisal:,}원 | "
-                  f"최다법원 {top_court}")
+            _print_row(stats_data)
             return True
         else:
             print(f"  ❌ Failed to save stats for {date_str}")
@@ -149,6 +132,47 @@ def aggregate_daily_stats(target_date: date) -> bool:
         return False
 
 
+def aggregate_date_range(start_date: date, end_date: date) -> int:
+    """
+    Backfill path: one refresh_daily_stats() call; the Python fallback streams every notice posted
+    in [start_date, end_date] once, buckets them by date_posted and bulk-upserts the rows in chunks.
+    Days without notices are skipped (as in aggregate_daily_stats). Returns the days written.
+    """
+    start_str, end_str = start_date.isoformat(), end_date.isoformat()
+    print(f"\n📊 Aggregating stats for {start_str} ~ {end_str}...")
+
+    rows = refresh_server_side(start_date, end_date)
+    if rows is not None:
+        for row in rows:
+            _print_row(row)
+        return len(rows)
+
+    days: Dict[str, DayStats] = {}
+    scanned = 0
+    for notice in stream_rows(supabase, "court_notices", NOTICE_COLUMNS,
+                              filters=lambda q: q.eq("source_type", "notice")
+                                                 .gte("date_posted", start_str).lte("date_posted", end_str),
+                              order_by="date_posted", tiebreak="id"):
+        days.setdefault(notice['date_posted'], DayStats()).add(notice)
+        scanned += 1
+    print(f"  📥 {scanned:,} notices over {len(days)} days")
+
+    rows = [{**day.to_row(date_str), **day.merge_state()} for date_str, day in sorted(days.items())]
+    written = 0
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + UPSERT_CHUNK_SIZE]
+        try:
+            result = upsert_daily_rows(chunk)
+        except Exception as e:
+            print(f"  ❌ Failed to save stats for {chunk[0]['stat_date']} ~ {chunk[-1]['stat_date']}: {e}")
+            continue
+        if result.data:
+            written += len(chunk)
+            for row in chunk:
+                _print_row(row)
+    return written
+
+
 def run_aggregation(target_date_str: Optional[str] = None, backfill_days: int = 0):
     """
     Main entry point for daily stats aggregation.
@@ -158,14 +182,11 @@ def run_aggregation(target_date_str: Optional[str] = None, backfill_days: int =
     print("=" * 60)
 
     if backfill_days > 0:
-        # Backfill mode: aggregate stats for the last N days
+        # Backfill mode: aggregate stats for the last N days in one range pass
         print(f"🔄 Backfill mode: processing last {backfill_days} days")
-        success = 0
-        for i in range(backfill_days):
-            d = date.today() - timedelta(days=i)
-            if aggregate_daily_stats(d):
-                success += 1
-        print(f"\n✅ Backfill complete: {success}/{backfill_days} days processed")
+        today = date.today()
+        written = aggregate_date_range(today - timedelta(days=backfill_days - 1), today)
+        print(f"\n✅ Backfill complete: {written} days with notices written ({backfill_days} days scanned)")
     else:
         # Single date mode
         if target_date_str:
@@ -188,6 +209,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Daily Statistics Aggregator')
     parser.add_argument('--date', type=str, help='Target date (YYYY-MM-DD), defaults to today')
     parser.add_argument('--backfill', type=int, default=0, help='Backfill last N days')
+    parser.add_argument('--client-side', action='store_true', help='Aggregate in Python instead of refresh_daily_stats()')
     args = parser.parse_args()
 
+    if args.client_side:
+        use_server_side = False
+
     run_aggregation(target_date_str=args.date, backfill_days=args.backfill)
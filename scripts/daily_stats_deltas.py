@@ -0,0 +1,124 @@
+"""
+Incremental Daily Stats
+=======================
+Keeps daily_stats current while scraper.py writes court_notices, instead of waiting for the
+next full re-read by daily_stats_aggregator.py (which becomes the reconciliation tool).
+
+For every notice the scraper writes, the aggregator holds two versions keyed by site_id:
+the row as it was before this run (snapshot, one select per scraped page) and the row as
+upserted. At flush the difference of the two is folded into the affected daily_stats rows:
+category counts, price sum/count/max, views, the per-court counts and the price sketch.
+Because only before → after differences are counted, re-upserting an unchanged notice (every
+page the scraper revisits) adds nothing, and a notice written twice in a run counts once.
+
+Merging needs the merge state columns (court_counts, priced_count, price_sketch from
+add_daily_stats_rpc.sql). Days whose row predates them are recomputed with
+refresh_daily_stats() instead.
+"""
+
+from typing import Dict, Iterable, Optional
+
+from daily_stats_rollup import DayStats, MERGE_COLUMNS
+
+STAT_COLUMNS = "site_id, source_type, date_posted, category, department, appraised_price, minimum_price, view_count"
+SOURCE_TYPE = "notice"  # daily_stats counts notices only
+
+
+class DailyStatsDeltas:
+    def __init__(self, supabase_client):
+        self.supabase = supabase_client
+        self.enabled = True
+        self._before: Dict[str, Optional[Dict]] = {}
+        self._after: Dict[str, Dict] = {}
+        self._unknown_dates = set()  # written without a before-image: recomputed at flush
+
+    def snapshot(self, site_ids: Iterable[str]):
+        """Records the current version of notices about to be written (None = not stored yet)."""
+        ids = [sid for sid in dict.fromkeys(site_ids) if sid and sid not in self._before]
+        if not ids or not self.enabled:
+            return
+        try:
+            result = self.supabase.table("court_notices").select(STAT_COLUMNS) \
+                .eq("source_type", SOURCE_TYPE) \
+                .in_("site_id", ids) \
+                .execute()
+        except Exception as e:
+            # Without the before-image a re-upsert would double count; leave it to the full aggregator
+            print(f"  ⚠️ Live stats disabled for this run (snapshot failed: {e})")
+            self.enabled = False
+            return
+        existing = {row['site_id']: row for row in (result.data or [])}
+        for sid in ids:
+            self._before[sid] = existing.get(sid)
+
+    def record(self, row: Dict):
+        """Takes the upserted court_notices row (the upsert's returned representation)."""
+        if not self.enabled or row.get('source_type', SOURCE_TYPE) != SOURCE_TYPE:
+            return
+        sid = row.get('site_id')
+        if sid not in self._before:
+            # Not snapshotted before the write: its delta is unknown, so the day is recomputed instead
+            if row.get('date_posted'):
+                self._unknown_dates.add(row['date_posted'])
+            return
+        self._after[sid] = row
+
+    def deltas(self) -> Dict[str, DayStats]:
+        """Per stat_date: what changed between the before and after versions."""
+        days: Dict[str, DayStats] = {}
+        for sid, after in self._after.items():
+            before = self._before.get(sid)
+            if before and before.get('date_posted'):
+                days.setdefault(before['date_posted'], DayStats()).add(before, sign=-1)
+            if after.get('date_posted'):
+                days.setdefault(after['date_posted'], DayStats()).add(after)
+        return {d: delta for d, delta in days.items() if not delta.is_empty()}
+
+    def flush(self) -> int:
+        """Merges the deltas into daily_stats (one select + one upsert). Returns the days updated."""
+        if not self.enabled:
+            return 0
+        deltas = self.deltas()
+        stale = set(self._unknown_dates)  # recomputed whole, so their partial deltas are not merged
+        self._before.update(self._after)  # flushed: the written versions are the new baseline
+        self._after.clear()
+        self._unknown_dates = set()
+        touched = sorted(set(deltas) | stale)
+        if not touched:
+            print("📈 Live stats: no daily_stats changes")
+            return 0
+
+        rows = []
+        merge_dates = sorted(set(deltas) - stale)
+        if merge_dates:
+            try:
+                result = self.supabase.table("daily_stats").select("*").in_("stat_date", merge_dates).execute()
+            except Exception as e:
+                print(f"  ⚠️ Live stats not applied ({e}); run daily_stats_aggregator.py")
+                return 0
+            existing = {row['stat_date']: row for row in (result.data or [])}
+            for d in merge_dates:
+                row = existing.get(d)
+                if row is not None and any(row.get(col) is None for col in MERGE_COLUMNS):
+                    stale.add(d)  # aggregated before the merge state existed
+                elif row is not None or deltas[d].total_count > 0:
+                    rows.append(deltas[d].merge_into(row, d))
+
+        updated = 0
+        if rows:
+            try:
+                self.supabase.table("daily_stats").upsert(rows, on_conflict="stat_date").execute()
+                updated += len(rows)
+            except Exception as e:
+                print(f"  ⚠️ Live stats upsert failed ({e}); run daily_stats_aggregator.py")
+        if stale:
+            first, last = min(stale), max(stale)
+            try:
+                refreshed = self.supabase.rpc("refresh_daily_stats", {"p_start": first, "p_end": last}).execute()
+                updated += len(stale)
+                print(f"  🔄 Recomputed {len(refreshed.data or [])} days in {first} ~ {last}")
+            except Exception as e:
+                print(f"  ⚠️ Could not recompute {first} ~ {last} ({e}); run daily_stats_aggregator.py")
+
+        print(f"📈 Live stats: {updated} daily_stats rows updated ({', '.join(touched)})")
+        return updated
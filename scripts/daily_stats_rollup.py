@@ -0,0 +1,153 @@
+"""
+Daily Stats Rollup
+==================
+The per-day aggregation behind the daily_stats table: a DayStats folds court_notices rows
+(source_type = 'notice') one by one and renders the daily_stats record. Kept free of
+Supabase so the aggregator, its SQL cross-check (test_daily_stats_sql.py) and other
+writers share one definition.
+
+The same rules are implemented server-side by compute_daily_stats() in
+add_daily_stats_rpc.sql; keep the two in step. Notices without a department count
+as '기타'.
+
+Besides the reported columns every row carries its merge state: the full per-court counts
+and a price quantile sketch (price_sketch.py), so periods can be rolled up exactly from
+daily rows (periodic_report_generator.py) and rows can be updated incrementally.
+"""
+
+from typing import Dict, Optional
+
+import price_sketch
+
+# Category mapping for counting
+CATEGORY_MAP = {
+    'real_estate': 'real_estate_count',
+    'vehicle': 'vehicle_count',
+    'asset': 'asset_count',
+    'bond': 'bond_count',
+    'stock': 'stock_count',
+    'patent': 'patent_count',
+    'electronics': 'electronics_count',
+}
+
+
+COUNT_COLUMNS = list(CATEGORY_MAP.values()) + ['other_count']
+UNKNOWN_COURT = '기타'
+
+# Merge state: what an incremental update (daily_stats_deltas.py) or a period rollup needs on
+# top of the reported columns to combine daily_stats rows
+MERGE_COLUMNS = ['court_counts', 'priced_count', 'price_sketch']
+
+
+class DayStats:
+    """
+    Running aggregate of one day's notices; to_row() gives its daily_stats record.
+    add(notice, sign=-1) takes a notice back out, so a DayStats can also hold the
+    delta between two versions of the same rows (see merge_into).
+    """
+
+    def __init__(self):
+        # Count by category
+        self.category_counts = {v: 0 for v in CATEGORY_MAP.values()}
+        self.category_counts['other_count'] = 0
+
+        self.total_count = 0
+        self.total_appraisal = 0
+        self.max_appraisal = 0
+        self.price_count = 0
+        self.total_views = 0
+        self.court_counts = {}
+        self.price_sketch = {}
+
+    def add(self, notice: Dict, sign: int = 1):
+        self.total_count += sign
+        cat = notice.get('category', 'etc')
+        col_name = CATEGORY_MAP.get(cat, 'other_count')
+        self.category_counts[col_name] = self.category_counts.get(col_name, 0) + sign
+
+        # Appraisal price aggregation (a removed price can't lower the max; reconciliation does)
+        price = notice.get('appraised_price') or notice.get('minimum_price')
+        if price:
+            try:
+                p = int(price)
+                self.total_appraisal += sign * p
+                self.price_count += sign
+                if sign > 0 and p > self.max_appraisal:
+                    self.max_appraisal = p
+                bucket = price_sketch.bucket_of(p)
+                if bucket is not None:
+                    self.price_sketch[bucket] = self.price_sketch.get(bucket, 0) + sign
+            except (ValueError, TypeError):
+                pass
+
+        # View count aggregation
+        self.total_views += sign * (notice.get('view_count') or 0)
+
+        # Court distribution
+        dept = notice.get('department') or UNKNOWN_COURT
+        self.court_counts[dept] = self.court_counts.get(dept, 0) + sign
+
+    def is_empty(self) -> bool:
+        # max_appraisal is left out: re-adding an unchanged notice only repeats a max the row already has
+        return not (self.total_count or self.total_appraisal or self.price_count or self.total_views
+                    or any(self.category_counts.values()) or any(self.court_counts.values())
+                    or any(self.price_sketch.values()))
+
+    def to_row(self, date_str: str) -> Dict:
+        # Find top court
+        top_court = max(self.court_counts, key=self.court_counts.get) if self.court_counts else '없음'
+        avg_appraisal = self.total_appraisal // self.price_count if self.price_count > 0 else 0
+
+        return {
+            "stat_date": date_str,
+            "total_count": self.total_count,
+            "real_estate_count": self.category_counts.get('real_estate_count', 0),
+            "vehicle_count": self.category_counts.get('vehicle_count', 0),
+            "asset_count": self.category_counts.get('asset_count', 0),
+            "bond_count": self.category_counts.get('bond_count', 0),
+            "stock_count": self.category_counts.get('stock_count', 0),
+            "patent_count": self.category_counts.get('patent_count', 0),
+            "electronics_count": self.category_counts.get('electronics_count', 0),
+            "other_count": self.category_counts.get('other_count', 0),
+            "total_appraisal_price": self.total_appraisal,
+            "avg_appraisal_price": avg_appraisal,
+            "max_appraisal_price": self.max_appraisal,
+            "top_court": top_court,
+            "total_views": self.total_views,
+        }
+
+    def merge_state(self) -> Dict:
+        return {
+            "court_counts": {court: n for court, n in self.court_counts.items() if n > 0},
+            "priced_count": self.price_count,
+            "price_sketch": {bucket: n for bucket, n in self.price_sketch.items() if n > 0},
+        }
+
+    def merge_into(self, row: Optional[Dict], date_str: str) -> Dict:
+        """
+        Applies this aggregate (usually a delta) to an existing daily_stats row carrying merge
+        state (None = no row yet) and returns the merged row. Ties for top_court go to the
+        alphabetically first court here, where a full aggregation picks the first one seen.
+        """
+        row = row or {}
+        courts = dict(row.get('court_counts') or {})
+        for court, n in self.court_counts.items():
+            courts[court] = courts.get(court, 0) + n
+        courts = {court: n for court, n in courts.items() if n > 0}
+        sketch = price_sketch.merge([row.get('price_sketch'), self.price_sketch])
+
+        total_appraisal = (row.get('total_appraisal_price') or 0) + self.total_appraisal
+        priced = (row.get('priced_count') or 0) + self.price_count
+        return {
+            "stat_date": date_str,
+            "total_count": (row.get('total_count') or 0) + self.total_count,
+            **{col: (row.get(col) or 0) + self.category_counts.get(col, 0) for col in COUNT_COLUMNS},
+            "total_appraisal_price": total_appraisal,
+            "avg_appraisal_price": total_appraisal // priced if priced > 0 else 0,
+            "max_appraisal_price": max(row.get('max_appraisal_price') or 0, self.max_appraisal),
+            "top_court": min(courts, key=lambda c: (-courts[c], c)) if courts else '없음',
+            "total_views": (row.get('total_views') or 0) + self.total_views,
+            "court_counts": courts,
+            "priced_count": priced,
+            "price_sketch": {bucket: n for bucket, n in sketch.items() if n > 0},
+        }
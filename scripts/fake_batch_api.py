@@ -0,0 +1,113 @@
+"""
+Fake OpenAI Batch API
+=====================
+Local stand-in for the parts of the OpenAI client used by ai_batch_summarizer.py
+(files.create / files.content / batches.create / batches.retrieve). State lives in a
+directory, so submit and apply can run as separate processes, exactly like the real flow.
+
+Batches complete immediately; every request gets a deterministic JSON response built
+by `responder(body)`, so batch runs can be tested offline and for free.
+"""
+
+import os
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_STATE_DIR = os.path.join(base_dir, '.cache', 'fake_batch_api')
+
+
+def default_responder(body: Dict) -> Dict:
+    """Summary JSON echoing the start of the prompt; structured fields left null."""
+    prompt = body['messages'][-1]['content']
+    return {
+        "summary": f"[fake] {prompt[:40]}",
+        "minimum_price": None,
+        "appraised_price": None,
+        "auction_date": None,
+    }
+
+
+class _Files:
+    def __init__(self, api: 'FakeBatchAPI'):
+        self.api = api
+
+    def create(self, file, purpose: str = "batch"):
+        name, content = file if isinstance(file, tuple) else (getattr(file, 'name', 'upload.jsonl'), file.read())
+        file_id = f"file-fake-{uuid.uuid4().hex[:12]}"
+        with open(self.api._path(file_id), 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+        return SimpleNamespace(id=file_id, filename=name, purpose=purpose)
+
+    def content(self, file_id: str):
+        with open(self.api._path(file_id), 'rb') as f:
+            data = f.read()
+        return SimpleNamespace(text=data.decode('utf-8'), read=lambda: data)
+
+
+class _Batches:
+    def __init__(self, api: 'FakeBatchAPI'):
+        self.api = api
+
+    def create(self, input_file_id: str, endpoint: str, completion_window: str = "24h", metadata=None):
+        batch_id = f"batch-fake-{uuid.uuid4().hex[:12]}"
+        with open(self.api._path(input_file_id), encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+
+        output_lines = []
+        for request in requests:
+            content = json.dumps(self.api.responder(request['body']), ensure_ascii=False)
+            prompt_tokens = sum(len(m['content']) for m in request['body']['messages']) // 2
+            completion_tokens = len(content) // 2
+            output_lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request['custom_id'],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": request['body'].get('model'),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                  "total_tokens": prompt_tokens + completion_tokens},
+                    },
+                },
+                "error": None,
+            }, ensure_ascii=False))
+
+        output_file_id = f"file-fake-{uuid.uuid4().hex[:12]}"
+        with open(self.api._path(output_file_id), 'w', encoding='utf-8') as f:
+            f.write("\n".join(output_lines) + "\n")
+
+        batch = {
+            "id": batch_id, "status": "completed", "endpoint": endpoint,
+            "input_file_id": input_file_id, "output_file_id": output_file_id, "error_file_id": None,
+            "created_at": int(time.time()), "metadata": metadata or {},
+            "request_counts": {"total": len(requests), "completed": len(requests), "failed": 0},
+        }
+        with open(self.api._path(batch_id), 'w', encoding='utf-8') as f:
+            json.dump(batch, f)
+        return self.retrieve(batch_id)
+
+    def retrieve(self, batch_id: str):
+        with open(self.api._path(batch_id), encoding='utf-8') as f:
+            batch = json.load(f)
+        batch['request_counts'] = SimpleNamespace(**batch['request_counts'])
+        return SimpleNamespace(**batch)
+
+
+class FakeBatchAPI:
+    """Duck-typed replacement for an OpenAI client in batch mode (client.files / client.batches)."""
+
+    def __init__(self, state_dir: str = DEFAULT_STATE_DIR, responder: Optional[Callable[[Dict], Dict]] = None):
+        self.state_dir = state_dir
+        self.responder = responder or default_responder
+        os.makedirs(state_dir, exist_ok=True)
+        self.files = _Files(self)
+        self.batches = _Batches(self)
+
+    def _path(self, object_id: str) -> str:
+        return os.path.join(self.state_dir, object_id)
@@ -0,0 +1,81 @@
+"""
+LLM Response Cache
+==================
+Local SQLite cache for chat completion results, keyed by
+(model, prompt template version, SHA-256 of the full request).
+
+A notice whose title, department and extracted text are unchanged produces a
+byte-identical prompt, so re-runs after a DB rollback or a reprocessing sweep
+reuse the stored JSON instead of paying for another completion. Bump the prompt
+version (PROMPT_VERSION in ai_report_generator.py) whenever the templates change.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, List
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_DB_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(base_dir, '.cache', 'llm_responses.sqlite')
+
+
+def request_key(model: str, prompt_version: str, messages: List[Dict], **params) -> str:
+    """Hash of everything that determines the completion (messages and sampling parameters)."""
+    payload = json.dumps({'messages': messages, 'params': params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{model}\n{prompt_version}\n{payload}".encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.stats = {'hits': 0, 'misses': 0, 'tokens_saved': 0}
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # Used from the event loop and from worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                response_json TEXT NOT NULL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                total_tokens INTEGER,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """{'data': parsed JSON, 'usage': {...}} for a cached request, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_json, prompt_tokens, completion_tokens, total_tokens FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if not row:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        self.stats['tokens_saved'] += row[3] or 0
+        return {
+            'data': json.loads(row[0]),
+            'usage': {'prompt_tokens': row[1], 'completion_tokens': row[2], 'total_tokens': row[3]},
+        }
+
+    def put(self, key: str, model: str, prompt_version: str, data: Dict, usage=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_version, json.dumps(data, ensure_ascii=False),
+                 getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None),
+                 getattr(usage, 'total_tokens', None), time.time())
+            )
+            self._conn.commit()
@@ -0,0 +1,127 @@
+"""
+Rule-based Notice Field Extraction
+==================================
+Pulls minimum_price, appraised_price and auction_date out of attachment text with
+compiled patterns before the LLM is called. Court sale notices state these in a
+few fixed forms (최저매각가격 금 1,000,000원 / 감정가 3억 2,000만원 / 매각기일 2025. 3. 14.),
+so fields found here are filled deterministically and dropped from the prompt;
+the LLM is asked only for the narrative summary and whatever the rules missed.
+"""
+
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+# Amounts: "1,000,000원", "금 1,000,000 원", "3억 2,000만원", "5천만원", "1억 2천 3백만원"
+_AMOUNT = r'(?P<amount>\d[\d,]*(?:\s*(?:조|억|만|천|백|십)\s*(?:\d[\d,]*)?)*\s*원)'
+AMOUNT_PART_RE = re.compile(r'(\d[\d,]*)?\s*(조|억|만|천|백|십)|(\d[\d,]*)')
+# 조/억/만 close a four-digit group; 천/백/십 multiply within the group ("2천 3백만" = 2300만)
+GROUP_UNITS = {'조': 1_000_000_000_000, '억': 100_000_000, '만': 10_000}
+DIGIT_UNITS = {'천': 1_000, '백': 100, '십': 10}
+
+# Dates: "2025. 3. 14.", "2025-03-14", "2025년 3월 14일", optionally a range "… ~ 2025. 3. 20."
+DATE_PATTERN = r'(20\d{2})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})\s*일?'
+_DATE = r'20\d{2}\s*[.\-/년]\s*\d{1,2}\s*[.\-/월]\s*\d{1,2}\s*일?'
+
+# Label, then (within a short window, possibly across a table line break, past a
+# "1회"/"2차" round marker or an "as of" date) the amount. "최저매각가격의 10%" style
+# references are skipped.
+_WINDOW = (r'(?!의)[^\d\n]{0,20}\n?[^\d\n]{0,20}(?:\d+\s*(?:회차|회|차)[^\d\n]{0,10})?'
+           r'(?:' + _DATE + r'\.?[^\d\n]{0,10})?')
+MINIMUM_PRICE_RE = re.compile(
+    r'(?:최저\s*매각\s*(?:가격|금액|가(?!격))|최저\s*입찰\s*(?:가격|금액|가(?!격))|매각\s*예정\s*가격|최저가(?!격))'
+    + _WINDOW + _AMOUNT
+)
+APPRAISED_PRICE_RE = re.compile(
+    r'(?:감정\s*평가\s*(?:액|금액|가격)|감정\s*(?:가격|금액|가(?!격)))' + _WINDOW + _AMOUNT
+)
+
+AUCTION_DATE_RE = re.compile(
+    r'(?:매각\s*기일|입찰\s*기일|입찰\s*마감|입찰\s*기간|매각\s*일시|입찰\s*일시|개찰\s*일시|마감\s*일시)'
+    r'[^\d\n]{0,20}\n?[^\d\n]{0,20}'
+    r'(?P<start>' + _DATE + r')'
+    r'(?:[^~∼\n]{0,20}?[~∼]\s*(?P<end>' + _DATE + r'))?'
+)
+DATE_RE = re.compile(DATE_PATTERN)
+
+# Amounts below this are deposits/fees picked up by accident, not sale prices
+MIN_PLAUSIBLE_PRICE = 10_000
+
+
+def parse_amount(text: str) -> Optional[int]:
+    """'3억 2,000만원' -> 320000000, '1억 2천 3백만원' -> 123000000; None when no digits."""
+    total = 0
+    group = 0
+    found = False
+    for unit_digits, unit, plain_digits in AMOUNT_PART_RE.findall(text):
+        digits = (unit_digits or plain_digits).replace(',', '')
+        value = int(digits) if digits else 0
+        found = found or bool(digits)
+        if unit in GROUP_UNITS:
+            total += (group + value) * GROUP_UNITS[unit]
+            group = 0
+        elif unit in DIGIT_UNITS:
+            group += (value or 1) * DIGIT_UNITS[unit]  # "천만" = 1천만
+        else:
+            group += value
+    return total + group if found else None
+
+
+def parse_date(text: str) -> Optional[date]:
+    match = DATE_RE.search(text or "")
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def _amounts(pattern: re.Pattern, text: str) -> List[int]:
+    values = []
+    for match in pattern.finditer(text):
+        value = parse_amount(match.group('amount'))
+        if value and value >= MIN_PLAUSIBLE_PRICE:
+            values.append(value)
+    return values
+
+
+def _auction_dates(text: str) -> List[date]:
+    dates = []
+    for match in AUCTION_DATE_RE.finditer(text):
+        # For a bidding period the deadline (end of the range) is the relevant date
+        parsed = parse_date(match.group('end')) if match.group('end') else None
+        parsed = parsed or parse_date(match.group('start'))
+        if parsed:
+            dates.append(parsed)
+    return dates
+
+
+def extract_notice_fields(text: str, today: Optional[date] = None) -> Dict[str, str]:
+    """
+    Fields found by the rules, in the same shape the LLM returns them:
+      minimum_price    lowest labelled minimum sale price (digits)
+      appraised_price  first labelled appraisal value (digits)
+      auction_date     earliest upcoming sale date / bidding deadline (YYYY-MM-DD),
+                       or the most recent one when all are past
+    Fields the rules cannot find are omitted.
+    """
+    if not text:
+        return {}
+    fields = {}
+
+    minimum_prices = _amounts(MINIMUM_PRICE_RE, text)
+    if minimum_prices:
+        fields['minimum_price'] = str(min(minimum_prices))
+
+    appraised_prices = _amounts(APPRAISED_PRICE_RE, text)
+    if appraised_prices:
+        fields['appraised_price'] = str(appraised_prices[0])
+
+    dates = _auction_dates(text)
+    if dates:
+        today = today or date.today()
+        upcoming = [d for d in dates if d >= today]
+        fields['auction_date'] = (min(upcoming) if upcoming else max(dates)).isoformat()
+
+    return fields
@@ -0,0 +1,109 @@
+"""
+Leased Work Queue for AI Summaries
+==================================
+Claims court_notices rows through the claim/renew/release functions in
+add_ai_summary_leases.sql so several summary workers (the cron workflow, the
+scraper.py tail call, a manual run) can run at once without processing — and
+paying OpenAI for — the same notice twice.
+
+A claim is a lease: a background heartbeat renews it while the worker runs;
+if the worker dies the lease simply expires and another worker picks the notice up.
+"""
+
+import os
+import uuid
+import socket
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_LEASE_SECONDS = 900
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def default_worker_id() -> str:
+    run_id = os.getenv("GITHUB_RUN_ID")
+    prefix = f"gha-{run_id}" if run_id else socket.gethostname()
+    return f"{prefix}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class NoticeLeaseQueue:
+    def __init__(self, supabase_client, worker_id: Optional[str] = None,
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.supabase = supabase_client
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.held: set = set()
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def claim_ids(self, ids: List[str]) -> List[Dict]:
+        """
+        Leases the given notices (the scheduler's pick); ones taken by another worker are skipped.
+        Raises when the lease functions are not installed (caller falls back to an unleased select).
+        """
+        if not ids:
+            return []
+        result = self.supabase.rpc("claim_ai_summary_ids", {
+            "p_worker": self.worker_id,
+            "p_ids": list(ids),
+            "p_lease_seconds": self.lease_seconds,
+        }).execute()
+        notices = result.data or []
+        with self._held_lock:
+            self.held.update(n['id'] for n in notices)
+        return notices
+
+    def renew(self) -> int:
+        with self._held_lock:
+            ids = list(self.held)
+        if not ids:
+            return 0
+        result = self.supabase.rpc("renew_ai_summary_leases", {
+            "p_worker": self.worker_id,
+            "p_ids": ids,
+            "p_lease_seconds": self.lease_seconds,
+        }).execute()
+        return result.data or 0
+
+    def release(self, ids: List[str], error: Optional[str] = None) -> int:
+        """
+        Gives leases back. Notices already summarised are simply unlocked; the rest record
+        `error` and become claimable again, or dead-lettered after max_attempts.
+        """
+        if not ids:
+            return 0
+        try:
+            result = self.supabase.rpc("release_ai_summary_leases", {
+                "p_worker": self.worker_id,
+                "p_ids": list(ids),
+                "p_error": error,
+                "p_max_attempts": self.max_attempts,
+            }).execute()
+        except Exception as e:
+            # Leases expire on their own; a failed release only delays the retry
+            print(f"  ⚠️ Lease release failed ({len(ids)} notices): {e}")
+            return 0
+        with self._held_lock:
+            self.held.difference_update(ids)
+        return result.data or 0
+
+    def _heartbeat_loop(self):
+        interval = max(self.lease_seconds / 3, 5)
+        while not self._stop.wait(interval):
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"  ⚠️ Lease heartbeat failed: {e}")
+
+    def start_heartbeat(self):
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=5)
+            self._heartbeat_thread = None
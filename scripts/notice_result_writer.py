@@ -0,0 +1,165 @@
+"""
+Batched AI Result Write-back
+============================
+Writes finished AI summaries to court_notices and court_notices_history in bulk.
+
+Rows go through the apply_ai_summaries() function (add_ai_result_writeback.sql), which
+updates both tables in one call per chunk. When the function is not installed the writer
+falls back to chunked upserts into court_notices plus per-row updates of existing
+court_notices_history rows (the archive is never inserted into). Transient failures (connection drops, timeouts, lock
+conflicts) are retried with backoff, so a finished — already paid-for — summary is not
+lost to a momentary database error. A chunk rejected for any other reason (e.g. one row with
+a value the database can't cast) is split in halves and retried, so only the bad row is lost.
+"""
+
+import time
+import random
+from typing import Dict, List
+
+import httpx
+from postgrest.exceptions import APIError
+
+RPC_NAME = "apply_ai_summaries"
+WRITE_CHUNK_SIZE = 200
+MAX_RETRIES = 4
+
+# Columns written by apply_ai_summaries (the rest of a row only matters to the upsert fallback)
+RESULT_COLUMNS = ("ai_summary", "minimum_price", "appraised_price", "auction_date")
+
+# PostgREST connection/timeout codes and Postgres connection, serialization/deadlock,
+# resource and cancelled-statement classes
+TRANSIENT_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "502", "503", "504"}
+TRANSIENT_SQLSTATE_PREFIXES = ("08", "40", "53", "57")
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+MISSING_TABLE_CODES = {"PGRST205", "42P01"}
+
+
+def result_row(notice: Dict, update_data: Dict) -> Dict:
+    """
+    One write-back row. NOT NULL columns (site_id, title, source_type) ride along so the
+    upsert fallback can't insert partial rows.
+    """
+    return {
+        'id': notice['id'],
+        'site_id': notice.get('site_id'),
+        'source_type': notice.get('source_type', 'notice'),
+        'title': notice.get('title'),
+        **update_data,
+    }
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        return code in TRANSIENT_CODES or code.startswith(TRANSIENT_SQLSTATE_PREFIXES)
+    return False
+
+
+def _is_missing_function(error: Exception) -> bool:
+    return isinstance(error, APIError) and str(error.code or "") in MISSING_FUNCTION_CODES
+
+
+def _is_missing_table(error: Exception) -> bool:
+    return isinstance(error, APIError) and str(error.code or "") in MISSING_TABLE_CODES
+
+
+class NoticeResultWriter:
+    def __init__(self, supabase_client, chunk_size: int = WRITE_CHUNK_SIZE, max_retries: int = MAX_RETRIES):
+        self.supabase = supabase_client
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.use_rpc = True
+        self.archive_history = True
+        self.stats = {'written': 0, 'failed': 0, 'calls': 0, 'retries': 0}
+
+    def write(self, rows: List[Dict]) -> List[str]:
+        """Writes result rows (see result_row); returns the ids that were saved."""
+        saved: List[str] = []
+        for start in range(0, len(rows), self.chunk_size):
+            saved.extend(self._write_isolating(rows[start:start + self.chunk_size]))
+        self.stats['written'] += len(saved)
+        self.stats['failed'] += len(rows) - len(saved)
+        return saved
+
+    def _write_isolating(self, chunk: List[Dict]) -> List[str]:
+        """Writes a chunk; a non-transient failure is bisected down to the offending rows."""
+        try:
+            return self._write_chunk(chunk)
+        except Exception as e:
+            if is_transient(e) or len(chunk) == 1:
+                ids = chunk[0]['id'] if len(chunk) == 1 else f"{len(chunk)} results"
+                print(f"  ❌ DB save error ({ids}): {e}")
+                return []
+            mid = len(chunk) // 2
+            print(f"  ⚠️ DB rejected {len(chunk)} results ({e}); splitting to isolate the bad row")
+            return self._write_isolating(chunk[:mid]) + self._write_isolating(chunk[mid:])
+
+    def _write_chunk(self, chunk: List[Dict]) -> List[str]:
+        if self.use_rpc:
+            try:
+                return self._with_retry(self._write_rpc, chunk)
+            except APIError as e:
+                if not _is_missing_function(e):
+                    raise
+                print(f"  ⚠️ {RPC_NAME}() not installed; falling back to chunked upserts")
+                self.use_rpc = False
+        return self._with_retry(self._write_upserts, chunk)
+
+    def _with_retry(self, fn, chunk: List[Dict]) -> List[str]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.stats['calls'] += 1
+                return fn(chunk)
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient(e):
+                    raise
+                delay = min(30.0, 2 ** attempt) + random.uniform(0, 1)
+                self.stats['retries'] += 1
+                print(f"  ⏳ DB write failed ({e}), retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def _write_rpc(self, chunk: List[Dict]) -> List[str]:
+        payload = [{'id': row['id'], **{k: row[k] for k in RESULT_COLUMNS if k in row}} for row in chunk]
+        result = self.supabase.rpc(RPC_NAME, {"p_rows": payload}).execute()
+        return [r['id'] for r in (result.data or [])]
+
+    def _write_upserts(self, chunk: List[Dict]) -> List[str]:
+        """
+        Fallback: one court_notices upsert per column set. Rows are grouped by their keys because a
+        bulk upsert writes the union of columns and would null out fields a result did not provide.
+        """
+        groups: Dict[frozenset, List[Dict]] = {}
+        for row in chunk:
+            groups.setdefault(frozenset(row), []).append(row)
+
+        saved = []
+        for group in groups.values():
+            result = self.supabase.table("court_notices").upsert(group, on_conflict="id").execute()
+            saved.extend(r['id'] for r in (result.data or []))
+
+        saved_ids = set(saved)
+        self._update_history([row for row in chunk if row['id'] in saved_ids])
+        return saved
+
+    def _update_history(self, rows: List[Dict]):
+        """
+        Archive double-write for the fallback: like apply_ai_summaries(), only existing
+        court_notices_history rows are updated. A failure here does not fail the saved result.
+        """
+        for row in rows:
+            if not self.archive_history or not row.get('site_id'):
+                continue
+            fields = {k: row[k] for k in RESULT_COLUMNS if k in row}
+            try:
+                self.supabase.table("court_notices_history").update(fields) \
+                    .eq("site_id", row['site_id']) \
+                    .eq("source_type", row.get('source_type', 'notice')) \
+                    .execute()
+            except Exception as e:
+                if _is_missing_table(e):
+                    print("  ⚠️ court_notices_history not found; skipping the archive double-write")
+                    self.archive_history = False
+                else:
+                    print(f"  ⚠️ History update failed ({row['site_id']}): {e}")
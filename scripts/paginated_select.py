@@ -0,0 +1,77 @@
+"""
+Streaming Paginated Select
+==========================
+PostgREST silently caps a select at its max-rows setting (1000 on Supabase), so a plain
+`.select(...).execute()` over court_notices / court_notices_history quietly drops rows once a
+range grows past that. stream_rows() walks the result by keyset pagination instead: each page
+continues after the last row's key, so every page is an index range scan (no OFFSET) and
+callers can aggregate row by row in constant memory.
+
+Usage:
+    from paginated_select import stream_rows
+
+    for row in stream_rows(supabase, "court_notices", "id, category",
+                           filters=lambda q: q.eq("date_posted", "2026-03-20")):
+        ...
+
+    # Non-unique key: add a unique tie-breaker so rows sharing a key are not skipped
+    stream_rows(supabase, "court_notices", "title, date_posted", order_by="date_posted", tiebreak="id")
+"""
+
+import os
+from typing import Callable, Dict, Iterator, Optional
+
+# The server's max-rows cap; a page shorter than the requested size then reliably means "last page"
+MAX_ROWS = int(os.getenv("SUPABASE_MAX_ROWS", "1000"))
+PAGE_SIZE = min(int(os.getenv("SUPABASE_PAGE_SIZE", str(MAX_ROWS))), MAX_ROWS)
+
+
+def _quote(value) -> str:
+    """Quotes a value for a PostgREST logic tree (dates/timestamps contain reserved , . : characters)."""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def stream_rows(client, table: str, columns: str = "*",
+                filters: Optional[Callable] = None,
+                order_by: str = "id",
+                tiebreak: Optional[str] = None,
+                page_size: int = PAGE_SIZE,
+                desc: bool = False) -> Iterator[Dict]:
+    """
+    Yields every row of `table` matching `filters`, ordered by `order_by` (then `tiebreak`).
+
+    filters: function applying .eq/.gte/... to the select builder.
+    order_by: indexed, non-null column to page on (rows whose key is NULL are never reached);
+              it must also be unique unless `tiebreak` is given.
+    tiebreak: unique column (usually "id") for a non-unique `order_by`.
+    page_size: rows per request, capped at MAX_ROWS.
+    The key columns are added to the projection when missing.
+    """
+    page_size = max(1, min(page_size, MAX_ROWS))
+    keys = [order_by] + ([tiebreak] if tiebreak else [])
+    listed = {c.strip() for c in columns.split(",")}
+    if "*" not in listed:
+        columns = ", ".join([columns] + [k for k in keys if k not in listed])
+    op = "lt" if desc else "gt"
+
+    last: Optional[Dict] = None
+    while True:
+        query = client.table(table).select(columns)
+        if filters:
+            query = filters(query)
+        for key in keys:
+            query = query.order(key, desc=desc)
+
+        if last is not None:
+            if tiebreak:
+                k, t = last[order_by], last[tiebreak]
+                query = query.or_(f"{order_by}.{op}.{_quote(k)},"
+                                  f"and({order_by}.eq.{_quote(k)},{tiebreak}.{op}.{_quote(t)})")
+            else:
+                query = getattr(query, op)(order_by, last[order_by])
+
+        page = query.limit(page_size).execute().data or []
+        yield from page
+        if len(page) < page_size:
+            return
+        last = page[-1]
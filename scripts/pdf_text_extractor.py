@@ -0,0 +1,209 @@
+"""
+Tiered PDF Text Extraction
+==========================
+Per-page extraction for court notice attachments, cheapest tier first:
+
+  1. PyMuPDF native text (fast, used for every page with a text layer)
+  2. pdfplumber, only for pages that look like ruled tables, where its
+     line-ordered output keeps price tables readable
+  3. OCR callback, only for image-only pages (scans), skipping blank and
+     near-duplicate pages and rendering at a page-size-adaptive zoom
+
+Kept free of Supabase/OpenAI setup so bench_pdf_extraction.py can import it directly.
+"""
+
+import io
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import fitz  # pymupdf
+import pdfplumber
+
+# A page with less text than this is treated as having no text layer
+MIN_PAGE_TEXT = 20
+# Vector drawings (cell borders/rules) on a page that suggest a table layout
+TABLE_MIN_DRAWINGS = 8
+
+# OCR rendering: scale each page so its long edge lands in this pixel range,
+# whatever the page size (A4 at 2x zoom is ~1680px)
+OCR_TARGET_LONG_EDGE = 1800
+OCR_MIN_ZOOM = 1.0
+OCR_MAX_ZOOM = 3.0
+OCR_JPEG_QUALITY = 85
+# Blank check: render with this long edge (keeps 9pt strokes visible; a 64px thumbnail averages
+# text to light gray), count "ink" pixels differing from the page's median tone by more than
+# BLANK_INK_MARGIN, and call the page blank when they are under BLANK_INK_RATIO of the page.
+# Relative to the median so gray paper and scanner tint do not count as ink.
+BLANK_RENDER_LONG_EDGE = 400
+BLANK_INK_MARGIN = 48
+BLANK_INK_RATIO = 0.002
+# Mean per-pixel difference (0-255) of page thumbnails at or below which two pages are the same scan
+DUPLICATE_MAX_MEAN_DIFF = 2.0
+THUMB_SIZE = 64
+
+
+def open_document(source: Union[bytes, str]):
+    """Opens a PyMuPDF document from in-memory bytes or a file path."""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def open_plumber(source: Union[bytes, str]):
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def page_is_table(page) -> bool:
+    try:
+        return len(page.get_drawings()) >= TABLE_MIN_DRAWINGS
+    except Exception:
+        return False
+
+
+def ocr_zoom(page) -> float:
+    """Render zoom that gives OCR a consistent resolution for small and large pages alike."""
+    long_edge = max(page.rect.width, page.rect.height) or 1
+    return min(max(OCR_TARGET_LONG_EDGE / long_edge, OCR_MIN_ZOOM), OCR_MAX_ZOOM)
+
+
+def render_page_for_ocr(page, image_format: str = "jpeg") -> Tuple[bytes, str]:
+    """Renders a page at its adaptive zoom; returns (image bytes, mime type)."""
+    zoom = ocr_zoom(page)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    if image_format == "png":
+        return pix.tobytes("png"), "image/png"
+    return pix.tobytes("jpeg", jpg_quality=OCR_JPEG_QUALITY), "image/jpeg"
+
+
+def page_thumbnail(page) -> bytes:
+    """64x64 grayscale render of the whole page (aspect ignored), used to spot duplicate scans."""
+    rect = page.rect
+    thumb = page.get_pixmap(matrix=fitz.Matrix(THUMB_SIZE / max(rect.width, 1), THUMB_SIZE / max(rect.height, 1)),
+                            colorspace=fitz.csGRAY, alpha=False)
+    return bytes(thumb.samples)
+
+
+def ink_sample(page) -> bytes:
+    """Grayscale render at BLANK_RENDER_LONG_EDGE (aspect kept) for the blank check."""
+    zoom = BLANK_RENDER_LONG_EDGE / max(page.rect.width, page.rect.height, 1)
+    return bytes(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False).samples)
+
+
+def is_blank(gray: bytes) -> bool:
+    """True when almost no pixel stands out from the page's median (paper) tone."""
+    if not gray:
+        return True
+    background = statistics.median_low(gray)
+    ink = bytes(1 if abs(v - background) > BLANK_INK_MARGIN else 0 for v in range(256))
+    return gray.translate(ink).count(1) / len(gray) < BLANK_INK_RATIO
+
+
+def is_duplicate(thumb: bytes, other: bytes) -> bool:
+    """Same scan (re-attached cover sheet, duplicated page): nearly identical thumbnails."""
+    if len(thumb) != len(other):
+        return False
+    diff = sum(abs(a - b) for a, b in zip(thumb, other))
+    return diff / max(len(thumb), 1) <= DUPLICATE_MAX_MEAN_DIFF
+
+
+def select_ocr_pages(doc, page_numbers: List[int]) -> Tuple[List[int], Dict[str, int]]:
+    """Drops blank pages and near-duplicate scans (e.g. a repeated cover sheet) before OCR."""
+    selected: List[int] = []
+    seen: List[bytes] = []
+    skipped = {'blank': 0, 'duplicate': 0}
+    for page_num in page_numbers:
+        if is_blank(ink_sample(doc[page_num])):
+            skipped['blank'] += 1
+            continue
+        thumb = page_thumbnail(doc[page_num])
+        if any(is_duplicate(thumb, other) for other in seen):
+            skipped['duplicate'] += 1
+            continue
+        seen.append(thumb)
+        selected.append(page_num)
+    return selected, skipped
+
+
+def classify_pages(doc) -> Dict:
+    """
+    Runs the fitz tier over every page and sorts pages into tiers.
+    Returns {'texts': [...], 'table_pages': [...], 'image_pages': [...]}.
+    """
+    texts: List[str] = []
+    table_pages: List[int] = []
+    image_pages: List[int] = []
+
+    for page_num, page in enumerate(doc):
+        page_text = page.get_text() or ""
+        if len(page_text.strip()) < MIN_PAGE_TEXT:
+            texts.append("")
+            if page.get_images(full=False) or not page_text.strip():
+                image_pages.append(page_num)
+            continue
+        texts.append(page_text)
+        if page_is_table(page):
+            table_pages.append(page_num)
+
+    return {'texts': texts, 'table_pages': table_pages, 'image_pages': image_pages}
+
+
+def extract_tiered(source: Union[bytes, str],
+                   ocr_pages: Optional[Callable] = None,
+                   max_ocr_pages: int = 5) -> Dict:
+    """
+    Extracts text page by page, escalating to pdfplumber / OCR only where needed.
+
+    ocr_pages(doc, page_numbers) -> {page_number: text} is called with the image-only
+    pages (blank and duplicate scans removed, at most max_ocr_pages); pass None to skip OCR.
+
+    Returns {'text', 'method', 'page_count', 'ocr_pages', 'ocr_skipped', 'tiers'} where method is the
+    most expensive tier used ('fitz' < 'pdfplumber' < 'vision').
+    """
+    doc = open_document(source)
+    try:
+        pages = classify_pages(doc)
+        texts = pages['texts']
+        tiers = {'fitz': len(texts) - len(pages['image_pages']) - len(pages['table_pages']),
+                 'pdfplumber': 0, 'vision': 0}
+
+        if pages['table_pages']:
+            try:
+                with open_plumber(source) as pdf:
+                    for page_num in pages['table_pages']:
+                        table_text = pdf.pages[page_num].extract_text() or ""
+                        if table_text.strip():
+                            texts[page_num] = table_text
+                            tiers['pdfplumber'] += 1
+                        else:
+                            tiers['fitz'] += 1
+            except Exception as e:
+                print(f"  ⚠️ pdfplumber failed, keeping fitz text: {e}")
+                tiers['fitz'] += len(pages['table_pages']) - tiers['pdfplumber']
+
+        ocr_targets, skipped = select_ocr_pages(doc, pages['image_pages']) if ocr_pages else ([], {})
+        ocr_targets = ocr_targets[:max_ocr_pages]
+        if ocr_targets:
+            for page_num, page_text in ocr_pages(doc, ocr_targets).items():
+                if page_text:
+                    texts[page_num] = page_text
+                    tiers['vision'] += 1
+
+        page_count = len(texts)
+    finally:
+        doc.close()
+
+    if tiers['vision']:
+        method = 'vision'
+    elif tiers['pdfplumber']:
+        method = 'pdfplumber'
+    else:
+        method = 'fitz'
+
+    return {
+        'text': "\n".join(t.strip() for t in texts if t and t.strip()),
+        'method': method,
+        'page_count': page_count,
+        'ocr_pages': tiers['vision'],
+        'ocr_skipped': sum(skipped.values()),
+        'tiers': tiers,
+    }
@@ -1,12 +1,16 @@
 import os
 import json
 import argparse
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import openai
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from paginated_select import stream_rows
+import price_sketch
+
 # 환경 변수 로드
 load_dotenv(dotenv_path='.env.local')
 
@@ -25,41 +29,75 @@ def get_stats_for_period(start_date: str, end_date: str) -> Dict:
     """주어진 기간 동안의 통계를 daily_stats 테이블에서 집계합니다."""
     print(f"Aggregating stats from {start_date} to {end_date}...")
     
-    response = supabase.from_("daily_stats").select("*").gte("stat_date", start_date).lte("stat_date", end_date).execute()
-    stats_list = response.data
-    
-    if not stats_list:
-        return {}
+    # 일별 행을 페이지 단위로 읽으며 한 번에 누적 (연간 집계도 1000행 제한에 걸리지 않음)
+    rows = stream_rows(supabase, "daily_stats", "*", order_by="stat_date",
+                       filters=lambda q: q.gte("stat_date", start_date).lte("stat_date", end_date))
     
-    # 기초 집계
+    categories = ["real_estate", "vehicle", "asset", "bond", "stock", "patent"]
     summary = {
-        "total_notices": sum(s.get("total_count", 0) for s in stats_list),
-        "total_appraisal_price": sum(s.get("total_appraisal_price", 0) for s in stats_list),
-        "total_views": sum(s.get("total_views", 0) for s in stats_list),
-        "categories": {
-            "real_estate": sum(s.get("real_estate_count", 0) for s in stats_list),
-            "vehicle": sum(s.get("vehicle_count", 0) for s in stats_list),
-            "asset": sum(s.get("asset_count", 0) for s in stats_list),
-            "bond": sum(s.get("bond_count", 0) for s in stats_list),
-            "stock": sum(s.get("stock_count", 0) for s in stats_list),
-            "patent": sum(s.get("patent_count", 0) for s in stats_list),
-        },
-        "days_count": len(stats_list)
+        "total_notices": 0,
+        "total_appraisal_price": 0,
+        "total_views": 0,
+        "categories": {c: 0 for c in categories},
+        "days_count": 0
     }
+    max_appraisal = 0
+    courts = Counter()       # 법원별 공고 수 (daily_stats.court_counts 합산)
+    court_wins = Counter()   # 일별 1위 법원 빈도 (court_counts가 없는 옛 행이 섞인 기간용)
+    uncounted_days = 0
+    sketches = []
+    unsketched_days = 0      # 가격이 있는데 price_sketch가 없는 날 (분위수 계산 불가)
+    
+    for s in rows:
+        summary["days_count"] += 1
+        summary["total_notices"] += s.get("total_count") or 0
+        summary["total_appraisal_price"] += s.get("total_appraisal_price") or 0
+        summary["total_views"] += s.get("total_views") or 0
+        for c in categories:
+            summary["categories"][c] += s.get(f"{c}_count") or 0
+        max_appraisal = max(max_appraisal, s.get("max_appraisal_price") or 0)
+        if s.get("top_court"):
+            court_wins[s["top_court"]] += 1
+        if s.get("court_counts") is not None:
+            courts.update(s["court_counts"])
+        else:
+            uncounted_days += 1
+        if s.get("price_sketch") is not None:
+            sketches.append(s["price_sketch"])
+        elif s.get("total_appraisal_price"):
+            unsketched_days += 1
+    
+    if summary["days_count"] == 0:
+        return {}
     
     # 평균 및 최고가 계산
-    if summary["days_count"] > 0:
-        summary["avg_daily_notices"] = round(summary["total_notices"] / summary["days_count"], 1)
-        summary["max_appraisal_price"] = max(s.get("max_appraisal_price", 0) for s in stats_list)
+    summary["avg_daily_notices"] = round(summary["total_notices"] / summary["days_count"], 1)
+    summary["max_appraisal_price"] = max_appraisal
         
-    # 최다 발생 법원 찾기 (단일 추출이 어려우므로 전체 리스트에서 빈도 계산)
-    courts = [s.get("top_court") for s in stats_list if s.get("top_court")]
-    if courts:
-        from collections import Counter
-        summary["top_court"] = Counter(courts).most_common(1)[0][0]
+    # 최다 발생 법원: 일별 법원 분포를 합산한 정확한 값
+    if uncounted_days:
+        # 법원 분포가 없는 날이 섞이면 합산이 불가능하므로 기존 방식(일별 1위 빈도)으로 추정
+        print(f"⚠️ {uncounted_days} days lack court_counts; run daily_stats_aggregator.py --backfill to make top_court exact")
+        if court_wins:
+            summary["top_court"] = court_wins.most_common(1)[0][0]
+    elif courts:
+        summary["top_court"] = courts.most_common(1)[0][0]
+        summary["top_courts"] = dict(courts.most_common(5))
+    
+    # 감정가 분위수: 일별 스케치를 합쳐 기간 전체의 중앙값(p50)과 상위 10%(p90) 계산
+    if unsketched_days:
+        print(f"⚠️ {unsketched_days} days lack price_sketch; price quantiles skipped")
+    elif sketches:
+        p50, p90 = price_sketch.quantiles(price_sketch.merge(sketches), [0.5, 0.9])
+        if p50 is not None:
+            summary["p50_appraisal_price"] = p50
+            summary["p90_appraisal_price"] = p90
         
     return summary
 
+def format_price(value: Optional[int]) -> str:
+    return f"약 {value:,}원" if value is not None else "집계 없음"
+
 def generate_report_with_ai(period_name: str, stats: Dict, start_date: str, end_date: str) -> Dict:
     """AI를 사용하여 전문적인 리포트를 생성합니다."""
     print(f"Generating AI analysis for {period_name}...")
@@ -74,7 +112,10 @@ def generate_report_with_ai(period_name: str, stats: Dict, start_date: str, end_
 - 카테고리별 비중: {json.dumps(stats['categories'], ensure_ascii=False)}
 - 총 조회수(관심도): {stats['total_views']}회
 - 최다 매각 공고 법원: {stats.get('top_court', '전국 법원')}
+- 법원별 공고 건수 (상위 5곳): {json.dumps(stats.get('top_courts', {}), ensure_ascii=False)}
 - 기간 내 최고 감정가 물건: {stats.get('max_appraisal_price', 0):,}원
+- 감정가 중앙값(p50): {format_price(stats.get('p50_appraisal_price'))}
+- 감정가 상위 10% 기준(p90): {format_price(stats.get('p90_appraisal_price'))}
 
 이 데이터를 바탕으로 투자자와 대중에게 유익한 '프리미엄 시장 분석 보고서'를 작성하세요.
 보고서는 다음 요소를 포함해야 합니다:
@@ -0,0 +1,64 @@
+"""
+Price Quantile Sketch
+=====================
+A compact, mergeable summary of a day's prices (daily_stats.price_sketch) from which period
+rollups read medians and percentiles without rescanning court_notices.
+
+The sketch is a log-bucket histogram (the DDSketch layout): a positive price p lands in bucket
+ceil(log(p) / log(GAMMA)) and the sketch stores {bucket: notices}. Every price in a bucket is
+within RELATIVE_ACCURACY of the bucket's representative value, so any quantile read back is
+within ±2% of a real price. Unlike t-digest or KLL the buckets are fixed, which keeps the
+sketch exact under the operations daily_stats needs:
+  * merging days = adding counts per bucket (order-independent)
+  * taking a notice back out (daily_stats_deltas.py) = subtracting one from its bucket
+  * compute_daily_stats() in add_daily_stats_rpc.sql builds the identical map in SQL
+
+Prices span 1원 to trillions, i.e. at most ~750 buckets, and a day's notices occupy a few dozen.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_of(price: int) -> Optional[str]:
+    """Sketch key for a price (JSON object keys are strings); None for prices that are not positive."""
+    if price <= 0:
+        return None
+    return str(math.ceil(math.log(price) / _LOG_GAMMA))
+
+
+def bucket_value(key: str) -> int:
+    """Representative price of a bucket: within RELATIVE_ACCURACY of every price in it."""
+    return round(2 * GAMMA ** int(key) / (GAMMA + 1))
+
+
+def merge(sketches: Iterable[Optional[Dict]]) -> Dict[str, int]:
+    """Adds up sketches (None entries are skipped)."""
+    merged: Dict[str, int] = {}
+    for sketch in sketches:
+        for key, n in (sketch or {}).items():
+            merged[key] = merged.get(key, 0) + n
+    return merged
+
+
+def quantiles(sketch: Dict[str, int], qs: List[float]) -> List[Optional[int]]:
+    """Estimated prices at each quantile in qs (0..1); None for an empty sketch."""
+    buckets = sorted((int(key), n) for key, n in sketch.items() if n > 0)
+    total = sum(n for _, n in buckets)
+    if total == 0:
+        return [None for _ in qs]
+
+    results = []
+    for q in qs:
+        rank = q * (total - 1)  # 0-based rank of the q-quantile among the sketched prices
+        seen = 0
+        for index, n in buckets:
+            seen += n
+            if seen > rank:
+                results.append(bucket_value(str(index)))
+                break
+    return results
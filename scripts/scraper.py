@@ -10,6 +10,8 @@ import urllib3
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from daily_stats_deltas import DailyStatsDeltas
+
 # Load environment variables (from .env.local in project root)
 # Resolving path relative to this script file (scripts/scraper.py -> ../.env.local)
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -116,7 +118,7 @@ class CourtScraper:
         except Exception as e:
             print(f"Error deleting expired records: {e}")
 
-    def scrape_and_save(self, pages_to_scrape=3):
+    def scrape_and_save(self, pages_to_scrape=3, live_stats=True):
         # 1. Cleanup old records and expired notices
         # [STOPPED] 장기 통계 데이터 축적을 위해 자동 삭제 중단 (2026-03-20)
         # self.delete_old_records(90)
@@ -124,6 +126,8 @@ class CourtScraper:
         
         print(f"Starting Scraper... Target Pages: {pages_to_scrape}")
         count_new = 0
+        # daily_stats is updated from what this run writes (daily_stats_deltas.py)
+        stats_deltas = DailyStatsDeltas(supabase) if live_stats else None
         
         for page in range(1, pages_to_scrape + 1):
             print(f"Processing Page {page}...")
@@ -139,6 +143,10 @@ class CourtScraper:
                     continue
                 
                 rows = table.find_all('tr')[1:]
+                if stats_deltas:
+                    # Before-image of this page's notices, so re-upserts are not counted twice
+                    page_links = [cols[3].find('a') for cols in (r.find_all('td') for r in rows) if len(cols) >= 4]
+                    stats_deltas.snapshot(self.extract_seq_id(a) for a in page_links if a)
                 for row in rows:
                     cols = row.find_all('td')
                     if len(cols) < 4: continue
@@ -229,6 +237,8 @@ class CourtScraper:
                         
                         if result.data:
                             count_new += 1
+                            if stats_deltas:
+                                stats_deltas.record(result.data[0])
                             
                     except Exception as e:
                         print(f"Error processing item {site_id}: {e}")
@@ -238,15 +248,18 @@ class CourtScraper:
                 print(f"Page error: {e}")
         
         print(f"Scraping Finished. Processed successfully.")
+        if stats_deltas:
+            stats_deltas.flush()
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--no-live-stats", action="store_true", help="Do not update daily_stats from this run's writes")
     args = parser.parse_args()
 
     scraper = CourtScraper()
-    scraper.scrape_and_save(pages_to_scrape=args.pages)
+    scraper.scrape_and_save(pages_to_scrape=args.pages, live_stats=not args.no_live_stats)
     
     # Auto-generate AI analysis reports for new notices
     print("\n--- Starting AI Report Generation ---")
@@ -0,0 +1,101 @@
+"""
+Offline tests for ai_batch_summarizer against the fake Batch API (no network, no Supabase writes).
+
+ai_report_generator needs credentials at import time; dummy values are used, and every local
+cache/ledger path points into a temp dir so the test never touches the developer's .cache.
+"""
+
+import os
+import json
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="batch_test_")
+for _name, _value in {
+    "NEXT_PUBLIC_SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_SERVICE_ROLE_KEY": "test-key",
+    "OPENAI_API_KEY": "sk-test",
+    "LLM_CACHE_PATH": os.path.join(_tmp, "llm.sqlite"),
+    "AI_TELEMETRY_PATH": os.path.join(_tmp, "telemetry.sqlite"),
+    "ATTACHMENT_CACHE_DIR": os.path.join(_tmp, "attachments"),
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest
+
+import ai_batch_summarizer as batch
+import ai_report_generator as gen
+from fake_batch_api import FakeBatchAPI
+from llm_cache import LLMCache
+
+NOTICES = [
+    {'id': 'n1', 'site_id': 's1', 'source_type': 'notice', 'title': '아파트 매각공고', 'category': 'real_estate',
+     'department': '서울회생법원', 'file_info': []},
+    {'id': 'n2', 'site_id': 's2', 'source_type': 'notice', 'title': '차량 매각공고', 'category': 'vehicle',
+     'department': '수원지방법원', 'file_info': []},
+]
+TEXT = "최저매각가격 금 350,000,000원\n매각기일 2099. 3. 14.\n" * 3
+
+
+class NoWriteSupabase:
+    def __getattr__(self, name):
+        raise AssertionError(f"fake batch touched Supabase ({name})")
+
+
+@pytest.fixture
+def fake_env(tmp_path, monkeypatch):
+    api = FakeBatchAPI(state_dir=str(tmp_path / "api"))
+    monkeypatch.setattr(batch, "MANIFEST_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(batch, "get_client", lambda fake: api)
+    monkeypatch.setattr(batch, "select_notices", lambda categories, limit, resummarize: NOTICES[:limit])
+    monkeypatch.setattr(gen, "extract_notice_text", lambda notice: TEXT)
+    monkeypatch.setattr(gen, "supabase", NoWriteSupabase())
+    monkeypatch.setattr(gen, "llm_cache", LLMCache(str(tmp_path / "llm.sqlite")))
+    # restored after the test; submit(fake=True) switches these off
+    monkeypatch.setattr(gen, "MAX_OCR_PAGES", gen.MAX_OCR_PAGES)
+    monkeypatch.setattr(gen, "text_store", gen.text_store)
+    return api
+
+
+def test_fake_run_is_a_dry_run(fake_env):
+    batch_ids = batch.submit(["real_estate", "vehicle"], 10, False, fake=True, workers=2)
+    assert len(batch_ids) == 1
+    assert gen.MAX_OCR_PAGES == 0 and gen.text_store is None
+
+    stats = batch.apply_results(batch_ids[0], wait=True, poll_interval=0)
+    assert stats == {'applied': 0, 'parsed': 2, 'failed': 0, 'status': 'completed'}
+
+    # "[fake] ..." replies must never be served later as real summaries
+    manifest = batch.load_manifest(batch_ids[0])
+    for state in manifest['notices'].values():
+        assert gen.llm_cache.get(state['cache_key']) is None
+
+
+def test_parse_results(fake_env):
+    batch_id = batch.submit(["real_estate"], 2, False, fake=True, workers=1)[0]
+    manifest = batch.load_manifest(batch_id)
+    output = fake_env.files.content(fake_env.batches.retrieve(batch_id).output_file_id).text
+
+    updates = batch.parse_results(output, manifest)
+    assert set(updates) == {'n1', 'n2'}
+    assert updates['n1']['ai_summary'].startswith("[fake] ")
+    # rule-based fields from the attachment text win over the model's nulls
+    assert updates['n1']['minimum_price'] == "350000000"
+    assert updates['n1']['auction_date'] == "2099-03-14"
+
+    # the same output from a real batch is cached under each prompt's key
+    real = dict(manifest, fake=False)
+    batch.parse_results(output, real)
+    assert gen.llm_cache.get(manifest['notices']['n1']['cache_key'])['data']['summary'].startswith("[fake] ")
+
+
+def test_failed_lines_are_skipped(fake_env):
+    batch_id = batch.submit(["real_estate"], 2, False, fake=True, workers=1)[0]
+    manifest = batch.load_manifest(batch_id)
+    lines = [
+        {"custom_id": "n1", "response": {"status_code": 500, "body": {}}, "error": None},
+        {"custom_id": "n2", "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": "not json"}}]}}, "error": None},
+        {"custom_id": "unknown", "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": json.dumps({"summary": "x"})}}]}}, "error": None},
+    ]
+    assert batch.parse_results("\n".join(json.dumps(line) for line in lines), manifest) == {}
@@ -0,0 +1,170 @@
+"""
+Offline tests for daily_stats_deltas (live daily_stats updates from scraper writes).
+
+A small in-memory stand-in for the Supabase client holds court_notices and daily_stats; after
+every run the merged daily_stats rows must equal a full re-aggregation of court_notices.
+"""
+
+import copy
+from types import SimpleNamespace
+
+from daily_stats_deltas import DailyStatsDeltas
+from daily_stats_rollup import DayStats
+
+
+class StubQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.rows = None
+        self.on_conflict = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.rows = rows
+        self.on_conflict = on_conflict.split(",")
+        return self
+
+    def execute(self):
+        stored = self.db.tables.setdefault(self.table, [])
+        if self.rows is None:
+            return SimpleNamespace(data=[copy.deepcopy(r) for r in stored if all(f(r) for f in self.filters)])
+        self.db.calls.append(("upsert", self.table, [copy.deepcopy(r) for r in self.rows]))
+        for row in self.rows:
+            key = [row[c] for c in self.on_conflict]
+            stored[:] = [r for r in stored if [r.get(c) for c in self.on_conflict] != key]
+            stored.append(copy.deepcopy(row))
+        return SimpleNamespace(data=copy.deepcopy(self.rows))
+
+
+class StubSupabase:
+    def __init__(self, daily_stats=None):
+        self.tables = {"court_notices": [], "daily_stats": list(daily_stats or [])}
+        self.calls = []
+
+    def table(self, name):
+        return StubQuery(self, name)
+
+    def rpc(self, name, params):
+        self.calls.append(("rpc", name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[]))
+
+    def upserts(self, table):
+        return [rows for kind, name, rows in self.calls if kind == "upsert" and name == table]
+
+
+def notice(site_id, date_posted="2025-03-10", category="real_estate", department="서울회생법원",
+           appraised_price="100000000", view_count=5):
+    return {'site_id': site_id, 'source_type': 'notice', 'date_posted': date_posted, 'category': category,
+            'department': department, 'appraised_price': appraised_price, 'minimum_price': None,
+            'view_count': view_count}
+
+
+def scrape_run(db, notices):
+    """What scraper.py does per run: snapshot the page, upsert each notice, record it, flush."""
+    deltas = DailyStatsDeltas(db)
+    deltas.snapshot(n['site_id'] for n in notices)
+    for n in notices:
+        written = db.table("court_notices").upsert([n], on_conflict="site_id,source_type").execute()
+        deltas.record(written.data[0])
+    return deltas, deltas.flush()
+
+
+def full_aggregation(db):
+    days = {}
+    for row in db.tables["court_notices"]:
+        days.setdefault(row['date_posted'], DayStats()).add(row)
+    return {d: stats.merge_into(None, d) for d, stats in days.items()}
+
+
+def stored_stats(db, ignore=("max_appraisal_price",)):
+    return {row['stat_date']: {k: v for k, v in row.items() if k not in ignore}
+            for row in db.tables["daily_stats"] if row['total_count'] > 0}
+
+
+def expected_stats(db, ignore=("max_appraisal_price",)):
+    return {d: {k: v for k, v in row.items() if k not in ignore} for d, row in full_aggregation(db).items()}
+
+
+def test_new_notices_are_merged():
+    db = StubSupabase()
+    _, updated = scrape_run(db, [notice("a"), notice("b", category="vehicle", appraised_price="3000000"),
+                                 notice("c", date_posted="2025-03-11", department=None)])
+    assert updated == 2
+    assert stored_stats(db, ignore=()) == expected_stats(db, ignore=())
+    assert db.tables["daily_stats"][0]['court_counts']
+
+
+def test_unchanged_reupsert_is_not_double_counted():
+    db = StubSupabase()
+    run = [notice("a"), notice("b", category="vehicle")]
+    scrape_run(db, run)
+    before = copy.deepcopy(db.tables["daily_stats"])
+    upserts = len(db.upserts("daily_stats"))
+
+    deltas, updated = scrape_run(db, copy.deepcopy(run))
+    assert deltas.deltas() == {}
+    assert updated == 0
+    assert len(db.upserts("daily_stats")) == upserts
+    assert db.tables["daily_stats"] == before
+
+
+def test_category_change_moves_the_count():
+    db = StubSupabase()
+    scrape_run(db, [notice("a"), notice("b")])
+    scrape_run(db, [notice("a", category="vehicle", appraised_price="50000000", view_count=9)])
+
+    assert stored_stats(db) == expected_stats(db)
+    row = stored_stats(db)["2025-03-10"]
+    assert (row['total_count'], row['real_estate_count'], row['vehicle_count']) == (2, 1, 1)
+
+
+def test_date_change_moves_the_notice_between_days():
+    db = StubSupabase()
+    scrape_run(db, [notice("a"), notice("b")])
+    scrape_run(db, [notice("a", date_posted="2025-03-12", department="수원지방법원")])
+
+    assert stored_stats(db) == expected_stats(db)
+    old_day = stored_stats(db)["2025-03-10"]
+    assert old_day['total_count'] == 1 and old_day['court_counts'] == {"서울회생법원": 1}
+    assert stored_stats(db)["2025-03-12"]['top_court'] == "수원지방법원"
+
+
+def test_notice_written_twice_in_one_run_counts_once():
+    db = StubSupabase()
+    _, updated = scrape_run(db, [notice("a"), notice("a", view_count=7)])
+    assert updated == 1
+    row = stored_stats(db)["2025-03-10"]
+    assert (row['total_count'], row['total_views'], row['priced_count']) == (1, 7, 1)
+    assert stored_stats(db) == expected_stats(db)
+
+
+def test_legacy_row_is_recomputed():
+    legacy = {'stat_date': "2025-03-10", 'total_count': 4, 'real_estate_count': 4, 'total_views': 0,
+              'court_counts': None, 'priced_count': None, 'price_sketch': None}
+    db = StubSupabase(daily_stats=[legacy])
+    _, updated = scrape_run(db, [notice("a"), notice("b", date_posted="2025-03-11")])
+
+    assert updated == 2
+    assert ("rpc", "refresh_daily_stats", {"p_start": "2025-03-10", "p_end": "2025-03-10"}) in db.calls
+    merged_dates = [row['stat_date'] for rows in db.upserts("daily_stats") for row in rows]
+    assert merged_dates == ["2025-03-11"]
+
+
+def test_write_without_snapshot_recomputes_its_day():
+    db = StubSupabase()
+    deltas = DailyStatsDeltas(db)
+    deltas.record(notice("a"))
+    assert deltas.flush() == 1
+    assert db.calls == [("rpc", "refresh_daily_stats", {"p_start": "2025-03-10", "p_end": "2025-03-10"})]
@@ -0,0 +1,113 @@
+"""
+Offline tests for notice_field_extractor (no network, no Supabase).
+
+Usage: python -m pytest   (pip install pytest; pytest.ini points at scripts/tests)
+"""
+
+from datetime import date
+
+import pytest
+
+from notice_field_extractor import extract_notice_fields, parse_amount, parse_date
+
+TODAY = date(2025, 3, 1)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,000,000원", 1_000_000),
+    ("금 1,000,000 원", 1_000_000),
+    ("2억원", 200_000_000),
+    ("3억 2,000만원", 320_000_000),
+    ("5천만원", 50_000_000),
+    ("1억2천만원", 120_000_000),
+    ("1억 2천 3백만원", 123_000_000),
+    ("3백5십만원", 3_500_000),
+    ("12조 3억원", 12_000_300_000_000),
+    ("미정", None),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025. 3. 14.", date(2025, 3, 14)),
+    ("2025-03-14", date(2025, 3, 14)),
+    ("2025년 3월 14일", date(2025, 3, 14)),
+    ("2025. 13. 45.", None),
+    ("추후 공고", None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("최저매각가격 금 1,000,000원", "1000000"),
+    ("최저입찰가격: 35,000,000 원", "35000000"),
+    ("매각예정가격 2억 5,000만원", "250000000"),
+    ("최저가 7천만원", "70000000"),
+    # label and amount in neighbouring table cells
+    ("최저매각가격\n 12,300,000원", "12300000"),
+    # round marker between label and amount; the lowest round wins
+    ("최저매각가격 1회 10,000,000원\n최저매각가격 2회 8,000,000원", "8000000"),
+    # "as of" date between label and amount
+    ("최저매각가격 2025. 3. 14. 기준 1,000,000원", "1000000"),
+    ("최저매각가격 1억 2천 3백만원", "123000000"),
+])
+def test_minimum_price(text, expected):
+    assert extract_notice_fields(text, today=TODAY).get("minimum_price") == expected
+
+
+def test_minimum_price_reference_is_skipped():
+    # "최저매각가격의 10%" is the deposit rule, not a price
+    fields = extract_notice_fields("입찰보증금: 최저매각가격의 10% (500,000원)", today=TODAY)
+    assert "minimum_price" not in fields
+
+
+def test_implausibly_small_amount_is_ignored():
+    assert "minimum_price" not in extract_notice_fields("최저매각가격 5,000원", today=TODAY)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("감정평가액 금 150,000,000원", "150000000"),
+    ("감정가 3억 2,000만원", "320000000"),
+    ("감정금액: 1억 2천 3백만원", "123000000"),
+])
+def test_appraised_price(text, expected):
+    assert extract_notice_fields(text, today=TODAY).get("appraised_price") == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("매각기일 2025. 3. 14. 10:00", "2025-03-14"),
+    ("입찰기일: 2025년 4월 2일", "2025-04-02"),
+    # bidding period: the deadline counts
+    ("입찰기간 2025. 3. 10. ~ 2025. 3. 20.", "2025-03-20"),
+    # earliest upcoming date, past ones ignored
+    ("매각기일 2025. 2. 1.\n매각기일 2025. 3. 20.\n매각기일 2025. 3. 5.", "2025-03-05"),
+    # all past: the most recent
+    ("매각기일 2025. 1. 10.\n매각기일 2025. 2. 10.", "2025-02-10"),
+])
+def test_auction_date(text, expected):
+    assert extract_notice_fields(text, today=TODAY).get("auction_date") == expected
+
+
+def test_sample_notice():
+    text = """
+    --- 매각공고.pdf ---
+    사건번호 2024하단1234 파산자 홍길동
+    1. 매각대상: 서울특별시 강남구 소재 아파트
+    2. 감정평가액: 금 850,000,000원
+    3. 최저매각가격: 1회 금 850,000,000원
+       최저매각가격: 2회 금 680,000,000원
+    4. 입찰기간: 2025. 3. 10. ~ 2025. 3. 21. 17:00
+    5. 입찰보증금: 최저매각가격의 10%
+    """
+    assert extract_notice_fields(text, today=TODAY) == {
+        "minimum_price": "680000000",
+        "appraised_price": "850000000",
+        "auction_date": "2025-03-21",
+    }
+
+
+def test_no_fields():
+    assert extract_notice_fields("", today=TODAY) == {}
+    assert extract_notice_fields("파산관재인 공고문입니다.", today=TODAY) == {}
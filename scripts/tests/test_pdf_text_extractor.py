@@ -0,0 +1,66 @@
+"""
+Offline tests for pdf_text_extractor's OCR page selection (no network, no Vision calls).
+
+Scanned notices are simulated by rendering text to a bitmap and placing it as the only
+content of an image-only page, the way a scanner PDF looks to PyMuPDF.
+"""
+
+import fitz
+import pytest
+
+from pdf_text_extractor import select_ocr_pages
+
+A4 = (595, 842)
+NOTICE_LINE = "제1회 매각기일 2025. 3. 14. 최저매각가격 금 1,000,000원 감정평가액"
+
+
+def _scan_of(draw, dpi=150, tint=255):
+    """Image-only page holding a grayscale raster of whatever draw(page) puts on a blank page."""
+    src = fitz.open()
+    page = src.new_page(width=A4[0], height=A4[1])
+    if tint != 255:
+        page.draw_rect(page.rect, color=None, fill=(tint / 255,) * 3)
+    draw(page)
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return pix.tobytes("png")
+
+
+def _text_scan(fontsize, lines=40, tint=255):
+    def draw(page):
+        y = 72
+        for _ in range(lines):
+            page.insert_text((60, y), NOTICE_LINE, fontsize=fontsize, fontname="korea")
+            y += fontsize * 1.8
+    return _scan_of(draw, tint=tint)
+
+
+def _document(*scans):
+    doc = fitz.open()
+    for png in scans:
+        page = doc.new_page(width=A4[0], height=A4[1])
+        page.insert_image(page.rect, stream=png)
+    return doc
+
+
+@pytest.mark.parametrize("fontsize", [9, 10, 12])
+def test_scanned_text_page_is_sent_to_ocr(fontsize):
+    doc = _document(_text_scan(fontsize))
+    assert select_ocr_pages(doc, [0]) == ([0], {'blank': 0, 'duplicate': 0})
+
+
+def test_sparse_scan_on_tinted_paper_is_kept():
+    # a couple of lines (e.g. a signature page) on grayish scanner paper
+    doc = _document(_text_scan(10, lines=2, tint=230))
+    assert select_ocr_pages(doc, [0])[0] == [0]
+
+
+@pytest.mark.parametrize("tint", [255, 230])
+def test_blank_scan_is_skipped(tint):
+    doc = _document(_scan_of(lambda page: None, tint=tint))
+    assert select_ocr_pages(doc, [0]) == ([], {'blank': 1, 'duplicate': 0})
+
+
+def test_repeated_scan_is_skipped():
+    cover = _text_scan(12)
+    doc = _document(cover, _scan_of(lambda page: None), cover, _text_scan(9))
+    assert select_ocr_pages(doc, [0, 1, 2, 3]) == ([0, 3], {'blank': 1, 'duplicate': 1})
@@ -0,0 +1,146 @@
+"""
+Relevance-ranked Text Windowing
+===============================
+Fits attachment text into the summary prompt's token budget by keeping the most
+informative blocks instead of the first N characters.
+
+The extracted text (possibly several attachments, each under a "--- file ---" header)
+is split into blocks, every block is scored by sale-notice key terms, amounts and
+dates, and the best blocks are packed into the budget — measured with the model's
+tokenizer — then emitted in their original order. Lines longer than BLOCK_MAX_CHARS
+(tables or OCR output without line breaks) are cut into pieces first, and non-empty
+text never comes back empty: if no block fits, the best one is truncated to the budget.
+"""
+
+import re
+import math
+from typing import List, Tuple
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")  # gpt-4o / gpt-4o-mini
+except Exception:  # tiktoken missing or its encoding file unavailable offline
+    _ENCODING = None
+
+# Term → weight; counted per occurrence (capped) in each block
+KEY_TERMS = {
+    '최저': 4, '매각': 3, '감정': 3, '입찰': 3, '보증금': 3, '소재지': 3, '기일': 3,
+    '마감': 2, '대금': 2, '면적': 2, '지번': 2, '차종': 2, '차량번호': 2, '연식': 2, '주행': 1,
+    '회차': 2, '유찰': 2, '압류': 1, '인수': 1, '문의': 1, '연락처': 1,
+}
+AMOUNT_RE = re.compile(r'\d[\d,]*\s*(?:억|만)?\s*원')
+DATE_RE = re.compile(r'20\d{2}\s*[.\-/년]\s*\d{1,2}\s*[.\-/월]\s*\d{1,2}')
+FILE_HEADER_RE = re.compile(r'^--- .* ---$')
+
+MAX_TERM_HITS = 3           # repeated boilerplate should not dominate a block's score
+BLOCK_MAX_LINES = 12        # long paragraphs/tables are cut into blocks of this many lines
+BLOCK_MAX_CHARS = 600       # ...and single lines longer than this into pieces of about this size
+GAP_MARKER = "…"
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    # Rough fallback: Hangul is ~1 token per syllable (3 UTF-8 bytes), ASCII ~3-4 chars per token
+    return math.ceil(len(text.encode('utf-8')) / 3)
+
+
+def truncate_to_budget(text: str, token_budget: int) -> str:
+    """The longest prefix of text that fits token_budget."""
+    if count_tokens(text) <= token_budget:
+        return text
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text, disallowed_special=())[:max(token_budget, 0)])
+    return text.encode('utf-8')[:max(token_budget, 0) * 3].decode('utf-8', errors='ignore')
+
+
+def _cut_long_line(line: str) -> List[str]:
+    """Pieces of at most BLOCK_MAX_CHARS, broken at the last space where there is one."""
+    pieces = []
+    while len(line) > BLOCK_MAX_CHARS:
+        cut = line.rfind(' ', BLOCK_MAX_CHARS // 2, BLOCK_MAX_CHARS)
+        cut = cut if cut > 0 else BLOCK_MAX_CHARS
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def split_blocks(text: str) -> List[Tuple[str, str]]:
+    """
+    [(file_header, block_text)] split on blank lines, long blocks cut every BLOCK_MAX_LINES lines
+    and lines longer than BLOCK_MAX_CHARS cut into blocks of their own.
+    """
+    blocks = []
+    header = ""
+    current: List[str] = []
+
+    def flush():
+        if current:
+            blocks.append((header, "\n".join(current)))
+            current.clear()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if FILE_HEADER_RE.match(stripped):
+            flush()
+            header = stripped
+        elif not stripped:
+            flush()
+        elif len(line) > BLOCK_MAX_CHARS:
+            flush()
+            for piece in _cut_long_line(line):
+                current.append(piece)
+                flush()
+        else:
+            current.append(line)
+            if len(current) >= BLOCK_MAX_LINES:
+                flush()
+    flush()
+    return blocks
+
+
+def score_block(block: str) -> float:
+    """Key-term weight plus amounts and dates, divided by sqrt(length) so dense blocks win."""
+    score = sum(weight * min(block.count(term), MAX_TERM_HITS) for term, weight in KEY_TERMS.items())
+    score += 2 * min(len(AMOUNT_RE.findall(block)), MAX_TERM_HITS * 2)
+    score += 2 * min(len(DATE_RE.findall(block)), MAX_TERM_HITS)
+    return score / math.sqrt(max(len(block), 1) / 100)
+
+
+def select_relevant_text(text: str, token_budget: int) -> str:
+    """The text itself when it fits the budget, otherwise its highest-scoring blocks in document order."""
+    if not text or count_tokens(text) <= token_budget:
+        return text
+
+    blocks = split_blocks(text)
+    ranked = sorted(range(len(blocks)), key=lambda i: score_block(blocks[i][1]), reverse=True)
+
+    chosen = set()
+    used = 0
+    for i in ranked:
+        cost = count_tokens(blocks[i][1]) + 2  # newline / gap marker
+        if used + cost > token_budget:
+            continue
+        chosen.add(i)
+        used += cost
+    if not chosen and ranked:
+        # Nothing fits whole (budget smaller than one block): send the best block, truncated
+        best = ranked[0]
+        blocks[best] = (blocks[best][0], truncate_to_budget(blocks[best][1], token_budget - 2))
+        chosen.add(best)
+
+    out: List[str] = []
+    last_header = None
+    previous = -1
+    for i in sorted(chosen):
+        header, block = blocks[i]
+        if header and header != last_header:
+            out.append(header)
+            last_header = header
+        elif i != previous + 1:
+            out.append(GAP_MARKER)
+        out.append(block)
+        previous = i
+    return "\n".join(out)
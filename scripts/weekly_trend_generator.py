@@ -27,6 +27,8 @@ from openai import OpenAI
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from paginated_select import stream_rows
+
 # ── Environment Setup ──────────────────────────────────────────────
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(base_dir, '.env.local'))
@@ -110,14 +112,12 @@ def get_weekly_data(target_date: date = None) -> Dict:
     prev_start_str = prev_start.strftime('%Y-%m-%d')
     prev_end_str = prev_end.strftime('%Y-%m-%d')
 
-    # This week's notices with AI summaries
-    result = supabase.table('court_notices') \
-        .select('title, category, department, ai_summary, date_posted') \
-        .gte('date_posted', week_start_str) \
-        .lte('date_posted', week_end_str) \
-        .execute()
-
-    this_week = result.data or []
+    # This week's notices with AI summaries (paged: a busy week exceeds the 1000-row select cap)
+    this_week = stream_rows(
+        supabase, 'court_notices', 'title, category, department, ai_summary, date_posted',
+        filters=lambda q: q.gte('date_posted', week_start_str).lte('date_posted', week_end_str),
+        order_by='date_posted', tiebreak='id',
+    )
 
     # Previous week's count for comparison
     last_result = supabase.table('court_notices') \
@@ -135,8 +135,10 @@ def get_weekly_data(target_date: date = None) -> Dict:
     re_summaries = []     # 부동산 - all included for table
     veh_summaries = []    # 차량 - all included for table
     other_summaries = []  # 기타 - limited
+    total = 0
 
     for notice in this_week:
+        total += 1
         cat = notice.get('category', 'other')
         dept = notice.get('department', '기타')
         category_counts[cat] = category_counts.get(cat, 0) + 1
@@ -166,7 +168,7 @@ def get_weekly_data(target_date: date = None) -> Dict:
         'week_start': week_start_str,
         'week_end': week_end_str,
         'week_label': week_label,
-        'total': len(this_week),
+        'total': total,
         'last_week_total': last_week_count,
         'category_counts': category_counts,
         'top_department': top_dept[0],
@@ -539,8 +541,7 @@ def cleanup_duplicates():
     print("=" * 60)
 
     # Fetch all weekly reports
-    result = supabase.table('weekly_reports').select('*').order('week_end', desc=True).execute()
-    all_reports = result.data or []
+    all_reports = list(stream_rows(supabase, 'weekly_reports', '*', order_by='week_end', tiebreak='id', desc=True))
 
     if not all_reports:
         print("No reports found.")
@@ -633,9 +634,8 @@ def backfill_missing_weeks():
     print(f"   📅 Notice range: {start_date} ~ {today}")
 
     # Get all existing reports
-    existing = supabase.table('weekly_reports').select('week_start,week_end').execute()
     existing_keys = set()
-    for r in (existing.data or []):
+    for r in stream_rows(supabase, 'weekly_reports', 'week_start,week_end'):
         existing_keys.add(f"{r['week_start']}_{r['week_end']}")
 
     # Iterate through all weeks from start to today
@@ -4,14 +4,15 @@ Improved: Better detail page navigation and image extraction
 """
 
 import asyncio
-import base64
 import os
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from playwright.async_api import async_playwright
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from image_dedupe import PhashIndex, dhash
+
 # Load environment variables
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(base_dir, '.env.local'))
@@ -28,10 +29,29 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 STORAGE_BUCKET = "auction-images"
 
+# Uploaded thumbnails are named "{case}_{YYYYMMDD}.{ext}", so the upload date can be read back from the URL
+THUMBNAIL_DATE_PATTERN = re.compile(r'_(\d{8})\.\w+(?:\?.*)?$')
+
+# Max site_ids per `in` filter, keeps the PostgREST query string well under URL limits
+SITE_ID_CHUNK_SIZE = 200
+
+# Same-origin path the detail page POSTs image bytes to. It is fulfilled by page.route
+# and never reaches the court site; this keeps the base64 data URI out of page.evaluate.
+IMAGE_CAPTURE_PATH = "/__image_capture__"
+
 
 class AuctionScraper:
-    def __init__(self):
+    def __init__(self, image_dedupe=True):
         self.base_url = "https://www.courtauction.go.kr/pgj/index.on?w2xPath=/pgj/ui/pgj100/PGJ151F00.xml"
+        self._captured_image = None
+        self.phash_index = PhashIndex() if image_dedupe else None
+        self.reused_image_count = 0
+
+    async def _handle_image_capture(self, route):
+        """Receive image bytes posted by extract_image_from_page."""
+        request = route.request
+        self._captured_image = (request.post_data_buffer, request.headers.get('content-type', 'image/jpeg'))
+        await route.fulfill(status=204)
 
     def parse_price(self, price_str):
         if not price_str:
@@ -46,21 +66,17 @@ class AuctionScraper:
         except:
             return None
 
-    def upload_base64_to_storage(self, base64_data: str, filename: str) -> str | None:
-        """Upload a base64 image to Supabase Storage."""
+    def upload_image_to_storage(self, image_bytes: bytes, content_type: str, filename: str) -> str | None:
+        """Upload raw image bytes to Supabase Storage."""
         try:
-            match = re.match(r'data:image/(\w+);base64,(.+)', base64_data)
-            if not match:
-                return None
-            
-            base64_content = match.group(2)
-            image_bytes = base64.b64decode(base64_content)
-            full_filename = f"{filename}.jpg"
+            subtype = content_type.split('/')[-1].split(';')[0].strip() or 'jpeg'
+            ext = 'jpg' if subtype == 'jpeg' else subtype
+            full_filename = f"{filename}.{ext}"
             
             supabase.storage.from_(STORAGE_BUCKET).upload(
                 path=full_filename,
                 file=image_bytes,
-                file_options={"content-type": "image/jpeg", "upsert": "true"}
+                file_options={"content-type": f"image/{subtype}", "upsert": "true"}
             )
             
             public_url = supabase.storage.from_(STORAGE_BUCKET).get_public_url(full_filename)
@@ -70,11 +86,50 @@ class AuctionScraper:
             print(f"      Upload error: {e}")
             return None
 
+    def make_site_id(self, item):
+        case_no = item.get('srnSaNo', '')
+        col_merge = item.get('colMerge', '')
+        return f"auction_{col_merge}" if col_merge else f"auction_{case_no}"
+
+    def fetch_existing_thumbnails(self, site_ids):
+        """Bulk-fetch the stored site_id -> thumbnail_url map for the given items."""
+        existing = {}
+        unique_ids = list(dict.fromkeys(site_ids))
+        for i in range(0, len(unique_ids), SITE_ID_CHUNK_SIZE):
+            chunk = unique_ids[i:i + SITE_ID_CHUNK_SIZE]
+            try:
+                result = supabase.table("court_notices") \
+                    .select("site_id, thumbnail_url") \
+                    .eq("source_type", "auction") \
+                    .in_("site_id", chunk) \
+                    .execute()
+                for row in result.data or []:
+                    if row.get('thumbnail_url'):
+                        existing[row['site_id']] = row['thumbnail_url']
+            except Exception as e:
+                print(f"      Thumbnail lookup error: {str(e)[:50]}")
+        return existing
+
+    def needs_image(self, thumbnail_url, refresh_older_than=None):
+        """Decide whether an item's detail page has to be opened for its image."""
+        if not thumbnail_url:
+            return True
+        if refresh_older_than is None:
+            return False
+
+        match = THUMBNAIL_DATE_PATTERN.search(thumbnail_url)
+        if not match:
+            return True  # Unknown upload date, treat as stale
+        try:
+            uploaded = datetime.strptime(match.group(1), '%Y%m%d')
+        except ValueError:
+            return True
+        return datetime.now() - uploaded > timedelta(days=refresh_older_than)
+
     def map_to_db_record(self, item, thumbnail_url=None):
         """Map raw API item to database record structure"""
         case_no = item.get('srnSaNo', '')
-        col_merge = item.get('colMerge', '')
-        site_id = f"auction_{col_merge}" if col_merge else f"auction_{case_no}"
+        site_id = self.make_site_id(item)
         
         usage = item.get('dspslUsgNm', '물건')
         address = item.get('printSt') or item.get('bgPlaceRdAllAddr', '')
@@ -139,55 +194,102 @@ class AuctionScraper:
             # "lawd_cd": lawd_cd
         }
 
-    async def extract_image_from_page(self, page, case_no: str) -> str | None:
-        """Extract first Base64 image from the current detail page."""
+    async def extract_image_from_page(self, page, case_no: str, refresh_older_than=None) -> str | None:
+        """
+        Extract the first property image from the current detail page.
+        The data URI is decoded to a Blob inside the browser and its ArrayBuffer is posted
+        to IMAGE_CAPTURE_PATH, so Python receives raw bytes instead of a base64 string.
+        A near-duplicate upload is only reused while its URL date is within `refresh_older_than`
+        days, otherwise the item would look stale again on the next refresh run.
+        """
         try:
             # Wait for potential image elements
             await asyncio.sleep(2)
+            self._captured_image = None
             
             # Try specific selectors for property images
-            image_data = await page.evaluate("""
-            (() => {
-                // Look for images with specific IDs (property photos)
-                const selectors = [
-                    'img[id*="reltPic"]',
-                    'img[id*="gen_pic"]',  
-                    'img[id*="csPic"]'
-                ];
-                
-                for (const selector of selectors) {
-                    const imgs = document.querySelectorAll(selector);
-                    for (const img of imgs) {
-                        if (img.src && img.src.startsWith('data:image') && img.src.length > 5000) {
-                            return img.src;
+            found = await page.evaluate("""
+            (async (capturePath) => {
+                const pick = () => {
+                    // Look for images with specific IDs (property photos)
+                    const selectors = [
+                        'img[id*="reltPic"]',
+                        'img[id*="gen_pic"]',  
+                        'img[id*="csPic"]'
+                    ];
+                    
+                    for (const selector of selectors) {
+                        const imgs = document.querySelectorAll(selector);
+                        for (const img of imgs) {
+                            if (img.src && img.src.startsWith('data:image') && img.src.length > 5000) {
+                                return img;
+                            }
                         }
                     }
-                }
-                
-                // Fallback: any large base64 image
-                const allImgs = document.querySelectorAll('img');
-                for (const img of allImgs) {
-                    if (img.src && img.src.startsWith('data:image') && img.src.length > 10000) {
-                        return img.src;
+                    
+                    // Fallback: any large base64 image
+                    const allImgs = document.querySelectorAll('img');
+                    for (const img of allImgs) {
+                        if (img.src && img.src.startsWith('data:image') && img.src.length > 10000) {
+                            return img;
+                        }
                     }
-                }
-                
-                return null;
-            })()
-            """)
+                    
+                    return null;
+                };
+
+                const img = pick();
+                if (!img) return false;
+
+                const blob = await (await fetch(img.src)).blob();
+                const response = await fetch(capturePath, {
+                    method: 'POST',
+                    headers: { 'Content-Type': blob.type || 'image/jpeg' },
+                    body: new Uint8Array(await blob.arrayBuffer())
+                });
+                return response.status === 204;
+            })
+            """, IMAGE_CAPTURE_PATH)
             
-            if image_data:
+            if found and self._captured_image and self._captured_image[0]:
+                image_bytes, content_type = self._captured_image
+                self._captured_image = None
+
+                # Near-identical photo already in the bucket? Point at it instead of uploading a copy
+                image_hash = None
+                if self.phash_index:
+                    try:
+                        image_hash = dhash(image_bytes)
+                    except Exception as e:
+                        print(f"      Image hash error: {e}")
+                    if image_hash is not None:
+                        existing_url = self.phash_index.find(
+                            image_hash, accept=lambda url: not self.needs_image(url, refresh_older_than)
+                        )
+                        if existing_url:
+                            self.reused_image_count += 1
+                            print(f"      ↺ Reusing near-identical photo")
+                            return existing_url
+
                 safe_case_no = re.sub(r'[^\w\d]', '_', case_no)
                 filename = f"{safe_case_no}_{datetime.now().strftime('%Y%m%d')}"
-                return self.upload_base64_to_storage(image_data, filename)
+                public_url = self.upload_image_to_storage(image_bytes, content_type, filename)
+                if public_url and image_hash is not None:
+                    self.phash_index.add(image_hash, public_url, case_no)
+                return public_url
             
             return None
         except Exception as e:
             print(f"      Image extraction error: {e}")
             return None
 
-    async def scrape_auctions_with_images(self, max_items=9, region=None, page_index=1, start_date=None, end_date=None):
-        """Main scraping function with image extraction and filtering."""
+    async def scrape_auctions_with_images(self, max_items=9, region=None, page_index=1, start_date=None, end_date=None,
+                                          refresh_images_older_than=None):
+        """
+        Main scraping function with image extraction and filtering.
+        Detail pages are only opened for items without a stored thumbnail, or whose
+        thumbnail is older than `refresh_images_older_than` days when that is set.
+        """
         print(f"Starting Auction Scraper: Region={region}, Page={page_index}, Dates={start_date}~{end_date}")
         print(f"Targeting {max_items} items\n")
         
@@ -195,6 +297,7 @@ class AuctionScraper:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context()
             page = await context.new_page()
+            await page.route(f"**{IMAGE_CAPTURE_PATH}", self._handle_image_capture)
 
             # Step 1: Set filters and search
             print("Step 1: Setting filters and starting search...")
@@ -284,12 +387,23 @@ class AuctionScraper:
             success_count = 0
             image_count = 0
 
+            # Pre-pass: one lookup for thumbnails we already have
+            existing_thumbnails = self.fetch_existing_thumbnails(
+                [self.make_site_id(w['data']) for w in all_items]
+            )
+            to_enrich = [
+                w for w in all_items
+                if self.needs_image(existing_thumbnails.get(self.make_site_id(w['data'])), refresh_images_older_than)
+            ]
+            print(f"   Existing thumbnails: {len(existing_thumbnails)} | Needing image: {len(to_enrich)}\n")
+
             # First, save all basic information from the list data
+            # (the stored thumbnail is carried over so the upsert does not blank it)
             print("   Saving basic records from list data...")
             for item_wrapper in all_items:
                 item = item_wrapper['data']
                 try:
-                    record = self.map_to_db_record(item, None)
+                    record = self.map_to_db_record(item, existing_thumbnails.get(self.make_site_id(item)))
                     supabase.table("court_notices").upsert(
                         record, 
                         on_conflict="site_id,source_type"
@@ -302,12 +416,12 @@ class AuctionScraper:
             print("   Enriching with images and details (Step 2)...")
             current_ui_page = current_collect_page # The last page we were on
             
-            for idx, item_wrapper in enumerate(all_items):
+            for idx, item_wrapper in enumerate(to_enrich):
                 item = item_wrapper['data']
                 target_page = item_wrapper['page']
                 case_no = item.get('srnSaNo', '')
                 
-                print(f"   [{idx+1}/{len(all_items)}] Enriching {case_no} (Page {target_page})...")
+                print(f"   [{idx+1}/{len(to_enrich)}] Enriching {case_no} (Page {target_page})...")
                 
                 try:
                     # Navigate to correct page if needed
@@ -345,7 +459,7 @@ class AuctionScraper:
                         # Scroll to reveal image section
                         await page.evaluate("window.scrollBy(0, 800)")
                         await asyncio.sleep(2)
-                        thumbnail_url = await self.extract_image_from_page(page, case_no)
+                        thumbnail_url = await self.extract_image_from_page(page, case_no, refresh_images_older_than)
                         
                         # Go back using the list button
                         await page.click("#mf_wfm_mainFrame_btn_gdsDtlSrchLst")
@@ -353,8 +467,7 @@ class AuctionScraper:
                         
                         if thumbnail_url:
                             # Update existing record with thumbnail
-                            col_merge = item.get('colMerge', '')
-                            site_id = f"auction_{col_merge}" if col_merge else f"auction_{case_no}"
+                            site_id = self.make_site_id(item)
                             supabase.table("court_notices").update({"thumbnail_url": thumbnail_url}).eq("site_id", site_id).eq("source_type", "auction").execute()
                             image_count += 1
                             print(f"      ✓ Details & Image saved")
@@ -369,7 +482,8 @@ class AuctionScraper:
             await browser.close()
 
         print(f"\n{'='*50}")
-        print(f"Images extracted: {image_count}")
+        print(f"Images extracted: {image_count} (reused near-identical: {self.reused_image_count})")
+        print(f"Detail pages skipped (thumbnail up to date): {len(all_items) - len(to_enrich)}")
         return success_count
 
 
@@ -381,15 +495,20 @@ async def main():
     parser.add_argument("--page", type=int, default=1)
     parser.add_argument("--start", type=str, default=None)
     parser.add_argument("--end", type=str, default=None)
+    parser.add_argument("--refresh-images-older-than", type=int, default=None, metavar="DAYS",
+                        help="Also re-extract images whose stored thumbnail is older than DAYS")
+    parser.add_argument("--no-image-dedupe", action="store_true",
+                        help="Upload every photo even if a near-identical one is already stored")
     args = parser.parse_args()
 
-    scraper = AuctionScraper()
+    scraper = AuctionScraper(image_dedupe=not args.no_image_dedupe)
     await scraper.scrape_auctions_with_images(
         max_items=args.max, 
         region=args.region, 
         page_index=args.page,
         start_date=args.start,
-        end_date=args.end
+        end_date=args.end,
+        refresh_images_older_than=args.refresh_images_older_than
     )
 
 
@@ -1,6 +1,11 @@
 """
 Auction Search Scraper - Generalized for Seoul/Gyeonggi/Incheon and Apartment/Villa.
 Uses 7-step bypass strategy and XHR interception.
+
+Usage:
+    python scripts_auction/auction_search_scraper.py --region 서울특별시 --category 아파트 --output out.json
+    python scripts_auction/auction_search_scraper.py --batch --days 30 --workers 2 --output all.jsonl
+        # every 시/도 x {아파트, 빌라, 오피스텔}, one browser, deduplicated JSONL stream
 """
 
 import asyncio
@@ -15,11 +20,59 @@ from playwright.async_api import async_playwright
 # Force UTF-8 encoding for stdout
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+# 시/도 options of the location dropdown (mf_wfm_mainFrame_sbx_rletAdongSdS, see list_regions.py)
+SIDO_REGIONS = [
+    "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시",
+    "울산광역시", "세종특별자치시", "경기도", "강원특별자치도", "충청북도", "충청남도",
+    "전북특별자치도", "전라남도", "경상북도", "경상남도", "제주특별자치도",
+]
+BATCH_CATEGORIES = ["아파트", "빌라", "오피스텔"]
+
+
+def build_query_specs(regions=None, categories=None, days=30, start=None) -> list:
+    """Cartesian product of regions x categories over the next `days` days."""
+    start = start or datetime.now()
+    start_date = start.strftime("%Y%m%d")
+    end_date = (start + timedelta(days=days)).strftime("%Y%m%d")
+    return [
+        {'region': region, 'category': category, 'start_date': start_date, 'end_date': end_date}
+        for region in (regions or SIDO_REGIONS)
+        for category in (categories or BATCH_CATEGORIES)
+    ]
+
+
+class JsonlSink:
+    """Streams items to a JSON Lines file, dropping items already written by an earlier query."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seen = set()
+        self.written = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, items: list, spec: dict) -> int:
+        new_count = 0
+        for item in items:
+            key = f"{item['saNo']}_{item['maemulSer']}"
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            record = dict(item, query={'region': spec['region'], 'category': spec['category']})
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            new_count += 1
+        self._file.flush()
+        self.written += new_count
+        return new_count
+
+    def close(self):
+        self._file.close()
+
+
 class AuctionSearchScraper:
     def __init__(self):
         self.base_url = "https://www.courtauction.go.kr/pgj/index.on?w2xPath=/pgj/ui/pgj100/PGJ151F00.xml"
         self.target_xhr_pattern = "searchControllerMain.on"
-        
+
     async def _apply_stealth(self, page):
         """Step 1 & 2: Manual Stealth and Fingerprinting Spoofing"""
         await page.add_init_script("""
@@ -41,133 +94,204 @@ class AuctionSearchScraper:
             return f"https://www.courtauction.go.kr/pgj/index.on?w2xPath=/pgj/ui/pgj100/PGJ151F00.xml&saNo={sa_no}&boCd={bo_cd}&maemulSer={maemul_ser}"
         return ""
 
+    async def _new_search_page(self, browser):
+        """Opens a stealth page with the search XHR captured into page_state['data']."""
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        page = await context.new_page()
+        await self._apply_stealth(page)
+        page_state = {'data': None}
+
+        async def handle_response(response):
+            try:
+                url = response.url
+                if self.target_xhr_pattern in url:
+                    body = await response.text()
+                    if body.strip().startswith('{'):
+                        data = json.loads(body)
+                        if 'data' in data and isinstance(data['data'], dict):
+                            # Detailed search response uses 'dlt_srchResult'
+                            if 'dlt_srchResult' in data['data']:
+                                page_state['data'] = data['data']['dlt_srchResult']
+                            else:
+                                # Fallback to scanning for any list with 'srnSaNo'
+                                for key, value in data['data'].items():
+                                    if isinstance(value, list) and len(value) > 0:
+                                        if isinstance(value[0], dict) and 'srnSaNo' in value[0]:
+                                            page_state['data'] = value
+            except: pass
+
+        page.on("response", handle_response)
+        await self._load_search_form(page)
+        return page, page_state
+
+    async def _load_search_form(self, page):
+        await page.goto(self.base_url, timeout=45000)
+        await self._human_delay(2000, 3000)
+
+        # 0. Show the location-based search mode
+        await page.evaluate("""
+            const rb = document.getElementById('mf_wfm_mainFrame_rdo_rletCortLoc_input_1') ||
+                       document.getElementById('mf_wfm_mainFrame_rdo_rletSrchChc_input_1');
+            if (rb) { rb.click(); rb.dispatchEvent(new Event('change', { bubbles: true })); }
+            else {
+                const labels = Array.from(document.querySelectorAll('label'));
+                const targetLabel = labels.find(l => l.textContent.includes('소재지'));
+                if (targetLabel) targetLabel.click();
+            }
+        """)
+        await self._human_delay(1500, 2500)
+
+    async def _run_query(self, page, page_state, region, category, start_date, end_date, wait_polls=40) -> list:
+        """
+        Applies filters on an already loaded search form and returns the raw result list.
+        Raises TimeoutError when no search response arrives, so it is not mistaken for an empty result.
+        """
+        page_state['data'] = None
+
+        # 1. Selection Logic Helper
+        async def select_option(sel_id, text_to_include):
+            await page.evaluate(f"""
+                (function() {{
+                    const sel = document.getElementById('{sel_id}');
+                    if (sel) {{
+                        const opt = Array.from(sel.options).find(o => o.text.includes('{text_to_include}'));
+                        if (opt) {{
+                            sel.value = opt.value;
+                            sel.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                        }}
+                    }}
+                }})();
+            """)
+            await self._human_delay(1000, 1500)
+
+        # 1. Location
+        await select_option('mf_wfm_mainFrame_sbx_rletAdongSdS', region)
+
+        # 2. Type (Building -> Residential -> Category)
+        await select_option('mf_wfm_mainFrame_sbx_rletLclLst', '건물')
+        await select_option('mf_wfm_mainFrame_sbx_rletMclLst', '주거용')
+
+        # For category mapping
+        cat_text = category
+        if category == "빌라":
+            cat_text = "다세대" # Default to '다세대' for Villa, or optionally allow both
+
+        await select_option('mf_wfm_mainFrame_sbx_rletSclLst', cat_text)
+
+        # 3. Dates
+        await page.fill("#mf_wfm_mainFrame_cal_rletPerdStr_input", start_date)
+        await self._human_delay(300, 600)
+        await page.fill("#mf_wfm_mainFrame_cal_rletPerdEnd_input", end_date)
+        await self._human_delay()
+
+        # 4. Search
+        print("Clicking search...", file=sys.stderr)
+        await page.click("#mf_wfm_mainFrame_btn_gdsDtlSrch", force=True)
+
+        # An empty result list is still a response; only None means the XHR has not arrived yet
+        for _ in range(wait_polls):
+            if page_state['data'] is not None:
+                return page_state['data']
+            await asyncio.sleep(0.5)
+
+        raise TimeoutError(f"no search response within {wait_polls * 0.5:.0f}s")
+
+    def _normalize(self, captured_data) -> list:
+        results = []
+        seen = set()
+        for item in captured_data:
+            sa_no = item.get('saNo', '')
+            maemul_ser = item.get('maemulSer', '1')
+            key = f"{sa_no}_{maemul_ser}"
+            if key in seen: continue
+            seen.add(key)
+
+            results.append({
+                'caseNo': item.get('srnSaNo', ''),
+                'court': item.get('jiwonNm', ''),
+                'department': item.get('jpDeptNm', ''),
+                'itemType': item.get('dspslUsgNm', ''),
+                'address': item.get('printSt', item.get('hjguSido', '') + ' ' + item.get('hjguSigu', '') + ' ' + item.get('buldNm', '')),
+                'minPrice': item.get('minmaePrice', '0'),
+                'appraisalPrice': item.get('gamevalAmt', '0'),
+                'auctionDate': item.get('maeGiil', ''),
+                'status': item.get('maeStsNm', ''),
+                'detailLink': self.generate_detail_link(item),
+                'saNo': sa_no,
+                'boCd': item.get('boCd', ''),
+                'maemulSer': maemul_ser
+            })
+        return results
+
+    async def _launch(self, p):
+        return await p.chromium.launch(
+            headless=False,
+            args=['--window-position=-2400,-2400']
+        )
+
     async def scrape(self, region="서울특별시", category="아파트", start_date=None, end_date=None) -> list:
         today = datetime.now()
         if not start_date:
             start_date = today.strftime("%Y%m%d")
         if not end_date:
             end_date = (today + timedelta(days=7)).strftime("%Y%m%d")
-        
-        captured_data = None
-        results = []
 
         async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=False,
-                args=['--window-position=-2400,-2400']
-            )
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            await self._apply_stealth(page)
-
-            async def handle_response(response):
-                nonlocal captured_data
-                try:
-                    url = response.url
-                    if self.target_xhr_pattern in url:
-                        body = await response.text()
-                        if body.strip().startswith('{'):
-                            data = json.loads(body)
-                            if 'data' in data and isinstance(data['data'], dict):
-                                if 'dlt_srchResult' in data['data']:
-                                    captured_data = data['data']['dlt_srchResult']
-                except: pass
-
-            page.on("response", handle_response)
+            browser = await self._launch(p)
+            page, page_state = await self._new_search_page(browser)
 
             print(f"Searching: [{region}] [{category}] from {start_date} to {end_date}...", file=sys.stderr)
-            await page.goto(self.base_url, timeout=45000)
-            await self._human_delay(2000, 3000)
-
-            # --- Apply Filters ---
-            # 0. Show the location-based search mode
-            await page.evaluate("""
-                const rb = document.getElementById('mf_wfm_mainFrame_rdo_rletCortLoc_input_1') || 
-                           document.getElementById('mf_wfm_mainFrame_rdo_rletSrchChc_input_1');
-                if (rb) { rb.click(); rb.dispatchEvent(new Event('change', { bubbles: true })); }
-                else {
-                    const labels = Array.from(document.querySelectorAll('label'));
-                    const targetLabel = labels.find(l => l.textContent.includes('소재지'));
-                    if (targetLabel) targetLabel.click();
-                }
-            """)
-            await self._human_delay(1500, 2500)
-
-            # 1. Selection Logic Helper
-            async def select_option(sel_id, text_to_include):
-                await page.evaluate(f"""
-                    (function() {{
-                        const sel = document.getElementById('{sel_id}');
-                        if (sel) {{
-                            const opt = Array.from(sel.options).find(o => o.text.includes('{text_to_include}'));
-                            if (opt) {{
-                                sel.value = opt.value;
-                                sel.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                            }}
-                        }}
-                    }})();
-                """)
-                await self._human_delay(1000, 1500)
-
-            # 1. Location
-            await select_option('mf_wfm_mainFrame_sbx_rletAdongSdS', region)
-            
-            # 2. Type (Building -> Residential -> Category)
-            await select_option('mf_wfm_mainFrame_sbx_rletLclLst', '건물')
-            await select_option('mf_wfm_mainFrame_sbx_rletMclLst', '주거용')
-            
-            # For category mapping
-            cat_text = category
-            if category == "빌라":
-                cat_text = "다세대" # Default to '다세대' for Villa, or optionally allow both
-            
-            await select_option('mf_wfm_mainFrame_sbx_rletSclLst', cat_text)
-
-            # 3. Dates
-            await page.fill("#mf_wfm_mainFrame_cal_rletPerdStr_input", start_date)
-            await self._human_delay(300, 600)
-            await page.fill("#mf_wfm_mainFrame_cal_rletPerdEnd_input", end_date)
-            await self._human_delay()
-
-            # 4. Search
-            print("Clicking search...", file=sys.stderr)
-            await page.click("#mf_wfm_mainFrame_btn_gdsDtlSrch", force=True)
-            
-            for _ in range(40):
-                if captured_data: break
-                await asyncio.sleep(0.5)
-            
+            captured_data = await self._run_query(page, page_state, region, category, start_date, end_date)
+
             await asyncio.sleep(2)
             await browser.close()
 
-        if captured_data:
-            seen = set()
-            for item in captured_data:
-                sa_no = item.get('saNo', '')
-                maemul_ser = item.get('maemulSer', '1')
-                key = f"{sa_no}_{maemul_ser}"
-                if key in seen: continue
-                seen.add(key)
-                
-                results.append({
-                    'caseNo': item.get('srnSaNo', ''),
-                    'court': item.get('jiwonNm', ''),
-                    'department': item.get('jpDeptNm', ''),
-                    'itemType': item.get('dspslUsgNm', ''),
-                    'address': item.get('printSt', item.get('hjguSido', '') + ' ' + item.get('hjguSigu', '') + ' ' + item.get('buldNm', '')),
-                    'minPrice': item.get('minmaePrice', '0'),
-                    'appraisalPrice': item.get('gamevalAmt', '0'),
-                    'auctionDate': item.get('maeGiil', ''),
-                    'status': item.get('maeStsNm', ''),
-                    'detailLink': self.generate_detail_link(item),
-                    'saNo': sa_no,
-                    'boCd': item.get('boCd', ''),
-                    'maemulSer': maemul_ser
-                })
-        
-        return results
+        return self._normalize(captured_data)
+
+    async def scrape_batch(self, specs: list, sink, workers: int = 1) -> dict:
+        """
+        Runs many query specs in one browser. Specs are sharded over `workers` pages;
+        each page loads the search form once and re-applies filters for every query.
+        Returns {'queries': n, 'failed': n, 'items': n} (items = new items written to sink).
+        """
+        queue = asyncio.Queue()
+        for spec in specs:
+            queue.put_nowait(spec)
+        stats = {'queries': 0, 'failed': 0, 'items': 0}
+
+        async def worker(browser, worker_id):
+            page, page_state = await self._new_search_page(browser)
+            while not queue.empty():
+                spec = queue.get_nowait()
+                label = f"[{spec['region']}] [{spec['category']}]"
+                print(f"  (w{worker_id}) Searching: {label} {spec['start_date']}~{spec['end_date']}", file=sys.stderr)
+                try:
+                    raw = await self._run_query(page, page_state, spec['region'], spec['category'],
+                                                spec['start_date'], spec['end_date'])
+                    new_count = sink.write(self._normalize(raw), spec)
+                    stats['items'] += new_count
+                    print(f"  (w{worker_id}) {label}: {len(raw)} found, {new_count} new", file=sys.stderr)
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f"  (w{worker_id}) {label} failed: {str(e)[:80]}", file=sys.stderr)
+                    # The form may be in a broken state; start the next query from a fresh load,
+                    # and drop anything a late response stored so it is not credited to the next spec
+                    try:
+                        await self._load_search_form(page)
+                    except Exception:
+                        pass
+                    page_state['data'] = None
+                stats['queries'] += 1
+                await self._human_delay()
+
+        async with async_playwright() as p:
+            browser = await self._launch(p)
+            await asyncio.gather(*(worker(browser, i + 1) for i in range(max(1, workers))))
+            await browser.close()
+
+        return stats
 
 async def main():
     parser = argparse.ArgumentParser()
@@ -175,15 +299,35 @@ async def main():
     parser.add_argument("--category", default="아파트")
     parser.add_argument("--start", help="YYYYMMDD")
     parser.add_argument("--end", help="YYYYMMDD")
-    parser.add_argument("--output", help="Output file", default="auction_results.json")
+    parser.add_argument("--output", help="Output file (default: auction_results.json, or auction_results.jsonl with --batch)")
+    parser.add_argument("--batch", action="store_true", help="Run every --regions x --categories query and stream JSONL to --output")
+    parser.add_argument("--regions", help="Comma-separated 시/도 list for --batch (default: all)")
+    parser.add_argument("--categories", help="Comma-separated categories for --batch (default: 아파트,빌라,오피스텔)")
+    parser.add_argument("--days", type=int, default=30, help="Date window for --batch (default: 30)")
+    parser.add_argument("--workers", type=int, default=1, help="Pages running --batch queries in parallel")
     args = parser.parse_args()
 
     scraper = AuctionSearchScraper()
+
+    if args.batch:
+        specs = build_query_specs(
+            regions=args.regions.split(",") if args.regions else None,
+            categories=args.categories.split(",") if args.categories else None,
+            days=args.days
+        )
+        sink = JsonlSink(args.output or "auction_results.jsonl")
+        try:
+            stats = await scraper.scrape_batch(specs, sink, workers=args.workers)
+        finally:
+            sink.close()
+        print(f"Batch completed. {stats['queries']} queries ({stats['failed']} failed), {stats['items']} unique items saved.")
+        return
+
     items = await scraper.scrape(region=args.region, category=args.category, start_date=args.start, end_date=args.end)
-    
-    with open(args.output, "w", encoding="utf-8") as f:
+
+    with open(args.output or "auction_results.json", "w", encoding="utf-8") as f:
         json.dump(items, f, ensure_ascii=False, indent=2)
-    
+
     print(f"Scraping completed. {len(items)} items saved.")
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""
+Benchmark: perceptual-hash dedupe index (image_dedupe.py)
+Measures dHash throughput, BK-tree vs linear-scan lookup time, and duplicate detection quality.
+
+Uses real photos from --dir when given; otherwise generates a synthetic corpus where
+each base photo has re-encoded / resized / brightness-shifted copies (like re-listed items).
+
+Usage:
+    python scripts_auction/bench_image_dedupe.py                    # 3000 synthetic images
+    python scripts_auction/bench_image_dedupe.py --count 5000
+    python scripts_auction/bench_image_dedupe.py --dir ./sample_photos
+"""
+
+import argparse
+import io
+import os
+import random
+import time
+
+from PIL import Image, ImageDraw, ImageEnhance
+
+from image_dedupe import BKTree, DEFAULT_MAX_DISTANCE, dhash, hamming
+
+
+def _encode(img: Image.Image, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=quality)
+    return buf.getvalue()
+
+
+def synthetic_corpus(count: int, copies_per_photo: int = 3, seed: int = 42):
+    """Returns [(group_id, jpeg_bytes)]; images sharing a group_id are near-duplicates."""
+    rng = random.Random(seed)
+    corpus = []
+    group = 0
+    while len(corpus) < count:
+        img = Image.new('RGB', (640, 480), tuple(rng.randint(0, 255) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = rng.randint(0, 600), rng.randint(0, 440)
+            x1, y1 = x0 + rng.randint(20, 300), y0 + rng.randint(20, 240)
+            draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+
+        corpus.append((group, _encode(img, 90)))
+        for _ in range(rng.randint(0, copies_per_photo)):
+            variant = img.resize((rng.choice([480, 560, 800]), rng.choice([360, 420, 600])))
+            variant = ImageEnhance.Brightness(variant).enhance(rng.uniform(0.92, 1.08))
+            corpus.append((group, _encode(variant, rng.randint(55, 85))))
+        group += 1
+
+    return corpus[:count]
+
+
+def directory_corpus(path: str):
+    """Real photos; each file is its own group (no ground truth for duplicates)."""
+    corpus = []
+    for i, name in enumerate(sorted(os.listdir(path))):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+            with open(os.path.join(path, name), 'rb') as f:
+                corpus.append((i, f.read()))
+    return corpus
+
+
+def run(corpus, max_distance: int):
+    print(f"Images: {len(corpus)} | max distance: {max_distance}")
+
+    start = time.perf_counter()
+    hashes = [(group, dhash(data)) for group, data in corpus]
+    hash_secs = time.perf_counter() - start
+    print(f"dHash:        {hash_secs:.2f}s total, {hash_secs / len(corpus) * 1000:.2f} ms/image")
+
+    # Simulate the scraper: look up each photo, upload (insert) on miss
+    tree = BKTree()
+    linear = []
+    tree_secs = linear_secs = 0.0
+    true_pos = false_pos = false_neg = 0
+    seen_groups = set()
+
+    for group, h in hashes:
+        start = time.perf_counter()
+        matches = tree.search(h, max_distance)
+        tree_secs += time.perf_counter() - start
+
+        start = time.perf_counter()
+        linear_matches = [g for lh, g in linear if hamming(h, lh) <= max_distance]
+        linear_secs += time.perf_counter() - start
+
+        assert len(matches) == len(linear_matches)
+        is_dup = group in seen_groups
+        if matches:
+            if matches[0][2] == group and is_dup:
+                true_pos += 1
+            else:
+                false_pos += 1
+        else:
+            if is_dup:
+                false_neg += 1
+            tree.add(h, group)
+            linear.append((h, group))
+        seen_groups.add(group)
+
+    n = len(hashes)
+    print(f"BK-tree:      {tree_secs:.3f}s total, {tree_secs / n * 1e6:.1f} µs/lookup")
+    print(f"Linear scan:  {linear_secs:.3f}s total, {linear_secs / n * 1e6:.1f} µs/lookup")
+    print(f"Stored:       {len(linear)} | reused: {true_pos + false_pos}")
+    print(f"Duplicates:   true+ {true_pos} | false+ {false_pos} | missed {false_neg}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", type=str, default=None, help="Directory of sample photos")
+    parser.add_argument("--count", type=int, default=3000, help="Synthetic corpus size")
+    parser.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE)
+    args = parser.parse_args()
+
+    if args.dir:
+        corpus = directory_corpus(args.dir)
+    else:
+        print("Generating synthetic corpus...")
+        corpus = synthetic_corpus(args.count)
+
+    run(corpus, args.max_distance)
@@ -0,0 +1,134 @@
+"""
+Image Dedupe - Perceptual-hash index for auction property photos.
+Many items share the same exterior photo (units in one complex, re-listed cases after 유찰).
+Before uploading, the scraper looks the photo's dHash up in a local SQLite index and
+reuses the existing Storage URL when a near-identical photo was already uploaded.
+"""
+
+import io
+import os
+import sqlite3
+from datetime import datetime
+
+from PIL import Image
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_INDEX_PATH = os.path.join(base_dir, '.cache', 'image_phash.sqlite')
+
+# dHash is 64 bits; photos re-encoded or resized by the court site stay within a few bits
+DEFAULT_MAX_DISTANCE = 5
+
+
+def dhash(image_bytes: bytes, hash_size: int = 8) -> int:
+    """Difference hash: compares adjacent pixels of a (hash_size+1) x hash_size grayscale thumbnail."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.draft('L', (hash_size * 8, hash_size * 8))  # Let JPEG decode at reduced size
+        small = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for near-duplicate lookup."""
+
+    def __init__(self):
+        self.root = None  # [hash, value, {distance: child}]
+        self.size = 0
+
+    def add(self, hash_value: int, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [hash_value, value, {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming(hash_value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, value, {}]
+                return
+            node = child
+
+    def search(self, hash_value: int, max_distance: int) -> list:
+        """Returns [(distance, hash, value)] for all entries within max_distance, closest first."""
+        if self.root is None:
+            return []
+
+        matches = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(hash_value, node[0])
+            if distance <= max_distance:
+                matches.append((distance, node[0], node[1]))
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+
+        matches.sort(key=lambda m: m[0])
+        return matches
+
+
+class PhashIndex:
+    """SQLite-backed hash -> public_url index, loaded into a BK-tree for lookups."""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                phash INTEGER NOT NULL,
+                public_url TEXT NOT NULL,
+                case_no TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_image_hashes_phash ON image_hashes (phash)")
+        self.conn.commit()
+
+        self.tree = BKTree()
+        for phash, public_url in self.conn.execute("SELECT phash, public_url FROM image_hashes"):
+            self.tree.add(_to_unsigned(phash), public_url)
+
+    def find(self, hash_value: int, accept=None) -> str | None:
+        """Public URL of the closest already-uploaded photo (passing `accept(url)` when given), or None."""
+        for _, _, public_url in self.tree.search(hash_value, self.max_distance):
+            if accept is None or accept(public_url):
+                return public_url
+        return None
+
+    def add(self, hash_value: int, public_url: str, case_no: str = None):
+        self.conn.execute(
+            "INSERT INTO image_hashes (phash, public_url, case_no, created_at) VALUES (?, ?, ?, ?)",
+            (_to_signed(hash_value), public_url, case_no, datetime.now().isoformat())
+        )
+        self.conn.commit()
+        self.tree.add(hash_value, public_url)
+
+    def close(self):
+        self.conn.close()
@@ -1,17 +1,25 @@
 """
 Popular Items Scraper - Extracts popular auction items via XHR interception
+
+Usage:
+    python scripts_auction/popular_items_scraper.py             # Print live JSON
+    python scripts_auction/popular_items_scraper.py --snapshot  # Save a snapshot for /api/popular-auctions
 """
 
 import asyncio
 import json
+import os
 import sys
 import io
+import argparse
 
 # Force UTF-8 encoding for stdout
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 from playwright.async_api import async_playwright
 
+SNAPSHOT_TABLE = "popular_auction_snapshots"
+
 
 class PopularItemsScraper:
     def __init__(self):
@@ -105,6 +113,7 @@ class PopularItemsScraper:
                 appraisal = item.get('gamevalAmt', '')
                 
                 results.append({
+                    'rank': len(results) + 1,
                     'caseNo': item.get('srnSaNo', ''),
                     'court': item.get('jiwonNm', ''),
                     'department': item.get('jpDeptNm', ''),
@@ -126,9 +135,52 @@ class PopularItemsScraper:
         return results
 
 
+def save_snapshot(items: list) -> bool:
+    """
+    Stores the normalized, ranked list as a new snapshot row.
+    Snapshots are append-only; the API serves the most recent one.
+    """
+    from datetime import datetime, timezone
+    from supabase import create_client
+    from dotenv import load_dotenv
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    load_dotenv(os.path.join(base_dir, '.env.local'))
+
+    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not supabase_url or not supabase_key:
+        print("Error: Supabase credentials not found.", file=sys.stderr)
+        return False
+
+    supabase = create_client(supabase_url, supabase_key)
+    result = supabase.table(SNAPSHOT_TABLE).insert({
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "item_count": len(items),
+        "items": items,
+    }).execute()
+    return bool(result.data)
+
+
 async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", action="store_true", help=f"Save the result to {SNAPSHOT_TABLE} instead of printing it")
+    args = parser.parse_args()
+
     scraper = PopularItemsScraper()
     items = await scraper.scrape()
+
+    if args.snapshot:
+        if not items:
+            # Keep serving the previous snapshot rather than replacing it with an empty list
+            print("No items captured, snapshot not saved.", file=sys.stderr)
+            sys.exit(1)
+        if not save_snapshot(items):
+            print("Failed to save snapshot.", file=sys.stderr)
+            sys.exit(1)
+        print(f"Snapshot saved: {len(items)} items")
+        return
+
     # Output clean JSON for API consumption
     print(json.dumps(items, ensure_ascii=False))
 
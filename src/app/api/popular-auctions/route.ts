@@ -1,48 +1,39 @@
 import { NextResponse } from 'next/server';
-import { spawn } from 'child_process';
-import path from 'path';
+import { supabase } from '@/lib/supabase';
 
+// Served from the latest snapshot written by
+// `python scripts_auction/popular_items_scraper.py --snapshot` (scheduled workflow),
+// so requests never wait on a live browser scrape.
 export async function GET() {
-    const pythonPath = process.env.PYTHON_PATH || 'python';
-    const scriptPath = path.join(process.cwd(), 'scripts_auction', 'popular_items_scraper.py');
+    const { data, error } = await supabase
+        .from('popular_auction_snapshots')
+        .select('captured_at, items')
+        .order('captured_at', { ascending: false })
+        .limit(1)
+        .maybeSingle();
 
-    console.log(`Executing: ${pythonPath} ${scriptPath}`);
+    if (error) {
+        console.error('Popular auctions snapshot error:', error);
+        return NextResponse.json({
+            success: false,
+            message: 'Failed to load popular items. Please check server logs.'
+        }, { status: 500 });
+    }
 
-    return new Promise<NextResponse>((resolve) => {
-        const pyProcess = spawn(pythonPath, [scriptPath]);
-        let output = '';
-        let errorOutput = '';
+    if (!data) {
+        return NextResponse.json({
+            success: false,
+            message: 'No popular items snapshot available yet.'
+        }, { status: 503 });
+    }
 
-        pyProcess.stdout.on('data', (data) => {
-            output += data.toString();
-        });
-
-        pyProcess.stderr.on('data', (data) => {
-            errorOutput += data.toString();
-        });
-
-        pyProcess.on('close', (code) => {
-            if (code === 0) {
-                try {
-                    const data = JSON.parse(output);
-                    resolve(NextResponse.json({
-                        success: true,
-                        items: data
-                    }));
-                } catch (err) {
-                    console.error('Popular auctions parser error:', err);
-                    resolve(NextResponse.json({
-                        success: false,
-                        message: 'Failed to parse output. Please check server logs.'
-                    }, { status: 500 }));
-                }
-            } else {
-                console.error('Scraper error:', errorOutput);
-                resolve(NextResponse.json({
-                    success: false,
-                    message: 'Scraping failed. Please check server logs.'
-                }, { status: 500 }));
-            }
-        });
+    return NextResponse.json({
+        success: true,
+        items: data.items,
+        capturedAt: data.captured_at
+    }, {
+        headers: {
+            'Cache-Control': 'public, s-maxage=600, stale-while-revalidate=300',
+        },
     });
 }
@@ -2,6 +2,7 @@ import { supabase } from '@/lib/supabase';
 import Link from 'next/link';
 import type { Metadata } from 'next';
 import DDayChart from '@/components/DDayChart';
+import { mergeSketches, sketchQuantile, type PriceSketch } from '@/lib/priceSketch';
 
 export const dynamic = 'force-dynamic';
 
@@ -74,6 +75,28 @@ export default async function DataLabPage() {
         lowestPriceItems = [...parsedItems].filter(item => item.min >= 1000000).sort((a, b) => a.min - b.min).slice(0, 3);
     }
 
+    // 3. 최근 30일 법원별 공고 수 & 감정가 분위수 (daily_stats의 일별 분포를 합산, 원본 공고 재조회 없음)
+    const { data: dailyRows } = await supabase
+        .from('daily_stats')
+        .select('stat_date, total_count, court_counts, price_sketch')
+        .gte('stat_date', thirtyDaysAgoStr)
+        .lte('stat_date', todayStr);
+
+    const courtTotals: Record<string, number> = {};
+    let periodNotices = 0;
+    for (const row of dailyRows || []) {
+        periodNotices += row.total_count || 0;
+        for (const [court, n] of Object.entries((row.court_counts || {}) as Record<string, number>)) {
+            courtTotals[court] = (courtTotals[court] || 0) + n;
+        }
+    }
+    // court_counts/price_sketch가 없는 옛 행이 섞이면 합계가 틀리므로 표시하지 않음
+    const hasDistribution = (dailyRows || []).length > 0 && (dailyRows || []).every(row => row.court_counts && row.price_sketch);
+    const topCourts = Object.entries(courtTotals).sort((a, b) => b[1] - a[1]).slice(0, 5);
+    const priceSketch = mergeSketches((dailyRows || []).map(row => row.price_sketch as PriceSketch));
+    const p50Price = sketchQuantile(priceSketch, 0.5);
+    const p90Price = sketchQuantile(priceSketch, 0.9);
+
     return (
         <div className="max-w-5xl mx-auto px-4 py-8">
             <header className="mb-10 sm:mb-16">
@@ -186,6 +209,61 @@ export default async function DataLabPage() {
                         </div>
                     </section>
                 </div>
+
+                {/* 3. 법원별 공고 분포 & 감정가 분위수 섹션 */}
+                {hasDistribution && (
+                    <div className="grid md:grid-cols-2 gap-8">
+                        <section className="bg-white rounded-2xl shadow-sm border border-gray-100 p-6 sm:p-8">
+                            <h2 className="text-xl font-bold text-gray-900 flex items-center gap-2 mb-6">
+                                🏛️ 최근 30일 공고 최다 법원
+                            </h2>
+                            <p className="text-sm text-gray-500 mb-6 leading-relaxed">
+                                최근 30일간 게시된 {periodNotices.toLocaleString()}건의 공고를 법원별로 집계했습니다.
+                                공고가 몰리는 법원은 회생·파산 사건이 활발한 지역으로, 매물 탐색의 출발점이 됩니다.
+                            </p>
+                            <div className="space-y-3">
+                                {topCourts.map(([court, count], idx) => (
+                                    <div key={court}>
+                                        <div className="flex justify-between text-sm mb-1">
+                                            <span className="font-bold text-gray-800">{idx + 1}. {court}</span>
+                                            <span className="text-gray-500">{count.toLocaleString()}건</span>
+                                        </div>
+                                        <div className="h-2 rounded-full bg-gray-100">
+                                            <div
+                                                className="h-2 rounded-full bg-blue-500"
+                                                style={{ width: `${(count / topCourts[0][1]) * 100}%` }}
+                                            />
+                                        </div>
+                                    </div>
+                                ))}
+                            </div>
+                        </section>
+
+                        <section className="bg-white rounded-2xl shadow-sm border border-gray-100 p-6 sm:p-8">
+                            <h2 className="text-xl font-bold text-gray-900 flex items-center gap-2 mb-6">
+                                💰 최근 30일 감정가 분포
+                            </h2>
+                            <p className="text-sm text-gray-500 mb-6 leading-relaxed">
+                                가격이 공개된 공고의 감정가(없으면 최저가) 기준입니다. 중앙값은 절반의 물건이 그보다 저렴하다는 뜻이며,
+                                상위 10% 기준가를 넘는 물건은 대형 자산으로 볼 수 있습니다. (오차 ±2% 이내 추정치)
+                            </p>
+                            <div className="grid grid-cols-2 gap-4">
+                                <div className="p-4 rounded-xl bg-gray-50 border border-gray-100">
+                                    <div className="text-xs text-gray-500 font-bold mb-1">중앙값 (p50)</div>
+                                    <div className="text-lg font-extrabold text-gray-900">
+                                        {p50Price !== null ? `${p50Price.toLocaleString()}원` : '-'}
+                                    </div>
+                                </div>
+                                <div className="p-4 rounded-xl bg-gray-50 border border-gray-100">
+                                    <div className="text-xs text-gray-500 font-bold mb-1">상위 10% 기준 (p90)</div>
+                                    <div className="text-lg font-extrabold text-blue-600">
+                                        {p90Price !== null ? `${p90Price.toLocaleString()}원` : '-'}
+                                    </div>
+                                </div>
+                            </div>
+                        </section>
+                    </div>
+                )}
             </div>
             
             {/* 하단 CTA */}
@@ -0,0 +1,36 @@
+// Reads the daily_stats.price_sketch quantile sketches (see scripts/price_sketch.py).
+// A sketch is {bucket: notices}; bucket i holds prices in (GAMMA^(i-1), GAMMA^i],
+// so merged sketches give any percentile within ±2% of a real price.
+
+const RELATIVE_ACCURACY = 0.02;
+const GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY);
+
+export type PriceSketch = Record<string, number>;
+
+export function mergeSketches(sketches: (PriceSketch | null | undefined)[]): PriceSketch {
+    const merged: PriceSketch = {};
+    for (const sketch of sketches) {
+        for (const [bucket, n] of Object.entries(sketch || {})) {
+            merged[bucket] = (merged[bucket] || 0) + n;
+        }
+    }
+    return merged;
+}
+
+// Estimated price at quantile q (0..1); null for an empty sketch
+export function sketchQuantile(sketch: PriceSketch, q: number): number | null {
+    const buckets = Object.entries(sketch)
+        .map(([bucket, n]) => [parseInt(bucket, 10), n] as const)
+        .filter(([, n]) => n > 0)
+        .sort((a, b) => a[0] - b[0]);
+    const total = buckets.reduce((sum, [, n]) => sum + n, 0);
+    if (total === 0) return null;
+
+    const rank = q * (total - 1);
+    let seen = 0;
+    for (const [index, n] of buckets) {
+        seen += n;
+        if (seen > rank) return Math.round((2 * Math.pow(GAMMA, index)) / (GAMMA + 1));
+    }
+    return null;
+}